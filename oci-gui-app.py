@@ -1,5 +1,25 @@
+import json
+import threading
+import time
+import uuid
 import streamlit as st
-from oci_utils import OCIManager
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import oci_blueprint
+import oci_browser_upload
+import oci_bulk
+import oci_fleet
+import oci_inventory
+import oci_metrics
+import oci_perf
+import oci_rule_changes
+import oci_scheduler
+import oci_teardown
+from oci_catalog import LaunchCatalog
+from oci_cidr import NetworkIndex
+from oci_rules import PROTOCOL_NAMES, SecurityRuleIndex, describe_rule, normalize_protocol
+from oci_ui_state import MINUTE, UIState
+from oci_utils import OCIManager, build_security_rule, security_rule_to_dict
 
 st.set_page_config(
     page_title="OCI Resource Manager",
@@ -13,12 +33,147 @@ if 'refresh_counter' not in st.session_state:
 
 st.title("OCI Resource Manager 🌤️")
 
+# This browser session's API calls are scheduled as interactive, shared fairly with other sessions.
+# A rerun's calls fail fast after RERUN_TIMEOUT seconds; bulk work started from it has no deadline
+RERUN_TIMEOUT = 120
+if 'scheduler_session' not in st.session_state:
+    st.session_state.scheduler_session = uuid.uuid4().hex
+oci_scheduler.set_context(oci_scheduler.INTERACTIVE, st.session_state.scheduler_session, timeout=RERUN_TIMEOUT)
+
+# Optional diagnostics overlay: profile this rerun (sections, OCI calls, cache, memory)
+def count_widgets():
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return 0
+    if hasattr(ctx, "widget_ids_this_run"):
+        return len(ctx.widget_ids_this_run)
+    # Newer Streamlit keeps the set on ctx.shared
+    return len(ctx.shared.widget_ids_this_run.snapshot())
+
+if st.session_state.get("perf_profile"):
+    # A rerun cut short by st.rerun() never reached the overlay; release its memory tracing
+    st.session_state.perf_profile.finish()
+st.session_state.perf_profile = oci_perf.start_rerun(
+    st.sidebar.toggle("Performance overlay ⏱️", key="perf_overlay",
+                      help="Time, OCI calls, cache hits and memory of each rerun (adds tracing overhead)"),
+    count_widgets
+)
+
+# Per-row UI state (dialogs, selections, links) and per-compartment indexes: scoped, expiring and size-capped
+ui_state = UIState(st.session_state)
+
 # Region selector (global)
 def get_default_region():
     import oci
     config = oci.config.from_file()
     return config["region"]
 
+def run_bulk_operation(operation, *args, total=None, **kwargs):
+    """Run an oci_bulk operation with a live progress bar. Returns the failed results."""
+    progress = oci_bulk.BulkProgress()
+    bar = st.progress(0.0, text="Starting... ⏳")
+    failures = []
+    dry_run_names = []
+    last_update = 0.0
+    with oci_scheduler.call_context(priority=oci_scheduler.BULK):
+        for result in operation(*args, progress=progress, **kwargs):
+            if result["status"] == "error":
+                failures.append(result)
+            elif result["status"] == "dry-run":
+                dry_run_names.append(result["name"])
+            if time.monotonic() - last_update > 0.25:
+                last_update = time.monotonic()
+                bar.progress(min(progress.done / total, 1.0) if total else 0.0,
+                             text=f"{progress.done} done, {progress.failed} failed "
+                                  f"({progress.ops_per_second:.0f} ops/s)")
+    summary = progress.summary()
+    bar.progress(1.0, text=f"{progress.done} done in {summary['elapsed_seconds']}s "
+                           f"({summary['ops_per_second']} ops/s, {summary['mb_per_second']} MB/s)")
+    if dry_run_names:
+        st.info(f"Dry run: {len(dry_run_names)} objects would be affected 🔍")
+        st.write(dry_run_names[:50])
+    if failures:
+        st.warning(f"{len(failures)} operations failed 😬")
+        for failure in failures[:10]:
+            st.write(f"- {failure['name']}: {failure['error']}")
+    return failures
+
+def launch_fleet_with_progress(oci_manager, compartment_id, specs, concurrency):
+    """Launch a fleet with one aggregated, live progress view. Returns the per-instance results."""
+    bar = st.progress(0.0, text="Launching... ⏳")
+    table = st.empty()
+    last_update = [0.0]
+    script_thread = threading.current_thread()
+
+    def show(progress):
+        # Streamlit elements can only be updated from the script thread, not the launch workers
+        if threading.current_thread() is not script_thread:
+            return
+        if time.monotonic() - last_update[0] < 0.5 and progress.done < len(specs):
+            return
+        last_update[0] = time.monotonic()
+        counts = ", ".join(f"{count} {state}" for state, count in progress.counts().items())
+        bar.progress(progress.done / len(specs), text=f"{counts} ({progress.elapsed:.0f}s)")
+        table.dataframe(progress.results(), use_container_width=True)
+
+    with oci_scheduler.call_context(priority=oci_scheduler.BULK):
+        results = oci_fleet.launch_fleet(oci_manager, compartment_id, specs, concurrency=concurrency,
+                                         progress=oci_fleet.FleetProgress(on_update=show))
+    failed = [r for r in results if r["state"] != "RUNNING"]
+    if failed:
+        st.warning(f"{len(results) - len(failed)} of {len(results)} instances RUNNING, {len(failed)} not 😬")
+    else:
+        st.success(f"All {len(results)} instances are RUNNING! 🎉")
+    return results
+
+def run_with_resource_progress(operation, *args, **kwargs):
+    """Run a network graph operation (blueprint or teardown) with a live per-resource table."""
+    table = st.empty()
+
+    def show(progress):
+        table.dataframe(progress.results(), use_container_width=True)
+
+    with oci_scheduler.call_context(priority=oci_scheduler.BULK):
+        return operation(*args, progress=oci_blueprint.ResourceProgress(on_update=show), **kwargs)
+
+EXAMPLE_BLUEPRINT = json.dumps({
+    "vcn": {"name": "demo-vcn", "cidr": "10.0.0.0/16", "dns_label": "demo"},
+    "internet_gateways": [{"name": "demo-igw"}],
+    "nat_gateways": [{"name": "demo-nat"}],
+    "route_tables": [
+        {"name": "public-rt", "rules": [{"destination": "0.0.0.0/0", "target": "demo-igw"}]},
+        {"name": "private-rt", "rules": [{"destination": "0.0.0.0/0", "target": "demo-nat"}]}
+    ],
+    "security_lists": [{
+        "name": "web-sl",
+        "ingress": [{"protocol": "tcp", "cidr": "0.0.0.0/0", "ports": "443"}],
+        "egress": [{"protocol": "all", "cidr": "0.0.0.0/0"}]
+    }],
+    "subnets": [
+        {"name": "public", "cidr": "10.0.0.0/24", "type": "PUBLIC", "route_table": "public-rt",
+         "security_lists": ["web-sl"]},
+        {"name": "private", "cidr": "10.0.1.0/24", "type": "PRIVATE", "route_table": "private-rt"}
+    ]
+}, indent=2)
+
+# Lifetime of the pre-authenticated URLs behind object download and upload links
+DOWNLOAD_LINK_MINUTES = 15
+UPLOAD_LINK_MINUTES = 60
+
+def get_compartment_index(name, builder, compartment_id, max_age=5 * MINUTE):
+    """Per-compartment index kept in the session's UI state and rebuilt at most every max_age seconds."""
+    return ui_state.cached(name, (st.session_state["oci_region"], compartment_id), builder, ttl=max_age)
+
+def get_network_index(oci_manager, compartment_id):
+    """CIDR index of the compartment's VCNs and subnets."""
+    return get_compartment_index("network_index", lambda: NetworkIndex.build([oci_manager], [compartment_id]),
+                                 compartment_id)
+
+def get_rule_index(oci_manager, compartment_id):
+    """Compiled index of every security rule in the compartment."""
+    return get_compartment_index("security_rule_index", lambda: SecurityRuleIndex.build(oci_manager, [compartment_id]),
+                                 compartment_id)
+
 if "oci_region" not in st.session_state:
     # Use default region from config file
     try:
@@ -29,8 +184,9 @@ if "oci_region" not in st.session_state:
 
 # Fetch available regions using a temporary OCIManager
 try:
-    temp_oci_manager = OCIManager(region=st.session_state["oci_region"])
-    available_regions = temp_oci_manager.list_regions()
+    with oci_perf.section("Regions"):
+        temp_oci_manager = OCIManager(region=st.session_state["oci_region"])
+        available_regions = temp_oci_manager.list_regions()
 except Exception:
     available_regions = [st.session_state["oci_region"]]
 
@@ -52,7 +208,7 @@ compartment_query = st.text_input("Search Compartment 🗂️", key="global_comp
 compartment_options = []
 selected_compartment = None
 if compartment_query and len(compartment_query) >= 3:
-    with st.spinner("Searching compartments..."):
+    with st.spinner("Searching compartments..."), oci_perf.section("Compartment search"):
         compartment_options = oci_manager_for_compartment.search_compartments(compartment_query)
     if not compartment_options:
         st.info("No compartments found matching your search.")
@@ -73,6 +229,8 @@ if selected_compartment:
     )
     st.session_state["oci_compartment_id"] = selected_compartment_id
     st.session_state["oci_compartment_name"] = selected_compartment
+    # Warm the Create Compute catalog while the user looks around
+    LaunchCatalog.prefetch(oci_manager_for_compartment, selected_compartment_id)
 else:
     st.session_state["oci_compartment_id"] = None
     st.session_state["oci_compartment_name"] = None
@@ -82,7 +240,7 @@ tab_labels = [
 ]
 tabs = st.tabs(tab_labels)
 
-with tabs[0]:
+with tabs[0], oci_perf.section(tab_labels[0]):
     st.markdown("# **Dashboard 🏠**")
     try:
         oci_manager = OCIManager(region=st.session_state["oci_region"])
@@ -90,7 +248,46 @@ with tabs[0]:
         selected_compartment = st.session_state["oci_compartment_name"]
         if selected_compartment_id:
             st.write(f"Selected compartment: {selected_compartment} 🎯")
-            
+
+            with st.expander("Subtree Inventory 🌳"), oci_perf.section("Subtree inventory"):
+                st.caption("Totals for this compartment and every compartment nested under it.")
+                inventory = oci_inventory.SubtreeInventory.cached(oci_manager, selected_compartment_id, load=False)
+                if st.button("Scan Subtree 🔍" if not inventory else "Rescan Subtree 🔍", key="scan_subtree"):
+                    # A large subtree can take longer than a rerun's deadline; partial counts would be cached
+                    with st.spinner("Counting resources in every compartment..."), \
+                            oci_scheduler.call_context(priority=oci_scheduler.BULK):
+                        inventory = oci_inventory.SubtreeInventory.cached(oci_manager, selected_compartment_id,
+                                                                          rescan=True)
+                if inventory:
+                    totals = inventory.rollups[selected_compartment_id]
+                    metric_cols = st.columns(6)
+                    metric_cols[0].metric("Compartments", len(inventory.compartment_ids))
+                    metric_cols[1].metric("Instances", totals["instances"])
+                    metric_cols[2].metric("Instance OCPUs", f"{totals['instance_ocpus']:g}")
+                    metric_cols[3].metric("ADBs", totals["adbs"])
+                    metric_cols[4].metric("ADB Storage (TB)", f"{totals['adb_storage_tbs']:g}")
+                    metric_cols[5].metric("VCNs / Buckets", f"{totals['vcns']} / {totals['buckets']}")
+                    st.dataframe([
+                        {"Compartment": " " * row["depth"] + row["name"],
+                         "Instances": row["subtree_instances"],
+                         "OCPUs": row["subtree_instance_ocpus"],
+                         "ADBs": row["subtree_adbs"],
+                         "ADB OCPUs": row["subtree_adb_ocpus"],
+                         "ADB Storage (TB)": row["subtree_adb_storage_tbs"],
+                         "VCNs": row["subtree_vcns"],
+                         "Buckets": row["subtree_buckets"]}
+                        for row in inventory.rows()
+                    ], use_container_width=True)
+                    for key, error in inventory.errors.items():
+                        st.warning(f"Could not count {key}: {error}")
+                    refresh_names = {inventory.tree.path(c): c for c in inventory.compartment_ids}
+                    refresh_col, button_col = st.columns([4, 1])
+                    refresh_target = refresh_col.selectbox("Compartment that changed", options=list(refresh_names),
+                                                           key="subtree_refresh_target")
+                    if button_col.button("Refresh 🔄", key="subtree_refresh"):
+                        inventory.refresh(oci_manager, refresh_names[refresh_target])
+                        st.rerun()
+
             # List instances in the selected compartment
             st.subheader("🖥️ Instances")
             instances = oci_manager.list_instances(selected_compartment_id)
@@ -220,7 +417,7 @@ with tabs[0]:
     except Exception as e:
         st.error(f"Error: {str(e)}")
 
-with tabs[1]:
+with tabs[1], oci_perf.section(tab_labels[1]):
     st.markdown("# **Network Management 🌐**")
     try:
         oci_manager = OCIManager(region=st.session_state["oci_region"])
@@ -228,29 +425,71 @@ with tabs[1]:
         if selected_compartment_id:
             # Virtual Cloud Networks section (no expander)
             st.markdown("## Virtual Cloud Networks 🌩️")
-            if st.button("Create New VCN", key="create_vcn_button"):
+            col1, col2 = st.columns(2)
+            if col1.button("Create New VCN", key="create_vcn_button"):
                 st.session_state.show_create_vcn = True
+            if col2.button("Provision from Blueprint 🧩", key="blueprint_button"):
+                st.session_state.show_blueprint = True
+            if st.session_state.get('show_blueprint', False):
+                with st.form("blueprint_form"):
+                    st.subheader("Provision a Whole Network 🧩")
+                    st.markdown("Describe the VCN, gateways, route tables, security lists and subnets in one "
+                                "JSON (or YAML) blueprint. Independent resources are created in parallel; "
+                                "if anything fails, everything created so far is rolled back. 🔙")
+                    blueprint_text = st.text_area("Blueprint", value=EXAMPLE_BLUEPRINT, height=300)
+                    if st.form_submit_button("Provision"):
+                        try:
+                            ids = run_with_resource_progress(
+                                oci_blueprint.provision_blueprint, oci_manager, selected_compartment_id,
+                                oci_blueprint.parse_blueprint(blueprint_text)
+                            )
+                            st.success(f"Network provisioned: {len(ids)} resources created! 🎉")
+                            st.session_state.show_blueprint = False
+                            ui_state.invalidate("network_index", "security_rule_index")
+                            LaunchCatalog.invalidate_subnets(oci_manager, selected_compartment_id)
+                        except Exception as e:
+                            st.error(f"Error provisioning blueprint: {str(e)} 😬")
             if st.session_state.get('show_create_vcn', False):
+                network_index = get_network_index(oci_manager, selected_compartment_id)
+                suggested_cidr = network_index.suggest_vcn_cidr()
                 with st.form("create_vcn_form"):
                     st.subheader("Create New VCN 🆕")
                     vcn_name = st.text_input("VCN Name")
-                    cidr_block = st.text_input("CIDR Block (e.g., 10.0.0.0/16)")
+                    cidr_block = st.text_input("CIDR Block (e.g., 10.0.0.0/16)", value=suggested_cidr or "")
+                    if suggested_cidr:
+                        st.caption(f"💡 {suggested_cidr} is the next free /16 in this compartment")
                     dns_label = st.text_input("DNS Label (optional)")
                     is_ipv6 = st.checkbox("Enable IPv6")
                     if st.form_submit_button("Create"):
-                        try:
-                            result = oci_manager.create_vcn(
-                                selected_compartment_id,
-                                vcn_name,
-                                cidr_block,
-                                dns_label if dns_label else None,
-                                is_ipv6
-                            )
-                            st.success(f"VCN {vcn_name} created successfully! 🎉")
-                            st.session_state.show_create_vcn = False
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error creating VCN: {str(e)} 😬")
+                        cidr_ok, cidr_message = network_index.check_vcn_cidr(cidr_block)
+                        if not cidr_ok:
+                            st.error(f"{cidr_message} 😬")
+                        else:
+                            if cidr_message:
+                                st.warning(f"{cidr_message} ⚠️")
+                            try:
+                                result = oci_manager.create_vcn(
+                                    selected_compartment_id,
+                                    vcn_name,
+                                    cidr_block,
+                                    dns_label if dns_label else None,
+                                    is_ipv6
+                                )
+                                st.success(f"VCN {vcn_name} created successfully! 🎉")
+                                if cidr_message:
+                                    # Shown again after the rerun below
+                                    ui_state.scope("vcns", selected_compartment_id).set("cidr_warning", cidr_message)
+                                st.session_state.show_create_vcn = False
+                                ui_state.invalidate("network_index")
+                                LaunchCatalog.invalidate_subnets(oci_manager, selected_compartment_id)
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error creating VCN: {str(e)} 😬")
+            # Which VCN the subnet form or teardown confirmation is open for
+            vcn_ui = ui_state.scope("vcns", selected_compartment_id)
+            cidr_warning = vcn_ui.pop("cidr_warning")
+            if cidr_warning:
+                st.warning(f"{cidr_warning} ⚠️")
             vcns = oci_manager.list_vcns(selected_compartment_id)
             if vcns:
                 st.markdown("Your clouds are ready to connect! ☁️")
@@ -268,18 +507,64 @@ with tabs[1]:
                     cols[3].write(f"{len(security_lists)} security lists")
                     action_col = cols[4]
                     if action_col.button("Create Subnet", key=f"create_subnet_{vcn['id']}"):
-                        st.session_state.selected_vcn = vcn
-                        st.session_state.show_create_subnet = True
+                        vcn_ui.set("create_subnet", vcn)
                     if action_col.button("Delete VCN", key=f"delete_vcn_{vcn['id']}"):
-                        if st.warning(f"Are you sure you want to delete VCN {vcn['name']}? ⚠️"):
+                        vcn_ui.set("teardown", vcn)
+            else:
+                st.info("No VCNs found in this compartment. 🌫️")
+            teardown_target = vcn_ui.get("teardown")
+            if teardown_target:
+                try:
+                    _, teardown_resources, _ = oci_teardown.plan_teardown(oci_manager, teardown_target["id"])
+                    st.warning(f"Deleting VCN {teardown_target['name']} also deletes everything in it: "
+                               f"{len(teardown_resources) - 1} resources ⚠️")
+                    st.dataframe([{"Kind": r["kind"], "Name": r["name"]} for r in teardown_resources.values()],
+                                 use_container_width=True)
+                    col1, col2 = st.columns(2)
+                    if col1.button("Yes, delete everything 🗑️", type="primary", key="confirm_teardown"):
+                        run_with_resource_progress(oci_teardown.teardown_vcn, oci_manager, teardown_target["id"])
+                        st.success(f"VCN {teardown_target['name']} deleted successfully! 🗑️")
+                        vcn_ui.pop("teardown")
+                        ui_state.invalidate("network_index", "security_rule_index")
+                        LaunchCatalog.invalidate_subnets(oci_manager, selected_compartment_id)
+                    if col2.button("Cancel", key="cancel_teardown"):
+                        vcn_ui.pop("teardown")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Error deleting VCN: {str(e)} 😬")
+            subnet_vcn = vcn_ui.get("create_subnet")
+            if subnet_vcn:
+                network_index = get_network_index(oci_manager, selected_compartment_id)
+                suggested_subnets = network_index.suggest_subnet_cidr(subnet_vcn["id"], 24, limit=5)
+                with st.form("create_subnet_form"):
+                    st.subheader(f"Create Subnet in {subnet_vcn['name']} 🆕")
+                    subnet_name = st.text_input("Subnet Name")
+                    subnet_cidr = st.text_input("CIDR Block", value=suggested_subnets[0] if suggested_subnets else "")
+                    if suggested_subnets:
+                        st.caption(f"💡 Free /24 blocks in this VCN: {', '.join(suggested_subnets)}")
+                    subnet_type = st.selectbox("Subnet Type", ["PUBLIC", "PRIVATE"])
+                    subnet_dns_label = st.text_input("DNS Label (optional)")
+                    if st.form_submit_button("Create"):
+                        cidr_ok, cidr_message = network_index.check_subnet_cidr(subnet_vcn["id"], subnet_cidr)
+                        if not cidr_ok:
+                            st.error(f"{cidr_message} 😬")
+                        else:
                             try:
-                                oci_manager.delete_vcn(vcn["id"])
-                                st.success(f"VCN {vcn['name']} deleted successfully! 🗑️")
+                                result = oci_manager.create_subnet(
+                                    selected_compartment_id,
+                                    subnet_vcn["id"],
+                                    subnet_name,
+                                    subnet_cidr,
+                                    subnet_type,
+                                    subnet_dns_label if subnet_dns_label else None
+                                )
+                                st.success(f"Subnet {subnet_name} created successfully! 🎉")
+                                vcn_ui.pop("create_subnet")
+                                ui_state.invalidate("network_index")
+                                LaunchCatalog.invalidate_subnets(oci_manager, selected_compartment_id)
                                 st.rerun()
                             except Exception as e:
-                                st.error(f"Error deleting VCN: {str(e)} 😬")
-            else:
-                st.info("No VCNs found in this compartment. 🌫️")
+                                st.error(f"Error creating subnet: {str(e)} 😬")
             # Security Lists section (no expander)
             st.markdown("## Security Lists 🔒")
             if st.button("Create New Security List", key="create_security_list_button"):
@@ -334,30 +619,16 @@ with tabs[1]:
                             })
                     if st.form_submit_button("Create Security List"):
                         try:
-                            oci_ingress_rules = []
-                            for rule in ingress_rules:
-                                oci_ingress_rules.append({
-                                    "protocol": rule["protocol"],
-                                    "source": rule["source"],
-                                    "tcpOptions": {
-                                        "destinationPortRange": {
-                                            "min": rule["port_min"],
-                                            "max": rule["port_max"]
-                                        }
-                                    } if rule["protocol"] in ["TCP", "UDP"] else None
-                                })
-                            oci_egress_rules = []
-                            for rule in egress_rules:
-                                oci_egress_rules.append({
-                                    "protocol": rule["protocol"],
-                                    "destination": rule["destination"],
-                                    "tcpOptions": {
-                                        "destinationPortRange": {
-                                            "min": rule["port_min"],
-                                            "max": rule["port_max"]
-                                        }
-                                    } if rule["protocol"] in ["TCP", "UDP"] else None
-                                })
+                            oci_ingress_rules = [
+                                build_security_rule("INGRESS", normalize_protocol(rule["protocol"]), rule["source"],
+                                                    rule["port_min"], rule["port_max"])
+                                for rule in ingress_rules
+                            ]
+                            oci_egress_rules = [
+                                build_security_rule("EGRESS", normalize_protocol(rule["protocol"]), rule["destination"],
+                                                    rule["port_min"], rule["port_max"])
+                                for rule in egress_rules
+                            ]
                             result = oci_manager.create_security_list(
                                 selected_compartment_id,
                                 vcn_options[selected_vcn_name],
@@ -367,9 +638,11 @@ with tabs[1]:
                             )
                             st.success(f"Security List {security_list_name} created successfully!")
                             st.session_state.show_create_security_list = False
+                            ui_state.invalidate("security_rule_index")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error creating security list: {str(e)}")
+            sl_ui = ui_state.scope("security_lists", selected_compartment_id)
             for vcn in vcns:
                 st.markdown(f"### Security Lists in VCN: {vcn['name']} 🔐")
                 security_lists = oci_manager.list_security_lists(selected_compartment_id, vcn["id"])
@@ -380,38 +653,119 @@ with tabs[1]:
                         col.write(f"**{header}**")
                     for sl in security_lists:
                         cols = st.columns([3, 2, 2, 2])
-                        sl_details = oci_manager.get_security_list(sl["id"])
                         cols[0].write(sl["name"])
-                        cols[1].write(f"{len(sl_details['ingress_rules'])} rules")
-                        cols[2].write(f"{len(sl_details['egress_rules'])} rules")
+                        cols[1].write(f"{sl['ingress_count']} rules")
+                        cols[2].write(f"{sl['egress_count']} rules")
                         action_col = cols[3]
                         if action_col.button("View Rules", key=f"view_rules_{sl['id']}"):
-                            st.session_state.selected_security_list_id = sl["id"]
+                            sl_ui.set("view_rules", sl["id"])
                         if action_col.button("Delete", key=f"delete_sl_{sl['id']}"):
-                            if st.warning(f"Are you sure you want to delete Security List {sl['name']}? ⚠️"):
-                                try:
-                                    oci_manager.delete_security_list(sl["id"])
-                                    st.success(f"Security List {sl['name']} deleted successfully! 🗑️")
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Error deleting security list: {str(e)} 😬")
-                        if st.session_state.get('selected_security_list_id') == sl["id"]:
+                            sl_ui.set("confirm_delete", sl)
+                        if sl_ui.get("view_rules") == sl["id"]:
+                            sl_details = oci_manager.get_security_list(sl["id"])
                             st.markdown("**Ingress Rules** 🟢")
                             for i, rule in enumerate(sl_details['ingress_rules']):
+                                rule = security_rule_to_dict(rule)
                                 st.write(f"Rule {i+1}:")
-                                st.write(f"- Protocol: {rule['protocol']}")
-                                st.write(f"- Source: {rule['source']}")
-                                if 'tcpOptions' in rule and rule['tcpOptions']:
-                                    st.write(f"- Port Range: {rule['tcpOptions']['destinationPortRange']['min']}-{rule['tcpOptions']['destinationPortRange']['max']}")
+                                st.write(f"- Protocol: {PROTOCOL_NAMES.get(rule['protocol'], rule['protocol'])}")
+                                st.write(f"- Source: {rule['cidr']}")
+                                if rule['port_min'] is not None:
+                                    st.write(f"- Port Range: {rule['port_min']}-{rule['port_max']}")
                             st.markdown("**Egress Rules** 🔵")
                             for i, rule in enumerate(sl_details['egress_rules']):
+                                rule = security_rule_to_dict(rule)
                                 st.write(f"Rule {i+1}:")
-                                st.write(f"- Protocol: {rule['protocol']}")
-                                st.write(f"- Destination: {rule['destination']}")
-                                if 'tcpOptions' in rule and rule['tcpOptions']:
-                                    st.write(f"- Port Range: {rule['tcpOptions']['destinationPortRange']['min']}-{rule['tcpOptions']['destinationPortRange']['max']}")
+                                st.write(f"- Protocol: {PROTOCOL_NAMES.get(rule['protocol'], rule['protocol'])}")
+                                st.write(f"- Destination: {rule['cidr']}")
+                                if rule['port_min'] is not None:
+                                    st.write(f"- Port Range: {rule['port_min']}-{rule['port_max']}")
                 else:
                     st.info("No Security Lists found in this VCN. 🛡️")
+            delete_target = sl_ui.get("confirm_delete")
+            if delete_target:
+                st.warning(f"Are you sure you want to delete Security List {delete_target['name']}? ⚠️")
+                col1, col2 = st.columns(2)
+                if col1.button("Yes, delete it 🗑️", type="primary", key="confirm_delete_sl"):
+                    try:
+                        oci_manager.delete_security_list(delete_target["id"])
+                        st.success(f"Security List {delete_target['name']} deleted successfully! 🗑️")
+                        sl_ui.pop("confirm_delete")
+                        ui_state.invalidate("network_index", "security_rule_index")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error deleting security list: {str(e)} 😬")
+                if col2.button("Cancel", key="cancel_delete_sl"):
+                    sl_ui.pop("confirm_delete")
+                    st.rerun()
+            # Bulk rule changes (no expander)
+            st.markdown("#### Bulk Rule Changes 📝")
+            st.markdown("Upload a YAML or CSV change set; only security lists whose rules actually change are updated.")
+            rule_changes_file = st.file_uploader("Rule change set", type=["yaml", "yml", "csv"], key="rule_changes_file")
+            rule_changes_dry_run = st.checkbox("Dry run (show diffs only)", value=True, key="rule_changes_dry_run")
+            if rule_changes_file is not None and st.button("Apply Rule Changes ✅", key="apply_rule_changes"):
+                try:
+                    text = rule_changes_file.getvalue().decode("utf-8")
+                    if rule_changes_file.name.lower().endswith(".csv"):
+                        changes = oci_rule_changes.parse_csv_changes(text.splitlines())
+                    else:
+                        changes = oci_rule_changes.parse_yaml_changes(text)
+                    with st.spinner("Applying rule changes... ⏳"), \
+                            oci_scheduler.call_context(priority=oci_scheduler.BULK):
+                        results = list(oci_rule_changes.apply_rule_changes(
+                            oci_manager, changes, get_rule_index(oci_manager, selected_compartment_id),
+                            rule_changes_dry_run
+                        ))
+                    st.dataframe([
+                        {"Security List": r.get("name") or r["security_list_id"], "Status": r["status"],
+                         "Added": "; ".join(r.get("added", [])), "Removed": "; ".join(r.get("removed", [])),
+                         "Error": r.get("error", "")}
+                        for r in results
+                    ], use_container_width=True)
+                    if not rule_changes_dry_run and any(r["status"] == "updated" for r in results):
+                        ui_state.invalidate("security_rule_index")
+                        st.success("Rule changes applied! 🎉")
+                except Exception as e:
+                    st.error(f"Error applying rule changes: {str(e)}")
+            # Security Analysis section (no expander)
+            st.markdown("## Security Analysis 🔎")
+            st.markdown("Who can reach what? Ask across every security list in this compartment at once. 🕵️")
+            rule_index = get_rule_index(oci_manager, selected_compartment_id)
+            col1, col2, col3, col4 = st.columns(4)
+            analysis_protocol = col1.selectbox("Protocol", ["TCP", "UDP", "ICMP", "ALL"], key="analysis_protocol")
+            analysis_port = col2.number_input("Port", min_value=1, max_value=65535, value=22, key="analysis_port")
+            analysis_cidr = col3.text_input("Source/Destination CIDR", value="0.0.0.0/0", key="analysis_cidr")
+            analysis_direction = col4.selectbox("Direction", ["INGRESS", "EGRESS"], key="analysis_direction")
+            try:
+                allowed = rule_index.reachable(
+                    analysis_protocol,
+                    analysis_port if analysis_protocol in ["TCP", "UDP"] else None,
+                    analysis_cidr,
+                    analysis_direction
+                )
+                if allowed:
+                    st.warning(f"{len(allowed)} security lists allow {analysis_protocol}/{analysis_port} "
+                               f"{'from' if analysis_direction == 'INGRESS' else 'to'} {analysis_cidr} ⚠️")
+                    st.dataframe([
+                        {"Security List": sl["name"], "Matching Rules": "; ".join(describe_rule(r) for r in sl["rules"])}
+                        for sl in allowed
+                    ], use_container_width=True)
+                else:
+                    st.success("No security list allows this traffic. 🛡️")
+            except ValueError as e:
+                st.error(f"Invalid CIDR: {str(e)}")
+            exposure = rule_index.exposure()
+            with st.expander(f"Internet exposure: {len(exposure)} findings 🌍"):
+                st.dataframe([
+                    {"Security List": r["security_list_name"], "Finding": r["finding"], "Rule": describe_rule(r)}
+                    for r in exposure
+                ], use_container_width=True)
+            redundant = rule_index.redundant_rules()
+            with st.expander(f"Duplicate or shadowed rules: {len(redundant)} 🧹"):
+                st.dataframe([
+                    {"Security List": r["security_list_name"], "Finding": r["finding"], "Rule": describe_rule(r),
+                     "Covered By": describe_rule(rule_index.rules[r["covered_by"]])}
+                    for r in redundant
+                ], use_container_width=True)
             # Route Tables section (no expander)
             st.markdown("## Route Tables 🛣️")
             if st.button("Add Route Table", key="create_route_table_button"):
@@ -605,40 +959,93 @@ with tabs[1]:
         st.error(f"Error: {str(e)} 😬")
 
 # Instance Management Tab
-with tabs[2]:
+with tabs[2], oci_perf.section(tab_labels[2]):
     st.markdown("# **Instance Management 🖥️**")
     try:
         oci_manager = OCIManager(region=st.session_state["oci_region"])
         selected_compartment_id = st.session_state["oci_compartment_id"]
         if selected_compartment_id:
-            if st.button("Create Compute", key="create_compute_button"):
+            col1, col2 = st.columns(2)
+            if col1.button("Create Compute", key="create_compute_button"):
                 st.session_state.show_create_compute = True
-            if st.session_state.get('show_create_compute', False):
+                st.session_state.show_launch_fleet = False
+            if col2.button("Launch Fleet 🚀", key="launch_fleet_button"):
+                st.session_state.show_launch_fleet = True
+                st.session_state.show_create_compute = False
+            show_create_compute = st.session_state.get('show_create_compute', False)
+            show_launch_fleet = st.session_state.get('show_launch_fleet', False)
+            if show_create_compute or show_launch_fleet:
+                catalog = LaunchCatalog.load(oci_manager, selected_compartment_id)
+                # Filters live outside the form so changing them narrows the lists right away
+                col1, col2, col3 = st.columns(3)
+                image_os = col1.selectbox("Operating System", ["All"] + catalog.operating_systems,
+                                          key="compute_image_os")
+                image_arch = col2.selectbox("Architecture", ["All", "x86_64", "aarch64"], key="compute_image_arch")
+                shape_names = [shape["name"] for shape in catalog.filter_shapes(
+                    None if image_arch == "All" else image_arch)]
+                shape_name = col3.selectbox("Shape", options=shape_names, key="compute_shape")
                 with st.form("create_compute_form"):
-                    st.subheader("Create Compute Instance 🆕")
-                    instance_name = st.text_input("Instance Name")
-                    images = oci_manager.list_images(selected_compartment_id)
+                    if show_create_compute:
+                        st.subheader("Create Compute Instance 🆕")
+                        instance_name = st.text_input("Instance Name")
+                    else:
+                        st.subheader("Launch a Fleet 🚀")
+                        instance_name = st.text_input("Name Pattern ({index} is replaced by 1, 2, 3...)",
+                                                      value="fleet-{index:02d}")
+                    images = catalog.filter_images(None if image_os == "All" else image_os, shape=shape_name)
                     image_options = {img["name"]: img["id"] for img in images}
                     image_name = st.selectbox("Image", options=list(image_options.keys()))
-                    shapes = oci_manager.list_shapes(selected_compartment_id)
-                    shape_options = [shape["name"] for shape in shapes]
-                    shape_name = st.selectbox("Shape", options=shape_options)
-                    subnets = []
-                    vcns = oci_manager.list_vcns(selected_compartment_id)
-                    for vcn in vcns:
-                        subnets.extend(oci_manager.list_subnets(selected_compartment_id, vcn["id"]))
-                    subnet_options = {subnet["name"]: subnet["id"] for subnet in subnets}
-                    subnet_name = st.selectbox("Subnet", options=list(subnet_options.keys()))
+                    subnet_options = {f"{subnet['name']} ({subnet['vcn_name']})": subnet["id"]
+                                      for subnet in catalog.subnets}
+                    if show_create_compute:
+                        subnet_name = st.selectbox("Subnet", options=list(subnet_options.keys()))
+                        availability_domain = st.selectbox("Availability Domain", options=catalog.availability_domains)
+                    else:
+                        instance_count = st.number_input("Number of Instances", min_value=1, max_value=500, value=10)
+                        fleet_subnets = st.multiselect("Subnets (instances are spread across them)",
+                                                       options=list(subnet_options.keys()))
+                        fleet_ads = st.multiselect("Availability Domains", options=catalog.availability_domains,
+                                                   default=catalog.availability_domains)
+                        fleet_overrides = st.text_area(
+                            "Per-instance overrides (optional JSON list, e.g. "
+                            '[{"display_name": "db-1", "shape_config": {"ocpus": 4, "memory_in_gbs": 64}}])'
+                        )
+                        fleet_concurrency = st.slider("Parallel launches", min_value=1, max_value=10, value=5)
                     ssh_key = st.text_area("SSH Public Key")
                     boot_volume_size = st.number_input("Boot Volume Size (GB, optional)", min_value=0, value=0)
                     shape_config = None
-                    if ".Flex" in shape_name:
+                    limits = catalog.shape_limits(shape_name) if shape_name else {}
+                    if limits:
                         st.markdown("**This is a Flex shape. Please specify OCPUs and Memory (GB).**")
-                        ocpus = st.number_input("OCPUs", min_value=1, value=1, step=1)
-                        memory = st.number_input("Memory (GB)", min_value=1, value=6, step=1)
+                        ocpu_min, ocpu_max = int(limits["ocpu_min"] or 1), int(limits["ocpu_max"] or 64)
+                        memory_min = int(limits["memory_min_in_gbs"] or 1)
+                        memory_max = int(limits["memory_max_in_gbs"] or 1024)
+                        memory_default = int((limits["memory_per_ocpu_in_gbs"] or 6) * ocpu_min)
+                        ocpus = st.number_input("OCPUs", min_value=ocpu_min, max_value=ocpu_max, value=ocpu_min, step=1)
+                        memory = st.number_input("Memory (GB)", min_value=memory_min, max_value=memory_max,
+                                                 value=min(max(memory_default, memory_min), memory_max), step=1)
                         shape_config = {"ocpus": ocpus, "memory_in_gbs": memory}
-                    if st.form_submit_button("Create"):
+                    if show_launch_fleet and st.form_submit_button("Launch Fleet"):
+                        try:
+                            specs = oci_fleet.plan_fleet(
+                                image_options[image_name],
+                                shape_name,
+                                [subnet for subnet in catalog.subnets
+                                 if subnet["id"] in {subnet_options[name] for name in fleet_subnets}],
+                                fleet_ads,
+                                ssh_key,
+                                count=instance_count,
+                                name_pattern=instance_name,
+                                shape_config=shape_config,
+                                boot_volume_size_in_gbs=boot_volume_size if boot_volume_size > 0 else None,
+                                overrides=json.loads(fleet_overrides) if fleet_overrides.strip() else None
+                            )
+                            launch_fleet_with_progress(oci_manager, selected_compartment_id, specs, fleet_concurrency)
+                        except Exception as e:
+                            st.error(f"Error launching fleet: {str(e)} 😬")
+                    if show_create_compute and st.form_submit_button("Create"):
                         try:
+                            subnet_ads = catalog.subnet_availability_domains(subnet_options[subnet_name])
                             result = oci_manager.launch_instance(
                                 compartment_id=selected_compartment_id,
                                 display_name=instance_name,
@@ -647,7 +1054,9 @@ with tabs[2]:
                                 subnet_id=subnet_options[subnet_name],
                                 ssh_public_key=ssh_key,
                                 boot_volume_size_in_gbs=boot_volume_size if boot_volume_size > 0 else None,
-                                shape_config=shape_config
+                                shape_config=shape_config,
+                                availability_domain=availability_domain if availability_domain in subnet_ads
+                                else subnet_ads[0]
                             )
                             st.success(f"Instance {instance_name} created successfully!")
                             st.session_state.show_create_compute = False
@@ -659,6 +1068,22 @@ with tabs[2]:
             instances = oci_manager.list_instances(selected_compartment_id)
             if instances:
                 st.markdown("Here are your mighty compute warriors! ⚔️")
+                utilization = {}
+                util_col, window_col = st.columns([2, 3])
+                if util_col.toggle("Show utilization 📊", key="instance_utilization"):
+                    util_window = window_col.radio("Window", options=list(oci_metrics.WINDOWS), index=2,
+                                                   horizontal=True, key="instance_metrics_window")
+                    try:
+                        with oci_perf.section("Instance utilization"):
+                            utilization = oci_metrics.instance_utilization(
+                                instances,
+                                oci_metrics.fetch_instance_metrics(oci_manager, selected_compartment_id, util_window)
+                            )
+                    except Exception as e:
+                        st.error(f"Error loading instance metrics: {str(e)} 📉")
+                    candidates = [u for u in utilization.values() if u["recommendation"] in ("idle", "downsize")]
+                    if candidates:
+                        st.warning(f"{len(candidates)} right-sizing candidate(s) found 💸")
                 cols = st.columns([3, 2, 2, 2, 2, 3])
                 headers = ["Name", "State", "Shape", "Private IP", "Public IP", "Actions"]
                 for col, header in zip(cols, headers):
@@ -666,6 +1091,17 @@ with tabs[2]:
                 for instance in instances:
                     cols = st.columns([3, 2, 2, 2, 2, 3])
                     cols[0].write(instance["name"])
+                    usage = utilization.get(instance["id"])
+                    if usage and usage["cpu_p95"] is not None:
+                        cols[0].caption(f"CPU p50/p95 {usage['cpu_p50']:g}/{usage['cpu_p95']:g}% · "
+                                        f"Mem p95 {usage['memory_p95'] if usage['memory_p95'] is not None else '-'}%")
+                    if usage and usage["recommendation"] == "idle":
+                        cols[0].write(":orange[💤 Idle: consider stopping]")
+                    elif usage and usage["recommendation"] == "downsize":
+                        target = f" to {usage['suggested_ocpus']} OCPU" if usage["suggested_ocpus"] else ""
+                        cols[0].write(f":orange[🔽 Oversized: downsize{target}]")
+                    elif usage and usage["recommendation"] == "no data":
+                        cols[0].caption("No agent metrics")
                     state = instance["state"]
                     state_color = {
                         "RUNNING": "green",
@@ -711,7 +1147,7 @@ with tabs[2]:
         st.error(f"Error: {str(e)} 😬")
 
 # Autonomous Database Tab
-with tabs[3]:
+with tabs[3], oci_perf.section(tab_labels[3]):
     st.markdown("# **Autonomous Database Management 🍀**")
     try:
         oci_manager = OCIManager(region=st.session_state["oci_region"])
@@ -757,14 +1193,50 @@ with tabs[3]:
             dbs = oci_manager.list_autonomous_databases(selected_compartment_id)
             if dbs:
                 st.markdown("Your smart databases are ready to serve! 🧠")
-                cols = st.columns([3, 2, 2, 2, 2, 3])
-                headers = ["Name", "State", "Workload", "OCPUs", "Storage (TB)", "Actions"]
+                metrics_window = st.radio("Utilization window 📈", options=list(oci_metrics.WINDOWS), index=1,
+                                          horizontal=True, key="adb_metrics_window")
+                with oci_perf.section("ADB utilization"):
+                    try:
+                        adb_metrics = oci_metrics.fetch_adb_metrics(oci_manager, selected_compartment_id,
+                                                                    metrics_window)
+                    except Exception as e:
+                        st.error(f"Error loading database metrics: {str(e)} 📉")
+                        adb_metrics = {}
+                    st.dataframe(
+                        [dict(row, db_workload=db["db_workload"],
+                              data_storage_size_in_tbs=db["data_storage_size_in_tbs"],
+                              service_console_url=db.get("service_console_url"))
+                         for row, db in zip(oci_metrics.utilization_rows(dbs, adb_metrics), dbs)],
+                        column_order=["display_name", "lifecycle_state", "db_workload", "cpu_core_count",
+                                      "data_storage_size_in_tbs", "cpu", "cpu_avg", "cpu_max", "storage_percent",
+                                      "sessions", "sessions_max", "status", "service_console_url"],
+                        column_config={
+                            "display_name": "Name",
+                            "lifecycle_state": "State",
+                            "db_workload": "Workload",
+                            "cpu_core_count": "OCPUs",
+                            "data_storage_size_in_tbs": "Storage (TB)",
+                            "cpu": st.column_config.LineChartColumn("CPU %", y_min=0, y_max=100),
+                            "cpu_avg": st.column_config.NumberColumn("Avg CPU %"),
+                            "cpu_max": st.column_config.NumberColumn("Peak CPU %"),
+                            "storage_percent": st.column_config.ProgressColumn(
+                                "Storage Used", format="%.1f%%", min_value=0, max_value=100),
+                            "sessions": st.column_config.LineChartColumn("Sessions", y_min=0),
+                            "sessions_max": "Peak Sessions",
+                            "status": "Status",
+                            "service_console_url": st.column_config.LinkColumn("ORDS", display_text="Open ORDS"),
+                        },
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                # Per-database actions
+                cols = st.columns([3, 2, 5])
+                headers = ["Name", "State", "Actions"]
                 for col, header in zip(cols, headers):
                     col.write(f"**{header}**")
                 for db in dbs:
-                    cols = st.columns([3, 2, 2, 2, 2, 3])
+                    cols = st.columns([3, 2, 5])
                     cols[0].write(db["display_name"])
-                    cols[0].write(f"ORDS URL: {db.get('service_console_url')}")
                     state = db["lifecycle_state"]
                     state_color = {
                         "AVAILABLE": "green",
@@ -775,13 +1247,7 @@ with tabs[3]:
                         "TERMINATING": "orange"
                     }.get(state, "black")
                     cols[1].write(f":{state_color}[{state}]")
-                    cols[2].write(db["db_workload"])
-                    cols[3].write(str(db["cpu_core_count"]))
-                    cols[4].write(str(db["data_storage_size_in_tbs"]))
-                    action_col = cols[5]
-                    if db.get("service_console_url"):
-                        ords_url = db["service_console_url"]
-                        action_col.markdown(f"[Open ORDS]({ords_url}){{:target=\"_blank\"}}", unsafe_allow_html=True)
+                    action_col = cols[2]
                     if state == "AVAILABLE":
                         if action_col.button("Stop", key=f"stop_db_{db['id']}"):
                             try:
@@ -815,7 +1281,7 @@ with tabs[3]:
         st.error(f"Error: {str(e)} 😬")
 
 # Object Storage Tab
-with tabs[4]:
+with tabs[4], oci_perf.section(tab_labels[4]):
     st.markdown("# **Object Storage Management 📦**")
     try:
         oci_manager = OCIManager(region=st.session_state["oci_region"])
@@ -858,107 +1324,53 @@ with tabs[4]:
                 st.markdown("Your storage containers are ready! 🎯")
                 for bucket in buckets:
                     with st.expander(f"📦 {bucket['name']} ({bucket['storage_tier']})"):
-                        # File Upload Section
+                        # Open confirmations and the upload/download links of this bucket's objects
+                        objects_ui = ui_state.scope("objects", bucket['name'])
+                        # File Upload Section: files go from the browser straight to Object Storage
+                        # through a write-only pre-authenticated URL; no object bytes pass through here
                         st.markdown("### Upload Files 📤")
-                        uploaded_file = st.file_uploader(
-                            "Choose a file to upload",
-                            key=f"uploader_{bucket['name']}"
-                        )
-                        
-                        if uploaded_file is not None:
-                            upload_key = f"upload_{bucket['name']}"
-                            
-                            # Initialize dialog state if not exists
-                            if f"show_upload_dialog_{upload_key}" not in st.session_state:
-                                st.session_state[f"show_upload_dialog_{upload_key}"] = False
-                            
-                            # Show dialog if state is True
-                            if st.session_state[f"show_upload_dialog_{upload_key}"]:
-                                st.dialog("File Already Exists")
-                                st.warning(f"A file named '{uploaded_file.name}' already exists in this bucket. What would you like to do? 🤔")
-                                col1, col2, col3 = st.columns(3)
-                                
-                                if col1.button("Replace", type="primary"):
-                                    try:
-                                        oci_manager.upload_object(
-                                            bucket_name=bucket['name'],
-                                            object_name=uploaded_file.name,
-                                            file_data=uploaded_file.getvalue()
-                                        )
-                                        st.success(f"File {uploaded_file.name} replaced successfully! 🎉")
-                                        st.session_state[f"show_upload_dialog_{upload_key}"] = False
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Error replacing file: {str(e)}")
-                                
-                                if col2.button("Keep Both"):
-                                    try:
-                                        # Add "copy" to the filename
-                                        name_parts = uploaded_file.name.rsplit('.', 1)
-                                        new_name = f"{name_parts[0]}_copy.{name_parts[1]}" if len(name_parts) > 1 else f"{name_parts[0]}_copy"
-                                        
-                                        # Check if the copy name already exists
-                                        existing_objects = oci_manager.list_objects(bucket['name'])
-                                        copy_exists = any(obj['name'] == new_name for obj in existing_objects)
-                                        
-                                        if copy_exists:
-                                            # If copy exists, add a number to make it unique
-                                            counter = 1
-                                            while any(obj['name'] == f"{name_parts[0]}_copy{counter}.{name_parts[1]}" if len(name_parts) > 1 else f"{name_parts[0]}_copy{counter}" for obj in existing_objects):
-                                                counter += 1
-                                            new_name = f"{name_parts[0]}_copy{counter}.{name_parts[1]}" if len(name_parts) > 1 else f"{name_parts[0]}_copy{counter}"
-                                        
-                                        # Upload the file with the new name
-                                        oci_manager.upload_object(
-                                            bucket_name=bucket['name'],
-                                            object_name=new_name,
-                                            file_data=uploaded_file.getvalue()
-                                        )
-                                        st.success(f"File uploaded as {new_name} successfully! 🎉")
-                                        st.session_state[f"show_upload_dialog_{upload_key}"] = False
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Error uploading file: {str(e)}")
-                                
-                                if col3.button("Cancel"):
-                                    st.session_state[f"show_upload_dialog_{upload_key}"] = False
-                                    st.rerun()
-                            
-                            # Handle initial upload button click
-                            if st.button("Upload", key=upload_key):
+                        upload_link = objects_ui.get("upload_link")
+                        if upload_link is None:
+                            upload_prefix = st.text_input("Object name prefix (optional)",
+                                                          key=f"upload_prefix_{bucket['name']}")
+                            if st.button("Upload from this browser 🚀", key=f"upload_{bucket['name']}"):
                                 try:
-                                    # Check if file already exists
-                                    existing_objects = oci_manager.list_objects(bucket['name'])
-                                    file_exists = any(obj['name'] == uploaded_file.name for obj in existing_objects)
-                                    
-                                    if file_exists:
-                                        st.session_state[f"show_upload_dialog_{upload_key}"] = True
-                                        st.rerun()
-                                    else:
-                                        # If file doesn't exist, upload directly
-                                        oci_manager.upload_object(
-                                            bucket_name=bucket['name'],
-                                            object_name=uploaded_file.name,
-                                            file_data=uploaded_file.getvalue()
-                                        )
-                                        st.success(f"File {uploaded_file.name} uploaded successfully! 🎉")
-                                        st.rerun()
+                                    objects_ui.set("upload_link", oci_manager.create_upload_url(
+                                        bucket['name'], upload_prefix, UPLOAD_LINK_MINUTES
+                                    ), ttl=UPLOAD_LINK_MINUTES * MINUTE)
+                                    st.rerun()
                                 except Exception as e:
-                                    st.error(f"Error uploading file: {str(e)}")
+                                    st.error(f"Error creating upload link: {str(e)}")
+                        else:
+                            components.html(oci_browser_upload.upload_widget_html(upload_link["url"], upload_link["prefix"]),
+                                            height=oci_browser_upload.WIDGET_HEIGHT, scrolling=True)
+                            st.caption(f"Files go straight from your browser to {bucket['name']}/{upload_link['prefix']} ⚡ "
+                                       f"Big files upload in parallel parts. The link is valid for {UPLOAD_LINK_MINUTES} minutes.")
+                            if st.button("Done uploading ✅", key=f"upload_done_{bucket['name']}"):
+                                try:
+                                    oci_manager.delete_preauthenticated_request(bucket['name'], upload_link["id"])
+                                    objects_ui.pop("upload_link")
                                     st.rerun()
+                                except Exception as e:
+                                    st.error(f"Error revoking upload link: {str(e)}")
                         
                         # List Objects in Bucket
                         st.markdown("### Files in Bucket 📋")
                         objects = oci_manager.list_objects(bucket['name'])
                         
                         if objects:
-                            cols = st.columns([4, 2, 2, 1])
-                            headers = ["Name", "Size", "Last Modified", "Actions"]
+                            # Downloads go straight from Object Storage to the browser via a
+                            # short-lived pre-authenticated URL, so no object bytes pass through here
+                            download = objects_ui.get("download")
+                            if download:
+                                st.link_button(f"⬇️ Download {download['name']} (link valid for {DOWNLOAD_LINK_MINUTES} minutes)", download["url"])
+                            cols = st.columns([4, 2, 2, 1, 1])
+                            headers = ["Name", "Size", "Last Modified", "Download", "Delete"]
                             for col, header in zip(cols, headers):
                                 col.write(f"**{header}**")
                             
                             for obj in objects:
-                                cols = st.columns([4, 2, 2, 1])
+                                cols = st.columns([4, 2, 2, 1, 1])
                                 cols[0].write(obj['name'])
                                 # Format file size with proper handling of None values
                                 size = obj.get('size', 0)
@@ -976,32 +1388,68 @@ with tabs[4]:
                                 cols[1].write(size_str)
                                 cols[2].write(str(obj.get('time_modified', 'N/A')))
                                 
+                                if cols[3].button("⬇️", key=f"download_{bucket['name']}_{obj['name']}"):
+                                    try:
+                                        # Forgotten when the pre-authenticated URL expires
+                                        objects_ui.set("download", {
+                                            "name": obj['name'],
+                                            "url": oci_manager.create_download_url(bucket['name'], obj['name'],
+                                                                                   DOWNLOAD_LINK_MINUTES)
+                                        }, ttl=DOWNLOAD_LINK_MINUTES * MINUTE)
+                                        st.rerun()
+                                    except Exception as e:
+                                        st.error(f"Error creating download link: {str(e)}")
+                                
                                 # Delete button with confirmation dialog
                                 delete_key = f"delete_{bucket['name']}_{obj['name']}"
-                                if cols[3].button("🗑️", key=delete_key):
-                                    st.session_state[f"show_delete_dialog_{delete_key}"] = True
+                                if cols[4].button("🗑️", key=delete_key):
+                                    objects_ui.set("confirm_delete", obj['name'])
                                 
                                 # Show confirmation dialog if delete was clicked
-                                if st.session_state.get(f"show_delete_dialog_{delete_key}", False):
+                                if objects_ui.get("confirm_delete") == obj['name']:
                                     st.dialog("Confirm Delete")
                                     st.warning(f"Are you sure you want to delete {obj['name']}? This action cannot be undone! 😱")
                                     col1, col2 = st.columns(2)
-                                    if col1.button("Yes, Delete", type="primary"):
+                                    if col1.button("Yes, Delete", type="primary", key=f"confirm_{delete_key}"):
                                         try:
                                             oci_manager.delete_object(
                                                 bucket_name=bucket['name'],
                                                 object_name=obj['name']
                                             )
                                             st.success(f"File {obj['name']} deleted successfully! 🗑️")
-                                            st.session_state[f"show_delete_dialog_{delete_key}"] = False
+                                            objects_ui.pop("confirm_delete")
                                             st.rerun()
                                         except Exception as e:
                                             st.error(f"Error deleting file: {str(e)}")
-                                    if col2.button("Cancel"):
-                                        st.session_state[f"show_delete_dialog_{delete_key}"] = False
+                                    if col2.button("Cancel", key=f"cancel_{delete_key}"):
+                                        objects_ui.pop("confirm_delete")
                                         st.rerun()
                         else:
                             st.info("No files in this bucket. Time to upload some! 📤")
+
+                        # Bulk Actions Section
+                        st.markdown("### Bulk Actions ⚡")
+                        if objects:
+                            selected_objects = st.multiselect(
+                                "Select files to delete",
+                                options=[obj['name'] for obj in objects],
+                                key=f"bulk_select_{bucket['name']}"
+                            )
+                            if selected_objects and st.button(f"Delete {len(selected_objects)} selected files 🗑️",
+                                                              key=f"bulk_delete_{bucket['name']}"):
+                                if not run_bulk_operation(oci_bulk.bulk_delete, oci_manager, bucket['name'],
+                                                          names=selected_objects, total=len(selected_objects)):
+                                    st.success(f"Deleted {len(selected_objects)} files successfully! 🗑️")
+                                    st.rerun()
+                            bulk_prefix = st.text_input("Delete everything under prefix", key=f"bulk_prefix_{bucket['name']}")
+                            prefix_dry_run = st.checkbox("Dry run (only show what would be deleted)", value=True,
+                                                         key=f"bulk_prefix_dry_run_{bucket['name']}")
+                            if bulk_prefix and st.button("Delete prefix", key=f"bulk_prefix_delete_{bucket['name']}"):
+                                failures = run_bulk_operation(oci_bulk.bulk_delete, oci_manager, bucket['name'],
+                                                              prefix=bulk_prefix, dry_run=prefix_dry_run)
+                                if not failures and not prefix_dry_run:
+                                    st.success(f"Deleted everything under {bulk_prefix} successfully! 🗑️")
+                                    st.rerun()
             else:
                 st.info("No buckets found in this compartment. Create one to get started! 🚀")
         else:
@@ -1009,6 +1457,57 @@ with tabs[4]:
     except Exception as e:
         st.error(f"Error: {str(e)} 😬")
 
+def render_perf_overlay(profile):
+    """Sidebar breakdown of this rerun: sections, OCIManager calls, HTTP requests, session state."""
+    summary = profile.finish().summary()
+    state_sizes = oci_perf.state_sizes(st.session_state)
+    with st.sidebar:
+        st.markdown("## Performance ⏱️")
+        metric_cols = st.columns(2)
+        metric_cols[0].metric("Rerun", f"{summary['seconds'] * 1000:.0f} ms")
+        metric_cols[1].metric("OCI calls", summary["api_calls"], help=f"{summary['api_seconds']:.2f}s waiting on the API")
+        metric_cols = st.columns(2)
+        metric_cols[0].metric("Cache hits", f"{summary['cache_hits']}/{summary['cache_hits'] + summary['cache_misses']}")
+        metric_cols[1].metric("Peak memory", "n/a" if summary["peak_memory_mb"] is None
+                              else f"{summary['peak_memory_mb']:g} MB", help="tracemalloc peak (whole process)")
+        metric_cols = st.columns(2)
+        metric_cols[0].metric("Widgets", summary["widgets"])
+        metric_cols[1].metric("Session state", f"{sum(size for _, size in state_sizes) / 1024:.0f} KB")
+
+        st.markdown("#### Sections 🔥")
+        st.dataframe(
+            [{"Section": "\u2003" * row["depth"] + row["section"], "Start (ms)": row["start_ms"],
+              "Time (ms)": row["ms"], "Share": row["share"] * 100, "OCI calls": row["api_calls"],
+              "Widgets": row["widgets"]} for row in profile.section_rows()],
+            column_config={"Share": st.column_config.ProgressColumn(min_value=0, max_value=100, format="%.0f%%")},
+            hide_index=True, use_container_width=True
+        )
+        st.markdown("#### OCIManager calls 🛠️")
+        st.dataframe(
+            [{"Call": call.method, "Section": " › ".join(call.section), "Time (ms)": round(call.seconds * 1000, 1),
+              "OCI calls": call.api_calls, "Cache": call.cache or ""}
+             for call in sorted(profile.manager_calls, key=lambda call: call.start)],
+            hide_index=True, use_container_width=True
+        )
+        with st.expander(f"HTTP requests ({summary['api_calls']}) 🌐"):
+            st.dataframe(
+                [{"Request": call["operation"], "Status": call["status"], "Start (ms)": round(call["start"] * 1000, 1),
+                  "Time (ms)": round(call["seconds"] * 1000, 1), "Via": call["manager_call"] or "",
+                  "Section": " › ".join(call["section"])}
+                 for call in sorted(profile.api_calls, key=lambda call: call["start"])],
+                hide_index=True, use_container_width=True
+            )
+        with st.expander("Largest session state keys 🧳"):
+            ui_usage = ui_state.usage()
+            st.caption(f"UI state: {ui_usage['bytes'] / 1024:.0f} KB of {ui_usage['max_bytes'] / 2 ** 20:.0f} MB, "
+                       f"{ui_usage['entries']} entries and {ui_usage['cached_values']} cached indexes, "
+                       f"{ui_usage['evictions']} evicted")
+            st.dataframe([{"Key": key, "KB": round(size / 1024, 1)} for key, size in state_sizes[:10]],
+                         hide_index=True, use_container_width=True)
+
+if st.session_state.perf_profile:
+    render_perf_overlay(st.session_state.perf_profile)
+
 # Uncomment the following to ensure main() is called
 #    def main():
 #     st.write("Main function called")
@@ -0,0 +1,249 @@
+"""
+Declarative network blueprints.
+
+A blueprint describes a whole network in one document (YAML needs the optional
+PyYAML package; JSON always works):
+
+    vcn: {name: demo, cidr: 10.0.0.0/16, dns_label: demo}
+    internet_gateways: [{name: igw}]
+    nat_gateways: [{name: nat}]
+    service_gateways: [{name: sgw, services: [All IAD Services In Oracle Services Network]}]
+    route_tables:
+      - {name: public-rt, rules: [{destination: 0.0.0.0/0, target: igw}]}
+      - {name: private-rt, rules: [{destination: 0.0.0.0/0, target: nat}]}
+    security_lists:
+      - name: web-sl
+        ingress: [{protocol: tcp, cidr: 0.0.0.0/0, ports: 443}]
+        egress: [{protocol: all, cidr: 0.0.0.0/0}]
+    subnets:
+      - {name: public, cidr: 10.0.0.0/24, type: PUBLIC, route_table: public-rt, security_lists: [web-sl]}
+
+plan_blueprint turns it into a dependency graph (everything needs the VCN, route
+tables need the gateways they target, subnets need their route table and
+security lists). run_graph executes such a graph on a worker pool: every node
+starts as soon as all of its dependencies are done, so independent resources are
+created in parallel. When a step fails, nothing new is started and everything
+that was created is deleted again in reverse dependency order (rollback).
+"""
+import contextvars
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from oci_rule_changes import parse_rule_spec, rule_to_model
+from oci_utils import OCIManager
+
+# Blueprint section -> resource kind (as in OCIManager.create_<kind> / delete_<kind>)
+SECTIONS = {
+    "internet_gateways": "internet_gateway",
+    "nat_gateways": "nat_gateway",
+    "service_gateways": "service_gateway",
+    "route_tables": "route_table",
+    "security_lists": "security_list",
+    "subnets": "subnet",
+}
+
+
+class ResourceProgress:
+    """Per-resource state of a blueprint run or teardown, keyed by graph node."""
+
+    def __init__(self, on_update: Optional[Callable[["ResourceProgress"], None]] = None):
+        self.on_update = on_update
+        self.resources: Dict[str, Dict] = {}
+
+    def update(self, key: str, **fields) -> None:
+        kind, _, name = key.partition(":")
+        self.resources.setdefault(key, {"kind": kind, "name": name}).update(fields)
+        if self.on_update:
+            self.on_update(self)
+
+    def counts(self) -> Dict[str, int]:
+        states = [resource.get("state") for resource in list(self.resources.values())]
+        return {state: states.count(state) for state in sorted(set(states))}
+
+    def results(self) -> List[Dict]:
+        return [dict(resource) for resource in list(self.resources.values())]
+
+
+def load_blueprint(path: str) -> Dict:
+    with open(path, encoding="utf-8") as source:
+        return parse_blueprint(source.read(), os.path.splitext(path)[1].lower() == ".json")
+
+
+def parse_blueprint(text: str, is_json: Optional[bool] = None) -> Dict:
+    """Parse a JSON or YAML blueprint (JSON is detected by a leading '{')."""
+    if is_json or (is_json is None and text.lstrip().startswith("{")):
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError("YAML blueprints require PyYAML (pip install pyyaml); JSON works without it")
+    return yaml.safe_load(text)
+
+
+def plan_blueprint(blueprint: Dict) -> Dict[str, Dict]:
+    """
+    Validate a blueprint and return its graph: node key ("kind:name") ->
+    {"kind", "name", "spec", "deps": [node keys]}.
+    """
+    vcn = blueprint.get("vcn") or {}
+    if not vcn.get("name") or not vcn.get("cidr"):
+        raise ValueError("Blueprint needs a vcn with a name and cidr")
+    vcn_key = f"vcn:{vcn['name']}"
+    nodes = {vcn_key: {"kind": "vcn", "name": vcn["name"], "spec": vcn, "deps": []}}
+    for section, kind in SECTIONS.items():
+        for spec in blueprint.get(section) or []:
+            key = f"{kind}:{spec['name']}"
+            if key in nodes:
+                raise ValueError(f"Duplicate {kind} name in blueprint: {spec['name']}")
+            nodes[key] = {"kind": kind, "name": spec["name"], "spec": spec, "deps": [vcn_key]}
+    gateways = {node["name"]: key for key, node in nodes.items() if node["kind"].endswith("gateway")}
+
+    def reference(owner: str, kind: str, name: str, candidates: Dict[str, str]) -> Optional[str]:
+        if name.startswith("ocid1."):
+            # An existing resource outside the blueprint
+            return None
+        if name not in candidates:
+            raise ValueError(f"{owner} references unknown {kind} {name!r}")
+        return candidates[name]
+
+    for key, node in nodes.items():
+        spec = node["spec"]
+        if node["kind"] == "route_table":
+            for rule in spec.get("rules") or []:
+                node["deps"].append(reference(key, "gateway", rule["target"], gateways))
+        elif node["kind"] == "subnet":
+            if spec.get("route_table"):
+                node["deps"].append(reference(key, "route table", spec["route_table"],
+                                              {n["name"]: k for k, n in nodes.items() if n["kind"] == "route_table"}))
+            for name in spec.get("security_lists") or []:
+                node["deps"].append(reference(key, "security list", name,
+                                              {n["name"]: k for k, n in nodes.items() if n["kind"] == "security_list"}))
+        node["deps"] = sorted({dep for dep in node["deps"] if dep})
+    return nodes
+
+
+def run_graph(manager: OCIManager, deps: Dict[str, List[str]], action: Callable[[str], object],
+              progress: ResourceProgress, running_state: str, done_state: str,
+              stop_on_failure: bool = True) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Run action(key) for every node once all its deps have succeeded, up to the
+    manager's max_workers at a time. After the first failure no new node is
+    started, unless stop_on_failure is False (then only nodes that depend on a
+    failed one are skipped). Returns (succeeded keys in completion order,
+    {failed key: error}).
+    """
+    remaining = {key: set(node_deps) for key, node_deps in deps.items()}
+    succeeded: List[str] = []
+    failed: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=manager.max_workers) as executor:
+        running = {}
+        while True:
+            if not failed or not stop_on_failure:
+                ready = [key for key, waiting in remaining.items() if not waiting]
+                for key in ready:
+                    del remaining[key]
+                    progress.update(key, state=running_state)
+                    running[executor.submit(contextvars.copy_context().run, action, key)] = key
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed[key] = str(getattr(e, "message", None) or e)
+                    progress.update(key, state="FAILED", error=failed[key])
+                    continue
+                succeeded.append(key)
+                progress.update(key, state=done_state, **(result if isinstance(result, dict) else {}))
+                for waiting in remaining.values():
+                    waiting.discard(key)
+    for key in remaining:
+        progress.update(key, state="SKIPPED")
+    return succeeded, failed
+
+
+def reverse_deps(deps: Dict[str, List[str]], keys: List[str]) -> Dict[str, List[str]]:
+    """Deletion graph for keys: a node can go once every node that depends on it is gone."""
+    return {key: [other for other in keys if key in deps.get(other, [])] for key in keys}
+
+
+def delete_resource(manager: OCIManager, kind: str, resource_id: str) -> None:
+    """Delete one networking resource and wait until it is gone."""
+    getattr(manager, f"delete_{kind}")(resource_id)
+    manager.wait_for_network_resource(kind, resource_id, "DETACHED" if kind == "drg_attachment" else "TERMINATED")
+
+
+def provision_blueprint(manager: OCIManager, compartment_id: str, blueprint: Dict,
+                        progress: Optional[ResourceProgress] = None, rollback: bool = True) -> Dict[str, str]:
+    """
+    Create every resource of the blueprint, in parallel where the graph allows,
+    waiting for each to become AVAILABLE before its dependents start. Returns
+    {node key: OCID}. On failure the created resources are rolled back (unless
+    rollback=False) and a RuntimeError describing the failures is raised.
+    """
+    nodes = plan_blueprint(blueprint)
+    progress = progress or ResourceProgress()
+    for key in nodes:
+        progress.update(key, state="PENDING")
+    ids: Dict[str, str] = {}
+
+    def name_to_id(kind: str, name: str) -> str:
+        return name if name.startswith("ocid1.") else ids[f"{kind}:{name}"]
+
+    def create(key: str) -> Dict:
+        node = nodes[key]
+        kind, spec = node["kind"], node["spec"]
+        vcn_id = ids.get(next((dep for dep in node["deps"] if dep.startswith("vcn:")), ""))
+        if kind == "vcn":
+            result = manager.create_vcn(compartment_id, spec["name"], spec["cidr"], spec.get("dns_label"))
+        elif kind == "internet_gateway":
+            result = manager.create_internet_gateway(compartment_id, vcn_id, spec["name"], spec.get("enabled", True))
+        elif kind == "nat_gateway":
+            result = manager.create_nat_gateway(compartment_id, vcn_id, spec["name"])
+        elif kind == "service_gateway":
+            result = manager.create_service_gateway(compartment_id, vcn_id, spec["name"], spec.get("services") or [])
+        elif kind == "route_table":
+            gateway_ids = {nodes[dep]["name"]: ids[dep] for dep in node["deps"] if dep in ids}
+            result = manager.create_route_table(compartment_id, vcn_id, spec["name"], [
+                {"network_entity_id": gateway_ids.get(rule["target"], rule["target"]),
+                 "destination": rule["destination"],
+                 "destination_type": rule.get("destination_type", "CIDR_BLOCK")}
+                for rule in spec.get("rules") or []
+            ])
+        elif kind == "security_list":
+            rules = {direction: [rule_to_model(parse_rule_spec(rule, direction))
+                                 for rule in spec.get(direction.lower()) or []]
+                     for direction in ("INGRESS", "EGRESS")}
+            result = manager.create_security_list(compartment_id, vcn_id, spec["name"],
+                                                  rules["INGRESS"], rules["EGRESS"])
+        else:
+            result = manager.create_subnet(
+                compartment_id, vcn_id, spec["name"], spec["cidr"], spec.get("type", "PUBLIC"),
+                spec.get("dns_label"), spec.get("availability_domain"),
+                name_to_id("route_table", spec["route_table"]) if spec.get("route_table") else None,
+                [name_to_id("security_list", name) for name in spec.get("security_lists") or []] or None
+            )
+        ids[key] = result["id"]
+        manager.wait_for_network_resource(kind, result["id"])
+        return {"id": result["id"]}
+
+    deps = {key: node["deps"] for key, node in nodes.items()}
+    created, failed = run_graph(manager, deps, create, progress, "CREATING", "AVAILABLE")
+    if not failed:
+        return ids
+    message = "Blueprint failed: " + "; ".join(f"{key}: {error}" for key, error in failed.items())
+    if rollback:
+        # Also remove resources whose create call succeeded but that never became AVAILABLE
+        to_delete = [key for key in nodes if key in ids]
+        # Keep going past a failed delete; only the resources it blocks are left
+        rolled_back, rollback_failed = run_graph(manager, reverse_deps(deps, to_delete),
+                                                 lambda key: delete_resource(manager, nodes[key]["kind"], ids[key]),
+                                                 progress, "ROLLING_BACK", "ROLLED_BACK", stop_on_failure=False)
+        left = [key for key in to_delete if key not in rolled_back]
+        if left:
+            message += " (rollback incomplete, left: " + ", ".join(left) + ")"
+    raise RuntimeError(message)
@@ -0,0 +1,206 @@
+"""
+Browser-side uploads straight to Object Storage.
+
+upload_widget_html() renders a small HTML/JavaScript uploader (for
+streamlit.components.v1.html) that PUTs the chosen files to a write-only
+pre-authenticated request URL (OCIManager.create_upload_url). The app server
+only mints the URL and never sees object data. Files larger than part_size go
+up as multipart uploads, with parallel parts and retries for throttling and
+server errors. Failed multipart uploads are aborted.
+
+Existing objects are not overwritten silently. Uploads send If-None-Match: *,
+and on a conflict the user picks Replace, Keep Both (name_copy.ext,
+name_copy1.ext, ...) or Skip, as in the app's server-side upload dialog.
+
+The bucket's Object Storage endpoint must be reachable from the browser.
+"""
+import json
+
+# Multipart parts: Object Storage needs at least 10 MiB for all but the last part
+PART_SIZE = 32 * 1024 * 1024
+# Files and parts in flight at once (browsers allow about 6 connections per host)
+PARALLEL_UPLOADS = 4
+RETRIES = 3
+WIDGET_HEIGHT = 220
+
+_TEMPLATE = """
+<style>
+  body { font-family: "Source Sans Pro", sans-serif; font-size: 14px; margin: 0; }
+  .row { display: flex; gap: 8px; align-items: center; margin-top: 6px; }
+  .name { flex: 0 1 40%; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+  progress { flex: 0 0 25%; }
+  button { margin-left: 4px; }
+</style>
+<input type="file" id="files" multiple>
+<button id="start">Upload 📤</button>
+<div id="rows"></div>
+<script>
+const CONFIG = __CONFIG__;
+
+function objectUrl(name) {
+  return CONFIG.url + (CONFIG.prefix + name).split("/").map(encodeURIComponent).join("/");
+}
+
+function copyName(name, counter) {
+  const dot = name.lastIndexOf(".");
+  const suffix = "_copy" + (counter ? counter : "");
+  return dot > 0 ? name.slice(0, dot) + suffix + name.slice(dot) : name + suffix;
+}
+
+function addRow(file) {
+  const row = document.createElement("div");
+  row.className = "row";
+  row.innerHTML = '<span class="name"></span><progress max="1" value="0"></progress>' +
+                  '<span class="status">waiting</span><span class="actions"></span>';
+  row.querySelector(".name").textContent = file.name;
+  document.getElementById("rows").appendChild(row);
+  return {
+    progress: row.querySelector("progress"),
+    actions: row.querySelector(".actions"),
+    status: (text) => { row.querySelector(".status").textContent = text; },
+  };
+}
+
+// XMLHttpRequest rather than fetch, for upload progress events
+function send(method, url, body, headers, onProgress) {
+  return new Promise((resolve, reject) => {
+    const xhr = new XMLHttpRequest();
+    xhr.open(method, url);
+    for (const [name, value] of Object.entries(headers || {})) {
+      xhr.setRequestHeader(name, value);
+    }
+    if (onProgress) {
+      xhr.upload.onprogress = (event) => onProgress(event.loaded);
+    }
+    xhr.onload = () => resolve(xhr);
+    xhr.onerror = () => reject(new Error("network error"));
+    xhr.send(body);
+  });
+}
+
+async function withRetries(attempt) {
+  for (let retry = 0; ; retry++) {
+    try {
+      const xhr = await attempt();
+      if ((xhr.status !== 429 && xhr.status < 500) || retry >= CONFIG.retries) {
+        return xhr;
+      }
+    } catch (error) {
+      if (retry >= CONFIG.retries) {
+        throw error;
+      }
+    }
+    await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** retry));
+  }
+}
+
+function check(xhr) {
+  if (xhr.status >= 300) {
+    throw new Error("HTTP " + xhr.status + " " + xhr.responseText.slice(0, 200));
+  }
+  return xhr;
+}
+
+function putWhole(file, name, headers, ui) {
+  return withRetries(() => send("PUT", objectUrl(name), file, headers,
+                                (loaded) => { ui.progress.value = loaded / file.size; }));
+}
+
+async function putMultipart(file, name, headers, ui) {
+  const created = await withRetries(() => send("PUT", objectUrl(name), null,
+                                               Object.assign({"opc-multipart": "true"}, headers)));
+  if (created.status >= 300) {
+    return created;
+  }
+  let uploadUrl = new URL(JSON.parse(created.responseText).accessUri, CONFIG.url).href;
+  if (!uploadUrl.endsWith("/")) {
+    uploadUrl += "/";
+  }
+  const count = Math.ceil(file.size / CONFIG.partSize);
+  const loaded = new Array(count).fill(0);
+  let next = 0;
+  let failed = false;
+  async function worker() {
+    while (next < count && !failed) {
+      const index = next++;
+      const part = file.slice(index * CONFIG.partSize, Math.min(file.size, (index + 1) * CONFIG.partSize));
+      try {
+        check(await withRetries(() => send("PUT", uploadUrl + (index + 1), part, {}, (bytes) => {
+          loaded[index] = bytes;
+          ui.progress.value = loaded.reduce((sum, value) => sum + value, 0) / file.size;
+        })));
+      } catch (error) {
+        failed = true;
+        throw error;
+      }
+    }
+  }
+  try {
+    await Promise.all(Array.from({length: Math.min(CONFIG.parallel, count)}, worker));
+    return await withRetries(() => send("POST", uploadUrl, null, {}));
+  } catch (error) {
+    send("DELETE", uploadUrl).catch(() => {});
+    throw error;
+  }
+}
+
+async function upload(file, name, ifAbsent, ui, onConflict) {
+  ui.status("uploading");
+  ui.progress.value = 0;
+  const put = file.size > CONFIG.partSize ? putMultipart : putWhole;
+  const xhr = await put(file, name, ifAbsent ? {"if-none-match": "*"} : {}, ui);
+  if (xhr.status === 409 || xhr.status === 412) {
+    return onConflict();
+  }
+  check(xhr);
+  ui.progress.value = 1;
+  ui.status("uploaded as " + CONFIG.prefix + name + " ✅");
+}
+
+function run(action, ui) {
+  return action().catch((error) => ui.status("failed: " + error.message + " 😬"));
+}
+
+function keepBoth(file, ui, counter) {
+  return upload(file, copyName(file.name, counter), true, ui, () => keepBoth(file, ui, counter + 1));
+}
+
+function askConflict(file, ui) {
+  ui.status("already exists 🤔");
+  const choices = {
+    "Replace": () => upload(file, file.name, false, ui, () => askConflict(file, ui)),
+    "Keep Both": () => keepBoth(file, ui, 0),
+    "Skip": async () => ui.status("skipped"),
+  };
+  for (const [label, action] of Object.entries(choices)) {
+    const button = document.createElement("button");
+    button.textContent = label;
+    button.onclick = () => {
+      ui.actions.innerHTML = "";
+      run(action, ui);
+    };
+    ui.actions.appendChild(button);
+  }
+}
+
+document.getElementById("start").onclick = async () => {
+  const queue = Array.from(document.getElementById("files").files).map((file) => [file, addRow(file)]);
+  async function worker() {
+    while (queue.length) {
+      const [file, ui] = queue.shift();
+      await run(() => upload(file, file.name, true, ui, () => askConflict(file, ui)), ui);
+    }
+  }
+  await Promise.all(Array.from({length: CONFIG.parallel}, worker));
+};
+</script>
+"""
+
+
+def upload_widget_html(url: str, prefix: str = "", part_size: int = PART_SIZE,
+                       parallel: int = PARALLEL_UPLOADS, retries: int = RETRIES) -> str:
+    """HTML of the uploader for an AnyObjectWrite pre-authenticated URL; object names are prefix + file name."""
+    config = json.dumps({"url": url if url.endswith("/") else url + "/", "prefix": prefix,
+                         "partSize": part_size, "parallel": parallel, "retries": retries})
+    # Keep the JSON from closing the script element
+    return _TEMPLATE.replace("__CONFIG__", config.replace("</", "<\\/"))
@@ -0,0 +1,173 @@
+"""
+Parallel bulk Object Storage operations: multi-delete, prefix delete, directory
+or zip upload (optionally compressed), and bucket-to-bucket copy.
+
+Every operation streams its work items (object listings are fetched page by page),
+runs them on OCIManager's bounded worker pool and yields one result dict per item
+as it completes. Failed calls are retried by the OCI SDK's default retry strategy
+(exponential backoff on throttling and 5xx errors) before being reported. Pass a
+BulkProgress to follow counts and throughput while the results are consumed.
+"""
+import os
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from oci_compression import CompressionPolicy
+from oci_utils import OCIManager
+
+
+class BulkProgress:
+    """Thread-safe counters for a running bulk operation."""
+
+    def __init__(self, on_update: Optional[Callable[["BulkProgress"], None]] = None):
+        self.on_update = on_update
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def record(self, ok: bool, size: int = 0) -> None:
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+                self.bytes += size or 0
+            else:
+                self.failed += 1
+        if self.on_update:
+            self.on_update(self)
+
+    def skip(self) -> None:
+        """Count an item that needed no work (e.g. an unchanged file in a sync)."""
+        with self._lock:
+            self.skipped += 1
+        if self.on_update:
+            self.on_update(self)
+
+    def summary(self) -> Dict:
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "bytes": self.bytes,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "ops_per_second": round(self.ops_per_second, 1),
+            "mb_per_second": round(self.bytes_per_second / (1024 * 1024), 2)
+        }
+
+
+def _run(manager: OCIManager, action: str, func: Callable, items: Iterable[Tuple[str, int, object]],
+         dry_run: bool, progress: Optional[BulkProgress]) -> Iterator[Dict]:
+    """Run func(payload) for each (name, size, payload) item and yield per-item results."""
+    progress = progress or BulkProgress()
+    if dry_run:
+        for name, size, _ in items:
+            progress.record(True, size)
+            yield {"name": name, "action": action, "size": size, "status": "dry-run"}
+        return
+    for (name, size, _), result, error in manager.run_parallel(lambda item: func(item[2]), items):
+        progress.record(error is None, size)
+        if error:
+            yield {"name": name, "action": action, "size": size, "status": "error", "error": str(error)}
+        else:
+            yield dict(result or {}, name=name, action=action, size=size, status="ok")
+
+
+def bulk_delete(manager: OCIManager, bucket_name: str, names: Optional[Iterable[str]] = None,
+                prefix: Optional[str] = None, dry_run: bool = False,
+                progress: Optional[BulkProgress] = None) -> Iterator[Dict]:
+    """Delete the given object names, or every object under prefix, in parallel."""
+    if names is None and prefix is None:
+        raise ValueError("bulk_delete needs object names or a prefix")
+    if names is not None:
+        items = ((name, 0, name) for name in names)
+    else:
+        items = ((obj["name"], obj["size"], obj["name"])
+                 for obj in manager.iter_objects(bucket_name, prefix=prefix, fields="name,size"))
+    return _run(manager, "delete", lambda name: manager.delete_object(bucket_name, name),
+                items, dry_run, progress)
+
+
+def _walk_files(directory: str, prefix: str) -> Iterator[Tuple[str, int, str]]:
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            yield prefix + relative, os.path.getsize(path), path
+
+
+def bulk_upload_directory(manager: OCIManager, bucket_name: str, directory: str, prefix: str = "",
+                          dry_run: bool = False, progress: Optional[BulkProgress] = None,
+                          compression: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Upload every file under a local directory, naming objects prefix + relative path.
+    With compression ("gzip" or "zstd"), compressible files are compressed on the fly
+    (see oci_compression.CompressionPolicy).
+    """
+    items = ((name, size, (name, path)) for name, size, path in _walk_files(directory, prefix))
+    if compression:
+        policy = CompressionPolicy.with_codec(compression)
+        upload = lambda payload: manager.upload_compressed(bucket_name, payload[0], payload[1], policy=policy)
+    else:
+        upload = lambda payload: manager.upload_file(bucket_name, payload[0], payload[1])
+    return _run(manager, "upload", upload, items, dry_run, progress)
+
+
+def bulk_upload_zip(manager: OCIManager, bucket_name: str, zip_file, prefix: str = "",
+                    dry_run: bool = False, progress: Optional[BulkProgress] = None,
+                    compression: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Upload every file inside a zip archive (path or file object), naming objects
+    prefix + archive path. Members are streamed from the archive, never read
+    whole; with compression they are compressed on the fly as in
+    bulk_upload_directory.
+    """
+    archive = zipfile.ZipFile(zip_file)
+    members = (info for info in archive.infolist() if not info.is_dir())
+    items = ((prefix + info.filename, info.file_size, info) for info in members)
+    policy = CompressionPolicy.with_codec(compression) if compression else None
+
+    def upload(info):
+        with archive.open(info) as member:
+            if policy:
+                return manager.upload_compressed(bucket_name, prefix + info.filename, member, policy=policy)
+            return manager.upload_object(bucket_name, prefix + info.filename, member, content_length=info.file_size)
+
+    try:
+        yield from _run(manager, "upload", upload, items, dry_run, progress)
+    finally:
+        archive.close()
+
+
+def bulk_copy(manager: OCIManager, source_bucket: str, destination_bucket: str,
+              prefix: Optional[str] = None, destination_region: Optional[str] = None,
+              dry_run: bool = False, progress: Optional[BulkProgress] = None) -> Iterator[Dict]:
+    """
+    Start server-side copies of every object under prefix into another bucket.
+    Copies run asynchronously in Object Storage; each result carries its work request id.
+    """
+    objects = manager.iter_objects(source_bucket, prefix=prefix, fields="name,size")
+    items = ((obj["name"], obj["size"], obj["name"]) for obj in objects)
+    return _run(manager, "copy",
+                lambda name: manager.copy_object(source_bucket, name, destination_bucket,
+                                                 destination_region=destination_region),
+                items, dry_run, progress)
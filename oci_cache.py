@@ -0,0 +1,287 @@
+"""
+Process-wide TTL cache for slow-changing OCI listings (images, shapes, service
+catalogs...), optionally shared between processes.
+
+Entries are keyed by tuples such as ("images", region, compartment_id) and expire
+after a per-entry TTL. Concurrent requests for the same missing key wait for one
+loader call instead of all hitting the API (single flight), and prefetch() warms
+an entry on a background thread so the first reader finds it ready.
+
+By default entries live in this process's memory. With a SQLiteBackend (set
+OCI_CACHE_PATH, or call configure()), they are stored in a local SQLite file
+that every process on the host shares, such as Streamlit replicas behind a load
+balancer. Each write gets a new version number, and invalidation deletes rows,
+so every process sees it. Each process keeps the values it has already
+deserialized and reuses them while their version is unchanged. Single flight
+then works across processes too: the process that takes a key's lease loads it,
+and the others wait for the result, so all replicas together make one set of
+API calls per refresh.
+
+The module-level `cache` is shared by every Streamlit session in the process.
+"""
+import contextvars
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from oci_perf import record_cache_lookup
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# Separates the parts of a tuple key in the SQLite key column, so prefixes can be matched
+_KEY_SEPARATOR = "\x1f"
+
+# How often set() drops expired entries, so keys that are never read again (e.g.
+# per-minute metric windows) do not pile up in a long-running process
+SWEEP_INTERVAL = MINUTE
+
+
+def _drop_expired(entries: Dict, expires_at: Callable[[Tuple], float], now: float) -> None:
+    # list() copies in one step, so concurrent readers may add entries meanwhile
+    for key, entry in list(entries.items()):
+        if expires_at(entry) < now:
+            entries.pop(key, None)
+
+
+class MemoryBackend:
+    """Entries in this process only."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[float, object]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, object]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+        return entry
+
+    def set(self, key: Hashable, value, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, value)
+            if now >= self._next_sweep:
+                _drop_expired(self._entries, lambda entry: entry[0], now)
+                self._next_sweep = now + SWEEP_INTERVAL
+
+    def invalidate(self, prefix: Tuple) -> int:
+        with self._lock:
+            keys = [key for key in self._entries
+                    if not prefix or (isinstance(key, tuple) and key[:len(prefix)] == prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def acquire(self, key: Hashable) -> bool:
+        # Threads of this process are already coordinated by TTLCache
+        return True
+
+    def release(self, key: Hashable) -> None:
+        pass
+
+
+class SQLiteBackend:
+    """
+    Entries in a SQLite file shared by every process that opens it. Values are
+    pickled; a per-process copy is reused while the entry's version is unchanged.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 120.0):
+        self.path = os.path.expanduser(path)
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        # key -> (version, value, expires_at) of entries this process has unpickled
+        self._decoded: Dict[str, Tuple[int, object, float]] = {}
+        self._next_sweep = time.time() + SWEEP_INTERVAL
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS entries "
+                   "(key TEXT PRIMARY KEY, version INTEGER NOT NULL, expires_at REAL NOT NULL, value BLOB)")
+        db.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        db.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return db
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        return _KEY_SEPARATOR.join(repr(part) for part in parts)
+
+    def _transaction(self, statements: Callable[[sqlite3.Connection], object]):
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(db)
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return result
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, object]]:
+        encoded = self._key(key)
+        row = self._connection().execute(
+            "SELECT version, expires_at FROM entries WHERE key = ? AND expires_at >= ?", (encoded, time.time())
+        ).fetchone()
+        if row is None:
+            self._decoded.pop(encoded, None)
+            return None
+        version, expires_at = row
+        decoded = self._decoded.get(encoded)
+        if decoded is None or decoded[0] != version:
+            blob = self._connection().execute(
+                "SELECT value FROM entries WHERE key = ? AND version = ?", (encoded, version)
+            ).fetchone()
+            if blob is None:
+                # Replaced or invalidated by another process between the two reads
+                return None
+            decoded = self._decoded[encoded] = (version, pickle.loads(blob[0]), expires_at)
+        return expires_at, decoded[1]
+
+    def set(self, key: Hashable, value, ttl: float) -> None:
+        encoded = self._key(key)
+        blob = sqlite3.Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+        def write(db: sqlite3.Connection) -> int:
+            db.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+            version = db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                       (encoded, version, expires_at, blob))
+            db.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            return version
+
+        expires_at = time.time() + ttl
+        self._decoded[encoded] = (self._transaction(write), value, expires_at)
+        now = time.time()
+        if now >= self._next_sweep:
+            _drop_expired(self._decoded, lambda entry: entry[2], now)
+            self._next_sweep = now + SWEEP_INTERVAL
+
+    def invalidate(self, prefix: Tuple) -> int:
+        db = self._connection()
+        if not prefix:
+            return db.execute("DELETE FROM entries").rowcount
+        encoded = self._key(prefix)
+        return db.execute("DELETE FROM entries WHERE key = ? OR substr(key, 1, ?) = ?",
+                          (encoded, len(encoded) + 1, encoded + _KEY_SEPARATOR)).rowcount
+
+    def acquire(self, key: Hashable) -> bool:
+        """Take the key's load lease unless another live process holds it."""
+        encoded = self._key(key)
+
+        def take(db: sqlite3.Connection) -> bool:
+            row = db.execute("SELECT owner, expires_at FROM leases WHERE key = ?", (encoded,)).fetchone()
+            if row is not None and row[0] != self.owner and row[1] > time.time():
+                return False
+            db.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                       (encoded, self.owner, time.time() + self.lease_seconds))
+            return True
+
+        return self._transaction(take)
+
+    def release(self, key: Hashable) -> None:
+        self._connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (self._key(key), self.owner))
+
+
+class TTLCache:
+    """Thread-safe key/value cache with per-entry expiry and single-flight loading."""
+
+    # How often a process waiting for another process's load checks for the result
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        entry = self.backend.get(key)
+        return default if entry is None else entry[1]
+
+    def set(self, key: Hashable, value, ttl: float) -> None:
+        self.backend.set(key, value, ttl)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object], ttl: float):
+        """Return the cached value, or call loader() once (even with many concurrent callers) and cache it."""
+        started = time.perf_counter()
+        while True:
+            entry = self.backend.get(key)
+            if entry is not None:
+                record_cache_lookup(key, True, time.perf_counter() - started)
+                return entry[1]
+            with self._lock:
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another thread is loading this key: wait for it, then re-check
+            loading.wait()
+        try:
+            # Another process may hold the lease: wait for its result (or for the lease to lapse)
+            while not self.backend.acquire(key):
+                time.sleep(self.POLL_INTERVAL)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    record_cache_lookup(key, True, time.perf_counter() - started)
+                    return entry[1]
+            try:
+                entry = self.backend.get(key)
+                if entry is not None:
+                    record_cache_lookup(key, True, time.perf_counter() - started)
+                    return entry[1]
+                value = loader()
+                self.set(key, value, ttl)
+                record_cache_lookup(key, False, time.perf_counter() - started)
+                return value
+            finally:
+                self.backend.release(key)
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def prefetch(self, key: Hashable, loader: Callable[[], object], ttl: float) -> None:
+        """Load the key on a background thread unless it is cached or already loading."""
+        if key in self._loading or self.get(key) is not None:
+            return
+
+        def load():
+            try:
+                self.get_or_load(key, loader, ttl)
+            except Exception:
+                # The next foreground get_or_load retries and reports the error
+                pass
+
+        # Keep the caller's context (e.g. the API call priority) in the background thread
+        threading.Thread(target=contextvars.copy_context().run, args=(load,), daemon=True).start()
+
+    def invalidate(self, *prefix) -> int:
+        """Drop every entry whose key starts with prefix (everything if no prefix). Returns the count."""
+        return self.backend.invalidate(prefix)
+
+
+def configure(path: Optional[str] = None) -> TTLCache:
+    """Point the shared cache at a SQLite file (shared by processes), or back at memory with None."""
+    cache.backend = SQLiteBackend(path) if path else MemoryBackend()
+    return cache
+
+
+cache = TTLCache(SQLiteBackend(os.environ["OCI_CACHE_PATH"]) if os.environ.get("OCI_CACHE_PATH") else None)
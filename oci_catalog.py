@@ -0,0 +1,132 @@
+"""
+Launch catalog for the Create Compute form.
+
+Images (every operating system), shapes with their Flex limits, availability
+domains, VCNs and subnets are fetched in parallel and kept in the shared TTL
+cache per region and compartment. Images, shapes and ADs rarely change, so they
+live for hours; subnets for a few minutes (and are invalidated when one is
+created). With the catalog prefetched when a compartment is selected, the form
+opens without any API call and filtering by OS, architecture and shape is done
+in memory.
+"""
+import re
+from typing import Dict, List, Optional
+
+from oci_cache import HOUR, MINUTE, cache
+from oci_scheduler import PREFETCH, call_context
+from oci_utils import OCIManager
+
+IMAGE_TTL = 6 * HOUR
+SHAPE_TTL = 24 * HOUR
+SUBNET_TTL = 15 * MINUTE
+
+# Ampere shapes (VM.Standard.A1.Flex, BM.Standard.A1.160, ...) are the Arm ones
+_ARM_SHAPE = re.compile(r"\.A\d+(\.|$)")
+
+
+def image_architecture(image: Dict) -> str:
+    """Platform image names carry the architecture, e.g. 'Oracle-Linux-8.9-aarch64-2024.01.26-0'."""
+    return "aarch64" if "aarch64" in image["name"].lower() else "x86_64"
+
+
+def shape_architecture(shape: Dict) -> str:
+    if _ARM_SHAPE.search(shape["name"]) or "ampere" in (shape.get("processor") or "").lower():
+        return "aarch64"
+    return "x86_64"
+
+
+def _parts(manager: OCIManager, compartment_id: str) -> Dict:
+    """Catalog part name -> (cache key, loader, ttl)."""
+    region = manager.config.get("region")
+    loaders = {
+        "images": (lambda: list(manager.iter_images(compartment_id)), IMAGE_TTL),
+        "shapes": (lambda: list(manager.iter_shapes(compartment_id)), SHAPE_TTL),
+        "availability_domains": (lambda: [ad["name"] for ad in manager.list_availability_domains(compartment_id)],
+                                 SHAPE_TTL),
+        "vcns": (lambda: list(manager.iter_vcns(compartment_id)), SUBNET_TTL),
+        "subnets": (lambda: list(manager.iter_subnets(compartment_id)), SUBNET_TTL),
+    }
+    return {name: (("launch-catalog", name, region, compartment_id), loader, ttl)
+            for name, (loader, ttl) in loaders.items()}
+
+
+class LaunchCatalog:
+    """Images, shapes, availability domains and subnets of one compartment, with in-memory filters."""
+
+    def __init__(self, images: List[Dict], shapes: List[Dict], availability_domains: List[str],
+                 vcns: List[Dict], subnets: List[Dict]):
+        self.images = sorted(images, key=lambda image: image["time_created"] or "", reverse=True)
+        for image in self.images:
+            image.setdefault("architecture", image_architecture(image))
+        self.shapes = shapes
+        for shape in self.shapes:
+            shape.setdefault("architecture", shape_architecture(shape))
+        self.shapes_by_name = {shape["name"]: shape for shape in shapes}
+        self.availability_domains = availability_domains
+        vcn_names = {vcn["id"]: vcn["name"] for vcn in vcns}
+        self.subnets = [dict(subnet, vcn_name=vcn_names.get(subnet["vcn_id"])) for subnet in subnets]
+        self.operating_systems = sorted({image["operating_system"] for image in self.images
+                                         if image["operating_system"]})
+
+    @classmethod
+    def load(cls, manager: OCIManager, compartment_id: str) -> "LaunchCatalog":
+        """Catalog from the cache, fetching any missing parts in parallel."""
+        parts = _parts(manager, compartment_id)
+        loaded = {}
+        for name, value, error in manager.run_parallel(
+            lambda name: cache.get_or_load(*parts[name]), list(parts)
+        ):
+            if error:
+                raise error
+            loaded[name] = value
+        return cls(loaded["images"], loaded["shapes"], loaded["availability_domains"],
+                   loaded["vcns"], loaded["subnets"])
+
+    @staticmethod
+    def prefetch(manager: OCIManager, compartment_id: str) -> None:
+        """Warm the cache in the background so a later load() returns immediately."""
+        with call_context(priority=PREFETCH):
+            for key, loader, ttl in _parts(manager, compartment_id).values():
+                cache.prefetch(key, loader, ttl)
+
+    @staticmethod
+    def invalidate_subnets(manager: OCIManager, compartment_id: str) -> None:
+        """Forget cached VCNs and subnets after one is created or deleted."""
+        region = manager.config.get("region")
+        for name in ("vcns", "subnets"):
+            cache.invalidate("launch-catalog", name, region, compartment_id)
+
+    def filter_images(self, operating_system: Optional[str] = None, architecture: Optional[str] = None,
+                      shape: Optional[str] = None) -> List[Dict]:
+        """Images for an OS and/or architecture (or the architecture of a shape), newest first."""
+        if shape in self.shapes_by_name:
+            architecture = self.shapes_by_name[shape]["architecture"]
+        return [image for image in self.images
+                if (not operating_system or image["operating_system"] == operating_system)
+                and (not architecture or image["architecture"] == architecture)]
+
+    def filter_shapes(self, architecture: Optional[str] = None, flexible: Optional[bool] = None) -> List[Dict]:
+        return [shape for shape in self.shapes
+                if (not architecture or shape["architecture"] == architecture)
+                and (flexible is None or shape["is_flexible"] == flexible)]
+
+    def compatible_shapes(self, manager: OCIManager, image_id: str) -> List[Dict]:
+        """Shapes an image is certified for, from the API (cached as long as images)."""
+        names = cache.get_or_load(("image-shapes", manager.config.get("region"), image_id),
+                                  lambda: manager.list_image_shapes(image_id), IMAGE_TTL)
+        return [self.shapes_by_name[name] for name in names if name in self.shapes_by_name]
+
+    def subnet_availability_domains(self, subnet_id: str) -> List[str]:
+        """ADs an instance in the subnet can use: all of them for regional subnets."""
+        subnet = next((subnet for subnet in self.subnets if subnet["id"] == subnet_id), None)
+        if subnet and subnet.get("availability_domain"):
+            return [subnet["availability_domain"]]
+        return list(self.availability_domains)
+
+    def shape_limits(self, shape: str) -> Dict:
+        """OCPU/memory bounds and default memory per OCPU of a Flex shape (empty for fixed shapes)."""
+        details = self.shapes_by_name.get(shape)
+        if not details or not details["is_flexible"]:
+            return {}
+        return {key: details[key] for key in ("ocpu_min", "ocpu_max", "memory_min_in_gbs",
+                                              "memory_max_in_gbs", "memory_per_ocpu_in_gbs")}
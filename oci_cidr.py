@@ -0,0 +1,232 @@
+"""
+Precomputed CIDR index for VCN/subnet overlap checks and free address space search.
+
+CidrTrie is a binary radix trie over prefix bits: every stored CIDR lives at the
+node for its prefix, and each node counts the CIDRs in its subtree. An overlap
+check walks at most prefix-length nodes (32 for IPv4, 128 for IPv6), and a
+free-block search skips every fully used subtree and stops at the first free one, so both stay
+logarithmic in the size of the address space rather than linear in the number
+of networks.
+
+NetworkIndex keeps one trie for VCNs and one per VCN for its subnets, built from
+OCIManager's VCN and subnet listers across compartments and regions.
+"""
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from oci_utils import OCIManager
+
+
+class _Node:
+    __slots__ = ("children", "entries", "count", "full")
+
+    def __init__(self):
+        self.children = [None, None]
+        self.entries: List[Dict] = []
+        self.count = 0
+        # True when this block is entirely covered by stored CIDRs
+        self.full = False
+
+
+def _as_network(cidr):
+    if isinstance(cidr, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+        return cidr
+    return ipaddress.ip_network(cidr, strict=False)
+
+
+def _bits(network) -> Iterable[int]:
+    address = int(network.network_address)
+    width = network.max_prefixlen
+    for depth in range(network.prefixlen):
+        yield (address >> (width - 1 - depth)) & 1
+
+
+class CidrTrie:
+    """Radix trie of CIDR blocks for one IP version."""
+
+    def __init__(self, version: int = 4):
+        self.version = version
+        self.root = _Node()
+
+    def insert(self, cidr: str, record: Optional[Dict] = None) -> None:
+        network = _as_network(cidr)
+        node = self.root
+        node.count += 1
+        path = [node]
+        for bit in _bits(network):
+            if node.children[bit] is None:
+                node.children[bit] = _Node()
+            node = node.children[bit]
+            node.count += 1
+            path.append(node)
+        node.entries.append(dict(record or {}, cidr=str(network)))
+        for node in reversed(path):
+            left, right = node.children
+            full = bool(node.entries) or bool(left and right and left.full and right.full)
+            if full == node.full:
+                break
+            node.full = full
+
+    def overlaps(self, cidr: str) -> List[Dict]:
+        """Return every stored entry that contains, equals or lies inside cidr."""
+        network = _as_network(cidr)
+        found = list(self.root.entries)
+        node = self.root
+        for bit in _bits(network):
+            node = node.children[bit]
+            if node is None:
+                return found
+            found.extend(node.entries)
+        # Everything below the query prefix is inside it
+        found.extend(entry for child in node.children if child for entry in _walk(child))
+        return found
+
+    def containing(self, cidr: str) -> List[Dict]:
+        """Return stored entries that contain or equal cidr (the trie path only)."""
+        network = _as_network(cidr)
+        found = list(self.root.entries)
+        node = self.root
+        for bit in _bits(network):
+            node = node.children[bit]
+            if node is None:
+                break
+            found.extend(node.entries)
+        return found
+
+    def find_free(self, within: str, prefixlen: int, limit: int = 1) -> List[str]:
+        """Return up to limit free blocks of the given prefix length inside within, lowest first."""
+        network = ipaddress.ip_network(within, strict=False)
+        if prefixlen < network.prefixlen:
+            return []
+        node = self.root
+        for bit in _bits(network):
+            if node.entries:
+                return []
+            node = node.children[bit]
+            if node is None:
+                break
+        results: List[str] = []
+        _find_free(node, int(network.network_address), network.prefixlen, prefixlen,
+                   network.max_prefixlen, limit, results)
+        return [str(ipaddress.ip_network((address, prefixlen))) for address in results]
+
+
+def _walk(node: _Node) -> Iterable[Dict]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield from node.entries
+        stack.extend(child for child in node.children if child)
+
+
+def _find_free(node: Optional[_Node], address: int, depth: int, prefixlen: int, width: int,
+               limit: int, results: List[int]) -> None:
+    if len(results) >= limit:
+        return
+    if node is None or node.count == 0:
+        # Whole block is free: emit its first aligned sub-blocks
+        step = 1 << (width - prefixlen)
+        block_end = address + (1 << (width - depth))
+        while address < block_end and len(results) < limit:
+            results.append(address)
+            address += step
+        return
+    if node.full or depth == prefixlen:
+        return
+    half = 1 << (width - depth - 1)
+    _find_free(node.children[0], address, depth + 1, prefixlen, width, limit, results)
+    _find_free(node.children[1], address + half, depth + 1, prefixlen, width, limit, results)
+
+
+class NetworkIndex:
+    """VCN and subnet CIDRs across compartments and regions, for instant validation."""
+
+    def __init__(self):
+        self.vcns = {4: CidrTrie(4), 6: CidrTrie(6)}
+        self.subnets: Dict[str, Dict[int, CidrTrie]] = {}
+        self.vcn_cidrs: Dict[str, List[str]] = {}
+
+    def add_vcn(self, vcn: Dict, region: Optional[str] = None) -> None:
+        cidrs = vcn.get("cidr_blocks") or [vcn["cidr"]]
+        self.vcn_cidrs[vcn["id"]] = cidrs
+        for cidr in cidrs:
+            self.vcns[_version(cidr)].insert(cidr, {"id": vcn["id"], "name": vcn["name"], "region": region})
+
+    def add_subnet(self, subnet: Dict) -> None:
+        tries = self.subnets.setdefault(subnet["vcn_id"], {4: CidrTrie(4), 6: CidrTrie(6)})
+        tries[_version(subnet["cidr"])].insert(subnet["cidr"], {"id": subnet["id"], "name": subnet["name"]})
+
+    @classmethod
+    def build(cls, managers: Iterable[OCIManager], compartment_ids: Iterable[str]) -> "NetworkIndex":
+        """Index every VCN and subnet in the compartments, across each manager's region."""
+        index = cls()
+        compartment_ids = list(compartment_ids)
+        for manager in managers:
+            region = manager.config.get("region")
+            listings = manager.run_parallel(
+                lambda c: (list(manager.iter_vcns(c)), list(manager.iter_subnets(c))), compartment_ids
+            )
+            for _, result, error in listings:
+                if error:
+                    raise error
+                vcns, subnets = result
+                for vcn in vcns:
+                    index.add_vcn(vcn, region)
+                for subnet in subnets:
+                    index.add_subnet(subnet)
+        return index
+
+    def check_vcn_cidr(self, cidr: str) -> Tuple[bool, Optional[str]]:
+        """
+        Validate a new VCN CIDR. Returns (ok, message): ok is False only for an
+        invalid CIDR. OCI allows overlapping VCNs (overlap only matters once they
+        are peered or routed together), so an overlap with the indexed VCNs is
+        returned as a warning with ok True.
+        """
+        try:
+            network = ipaddress.ip_network(cidr)
+        except ValueError as e:
+            return False, f"Invalid CIDR block: {e}"
+        clashes = self.vcns[network.version].overlaps(cidr)
+        if clashes:
+            names = ", ".join(sorted({f"{c['name']} ({c['cidr']})" for c in clashes}))
+            return True, (f"{cidr} overlaps existing VCNs: {names}. That is fine unless they will be "
+                          f"peered or routed together.")
+        return True, None
+
+    def check_subnet_cidr(self, vcn_id: str, cidr: str) -> Tuple[bool, str]:
+        """Validate a new subnet CIDR against its VCN's ranges and existing subnets."""
+        try:
+            network = ipaddress.ip_network(cidr)
+        except ValueError as e:
+            return False, f"Invalid CIDR block: {e}"
+        vcn_networks = [ipaddress.ip_network(c) for c in self.vcn_cidrs.get(vcn_id, [])]
+        if vcn_networks and not any(network.version == v.version and network.subnet_of(v) for v in vcn_networks):
+            return False, f"{cidr} is outside the VCN's CIDR blocks ({', '.join(map(str, vcn_networks))})"
+        tries = self.subnets.get(vcn_id)
+        clashes = tries[network.version].overlaps(cidr) if tries else []
+        if clashes:
+            names = ", ".join(sorted({f"{c['name']} ({c['cidr']})" for c in clashes}))
+            return False, f"{cidr} overlaps existing subnets: {names}"
+        return True, f"{cidr} is free"
+
+    def suggest_vcn_cidr(self, prefixlen: int = 16, within: str = "10.0.0.0/8") -> Optional[str]:
+        """Lowest free VCN block of the given size inside a private range."""
+        free = self.vcns[_version(within)].find_free(within, prefixlen)
+        return free[0] if free else None
+
+    def suggest_subnet_cidr(self, vcn_id: str, prefixlen: int = 24, limit: int = 1) -> List[str]:
+        """Lowest free subnet blocks of the given size inside the VCN, e.g. the next free /24."""
+        tries = self.subnets.get(vcn_id) or {4: CidrTrie(4), 6: CidrTrie(6)}
+        suggestions: List[str] = []
+        for vcn_cidr in self.vcn_cidrs.get(vcn_id, []):
+            if _version(vcn_cidr) != 4:
+                continue
+            suggestions.extend(tries[4].find_free(vcn_cidr, prefixlen, limit - len(suggestions)))
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+
+def _version(cidr: str) -> int:
+    return ipaddress.ip_network(cidr, strict=False).version
@@ -0,0 +1,550 @@
+"""
+Headless entry point for OCI Resource Manager.
+
+Runs the same OCIManager listings and bulk actions as the Streamlit app, without
+importing Streamlit, so it can be used from cron jobs and shell pipelines:
+
+    python oci_cli.py list instances -c ocid1.compartment... --format ndjson
+    python oci_cli.py list instances -c ocid1.compartment... --subtree
+    python oci_cli.py action stop-instance -c ocid1.compartment... --name-prefix dev- --state RUNNING
+    python oci_cli.py export objects --bucket logs -o logs.parquet
+    python oci_cli.py bulk delete --bucket logs --prefix 2023/ --dry-run
+    python oci_cli.py bulk sync --bucket backups --source ./artifacts --prefix builds/ --delete
+    python oci_cli.py download --bucket backups --object db.dmp -o db.dmp
+    python oci_cli.py compression-bench --file app.log
+    python oci_cli.py audit-rules --tenancy --protocol tcp --port 22 --cidr 0.0.0.0/0
+    python oci_cli.py apply-rules --file rules.yaml -c ocid1.compartment... --dry-run
+    python oci_cli.py blueprint --file network.yaml -c ocid1.compartment...
+    python oci_cli.py inventory -c ocid1.compartment...
+    python oci_cli.py teardown --vcn ocid1.vcn... --dry-run
+    python oci_cli.py record --cassettes perf/ -c ocid1.compartment...
+    python oci_cli.py perf-check --cassettes perf/ --budgets perf/budgets.json
+    python oci_cli.py loadtest --cassettes perf/ --sessions 1,5,10,25
+    python oci_cli.py fleet -c ocid1.compartment... --count 50 --image ocid1.image... \
+        --shape VM.Standard.E4.Flex --ocpus 1 --memory 8 --subnet ocid1.subnet... --ssh-key-file ~/.ssh/id_rsa.pub
+
+The functions below can also be imported and used as a library.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+import oci_blueprint
+import oci_bulk
+import oci_compression
+import oci_export
+import oci_fleet
+import oci_inventory
+import oci_loadtest
+import oci_replay
+import oci_rule_changes
+import oci_sync
+import oci_teardown
+from oci_rules import SecurityRuleIndex
+from oci_scheduler import BULK, call_context
+from oci_utils import OCIManager
+
+
+def _list_per_vcn(lister: str) -> Callable:
+    def list_all(manager: OCIManager, compartment_id: str, args) -> Iterator[Dict]:
+        vcns = manager.list_vcns(compartment_id)
+        for vcn, records, error in manager.run_parallel(
+            lambda v: getattr(manager, lister)(compartment_id, v["id"]), vcns
+        ):
+            if error:
+                raise error
+            for record in records:
+                yield dict(record, vcn_id=vcn["id"])
+    return list_all
+
+
+# Resource kind -> function(manager, compartment_id, args) returning dicts
+LISTERS: Dict[str, Callable] = {
+    "instances": lambda m, c, a: m.iter_instances(c),
+    "adbs": lambda m, c, a: m.list_autonomous_databases(c),
+    "vcns": lambda m, c, a: m.list_vcns(c),
+    "subnets": _list_per_vcn("list_subnets"),
+    "security-lists": _list_per_vcn("list_security_lists"),
+    "buckets": lambda m, c, a: m.list_buckets(c),
+}
+
+# Kinds that are not scoped to a compartment
+GLOBAL_LISTERS: Dict[str, Callable] = {
+    "compartments": lambda m, a: m.list_compartments(),
+    "regions": lambda m, a: [{"name": name} for name in m.list_regions()],
+    "objects": lambda m, a: m.list_objects(a.bucket),
+}
+
+# Action -> (resource kind, OCIManager method name)
+ACTIONS: Dict[str, tuple] = {
+    "start-instance": ("instances", "start_instance"),
+    "stop-instance": ("instances", "stop_instance"),
+    "terminate-instance": ("instances", "terminate_instance"),
+    "start-adb": ("adbs", "start_autonomous_database"),
+    "stop-adb": ("adbs", "stop_autonomous_database"),
+    "terminate-adb": ("adbs", "terminate_autonomous_database"),
+}
+
+# Resource kind -> (name field, state field) used for action target selection
+SELECT_FIELDS: Dict[str, tuple] = {
+    "instances": ("name", "state"),
+    "adbs": ("display_name", "lifecycle_state"),
+}
+
+
+def iter_resources(manager: OCIManager, kind: str, compartment_ids: List[str], args=None) -> Iterator[Dict]:
+    """
+    List one resource kind across compartments, fetching compartments in parallel.
+    Records are yielded as each compartment completes, tagged with their compartment_id.
+    """
+    if kind in GLOBAL_LISTERS:
+        yield from GLOBAL_LISTERS[kind](manager, args)
+        return
+    lister = LISTERS[kind]
+    for compartment_id, records, error in manager.run_parallel(
+        lambda c: list(lister(manager, c, args)), compartment_ids
+    ):
+        if error:
+            raise error
+        for record in records:
+            yield dict(record, compartment_id=compartment_id)
+
+
+def select_targets(records: Iterable[Dict], kind: str, name_prefix: Optional[str] = None,
+                   state: Optional[str] = None) -> Iterator[Dict]:
+    """Filter listed resources by display name prefix and lifecycle state."""
+    name_field, state_field = SELECT_FIELDS[kind]
+    for record in records:
+        if name_prefix and not (record.get(name_field) or "").startswith(name_prefix):
+            continue
+        if state and record.get(state_field) != state:
+            continue
+        yield record
+
+
+def run_action(manager: OCIManager, action: str, resource_ids: Iterable[str],
+               dry_run: bool = False) -> Iterator[Dict]:
+    """
+    Apply an action to many resources in parallel.
+    Yields one status dict per resource as it completes; failures are reported, not raised.
+    """
+    method = getattr(manager, ACTIONS[action][1])
+    if dry_run:
+        for resource_id in resource_ids:
+            yield {"id": resource_id, "action": action, "status": "dry-run"}
+        return
+    for resource_id, _, error in manager.run_parallel(method, resource_ids):
+        if error:
+            yield {"id": resource_id, "action": action, "status": "error", "error": str(error)}
+        else:
+            yield {"id": resource_id, "action": action, "status": "ok"}
+
+
+def write_records(records: Iterable[Dict], fmt: str = "ndjson", out: TextIO = sys.stdout) -> int:
+    """
+    Stream records to out as NDJSON (one object per line) or as a JSON array.
+    Each record is written as soon as it is produced. Returns the number written.
+    """
+    count = 0
+    if fmt == "json":
+        out.write("[")
+    for record in records:
+        line = json.dumps(record, default=str)
+        if fmt == "json":
+            out.write(("," if count else "") + "\n" + line)
+        else:
+            out.write(line + "\n")
+            out.flush()
+        count += 1
+    if fmt == "json":
+        out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="oci_cli.py", description="Headless OCI Resource Manager")
+    parser.add_argument("--config-file", default="~/.oci/config", help="OCI config file")
+    parser.add_argument("--profile", default="DEFAULT", help="OCI config profile")
+    parser.add_argument("--region", help="Region override (defaults to the profile's region)")
+    parser.add_argument("--workers", type=int, default=8, help="Maximum parallel API calls")
+    parser.add_argument("--connect-timeout", type=float, default=10.0, help="Seconds to open an API connection")
+    parser.add_argument("--read-timeout", type=float, default=60.0, help="Seconds to wait for API response data")
+    parser.add_argument("--pool-stats", action="store_true",
+                        help="Print HTTP connection pool counters (waits, new connections) to stderr on exit")
+    parser.add_argument("--format", choices=["ndjson", "json"], default="ndjson", help="Output format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List resources")
+    list_parser.add_argument("kind", choices=sorted(list(LISTERS) + list(GLOBAL_LISTERS)))
+    list_parser.add_argument("-c", "--compartment", action="append", default=[],
+                             help="Compartment OCID (repeatable)")
+    list_parser.add_argument("--bucket", help="Bucket name (for objects)")
+    list_parser.add_argument("--subtree", action="store_true",
+                             help="Also list every compartment nested under the given ones")
+
+    action_parser = subparsers.add_parser("action", help="Run an action on many resources")
+    action_parser.add_argument("action", choices=sorted(ACTIONS))
+    action_parser.add_argument("--id", action="append", default=[], help="Resource OCID (repeatable)")
+    action_parser.add_argument("-c", "--compartment", action="append", default=[],
+                               help="Select targets from these compartments (repeatable)")
+    action_parser.add_argument("--name-prefix", help="Only targets whose display name starts with this")
+    action_parser.add_argument("--state", help="Only targets in this lifecycle state, e.g. RUNNING")
+    action_parser.add_argument("--dry-run", action="store_true", help="Print targets without acting")
+
+    export_parser = subparsers.add_parser("export", help="Stream an inventory export to a file")
+    export_parser.add_argument("kind", choices=sorted(list(oci_export.EXPORTERS) + ["objects"]))
+    export_parser.add_argument("-o", "--output", required=True,
+                               help="Output file (.ndjson, .csv, .parquet) or - for stdout")
+    export_parser.add_argument("--export-format", choices=oci_export.FORMATS,
+                               help="Output format (defaults to the file extension)")
+    export_parser.add_argument("-c", "--compartment", action="append", default=[],
+                               help="Compartment OCID (repeatable)")
+    export_parser.add_argument("--bucket", help="Bucket name (for objects)")
+    export_parser.add_argument("--prefix", help="Object name prefix (for objects)")
+
+    bulk_parser = subparsers.add_parser("bulk", help="Parallel bulk object operations")
+    bulk_subparsers = bulk_parser.add_subparsers(dest="operation", required=True)
+    bulk_delete = bulk_subparsers.add_parser("delete", help="Delete objects by name or prefix")
+    bulk_delete.add_argument("--name", action="append", help="Object name (repeatable)")
+    bulk_delete.add_argument("--prefix", help="Delete every object under this prefix")
+    bulk_upload = bulk_subparsers.add_parser("upload", help="Upload a local directory or zip file")
+    bulk_upload.add_argument("--source", required=True, help="Local directory or .zip file")
+    bulk_upload.add_argument("--prefix", default="", help="Object name prefix")
+    bulk_upload.add_argument("--compress", choices=oci_compression.CODECS,
+                             help="Compress text, JSON, CSV, logs... on the fly (sets Content-Encoding)")
+    bulk_sync = bulk_subparsers.add_parser("sync", help="Upload only new and changed files of a local directory")
+    bulk_sync.add_argument("--source", required=True, help="Local directory")
+    bulk_sync.add_argument("--prefix", default="", help="Object name prefix")
+    bulk_sync.add_argument("--delete", action="store_true", help="Also delete objects whose files are gone")
+    bulk_sync.add_argument("--check-remote", action="store_true",
+                           help="List the bucket to catch objects changed or deleted by others")
+    bulk_sync.add_argument("--manifest", help="Sync manifest file (default: one per target under "
+                                              "~/.cache/oci-resource-manager/sync)")
+    bulk_copy = bulk_subparsers.add_parser("copy", help="Copy objects to another bucket")
+    bulk_copy.add_argument("--to-bucket", required=True, help="Destination bucket")
+    bulk_copy.add_argument("--to-region", help="Destination region (defaults to the source region)")
+    bulk_copy.add_argument("--prefix", help="Only copy objects under this prefix")
+    for bulk_subparser in (bulk_delete, bulk_upload, bulk_sync, bulk_copy):
+        bulk_subparser.add_argument("--bucket", required=True, help="Bucket name")
+        bulk_subparser.add_argument("--dry-run", action="store_true", help="List work items without acting")
+
+    download_parser = subparsers.add_parser("download", help="Download an object with parallel ranged GETs")
+    download_parser.add_argument("--bucket", required=True, help="Bucket name")
+    download_parser.add_argument("--object", required=True, help="Object name")
+    download_parser.add_argument("-o", "--output", required=True, help="Local file, or - to stream to stdout")
+    download_parser.add_argument("--no-verify", action="store_true", help="Skip MD5 verification")
+    download_parser.add_argument("--decompress", action="store_true",
+                                 help="Decompress objects stored with Content-Encoding gzip or zstd")
+
+    bench_parser = subparsers.add_parser("compression-bench",
+                                         help="Compare compression codecs and levels on a sample file (offline)")
+    bench_parser.add_argument("--file", required=True, help="Sample file, e.g. a log or JSON export")
+    bench_parser.add_argument("--codec", action="append", choices=oci_compression.CODECS, help="Codec to test (repeatable)")
+
+    audit_parser = subparsers.add_parser("audit-rules", help="Query and audit security list rules")
+    audit_parser.add_argument("-c", "--compartment", action="append", default=[],
+                              help="Compartment OCID (repeatable)")
+    audit_parser.add_argument("--tenancy", action="store_true", help="Audit every compartment in the tenancy")
+    audit_parser.add_argument("--protocol", default="all", help="tcp, udp, icmp, all or a protocol number")
+    audit_parser.add_argument("--port", type=int, help="Destination port")
+    audit_parser.add_argument("--cidr", default="0.0.0.0/0", help="Source (ingress) or destination (egress) CIDR")
+    audit_parser.add_argument("--direction", choices=["INGRESS", "EGRESS"], default="INGRESS")
+    audit_parser.add_argument("--exposure", action="store_true", help="Report sensitive ports open to the internet")
+    audit_parser.add_argument("--redundant", action="store_true", help="Report duplicate and shadowed rules")
+
+    apply_rules_parser = subparsers.add_parser("apply-rules", help="Apply declarative security list rule changes")
+    apply_rules_parser.add_argument("--file", required=True, help="Change sets (.yaml, .yml or .csv)")
+    apply_rules_parser.add_argument("-c", "--compartment", action="append", default=[],
+                                    help="Index these compartments first so unchanged lists need no API call")
+    apply_rules_parser.add_argument("--dry-run", action="store_true", help="Report diffs without updating")
+
+    fleet_parser = subparsers.add_parser("fleet", help="Launch many instances in one parallel operation")
+    fleet_parser.add_argument("-c", "--compartment", required=True, help="Compartment OCID")
+    fleet_parser.add_argument("--count", type=int, default=0, help="Number of instances")
+    fleet_parser.add_argument("--name-pattern", default="fleet-{index:02d}", help="Display name pattern")
+    fleet_parser.add_argument("--image", required=True, help="Image OCID")
+    fleet_parser.add_argument("--shape", required=True, help="Shape name")
+    fleet_parser.add_argument("--ocpus", type=float, help="OCPUs (Flex shapes)")
+    fleet_parser.add_argument("--memory", type=float, help="Memory in GB (Flex shapes)")
+    fleet_parser.add_argument("--subnet", action="append", required=True,
+                              help="Subnet OCID (repeatable; instances are spread across them)")
+    fleet_parser.add_argument("--ad", action="append", default=[],
+                              help="Availability domain (repeatable; defaults to all)")
+    fleet_parser.add_argument("--ssh-key-file", required=True, help="SSH public key file")
+    fleet_parser.add_argument("--overrides", help="JSON file with a list of per-instance overrides")
+    fleet_parser.add_argument("--concurrency", type=int, default=5, help="Launches in flight")
+    fleet_parser.add_argument("--rate", type=float, default=2.0, help="Launches per second")
+    fleet_parser.add_argument("--no-wait", action="store_true", help="Do not wait for RUNNING")
+
+    blueprint_parser = subparsers.add_parser("blueprint", help="Provision a whole network from a blueprint")
+    blueprint_parser.add_argument("--file", required=True, help="Blueprint (.json, .yaml or .yml)")
+    blueprint_parser.add_argument("-c", "--compartment", required=True, help="Compartment OCID")
+    blueprint_parser.add_argument("--no-rollback", action="store_true",
+                                  help="Keep already created resources when a step fails")
+
+    inventory_parser = subparsers.add_parser("inventory", help="Resource totals per compartment subtree")
+    inventory_parser.add_argument("-c", "--compartment", help="Subtree root (defaults to the tenancy)")
+
+    teardown_parser = subparsers.add_parser("teardown", help="Delete a VCN and everything in it")
+    teardown_parser.add_argument("--vcn", required=True, help="VCN OCID")
+    teardown_parser.add_argument("--dry-run", action="store_true", help="List what would be deleted")
+
+    record_parser = subparsers.add_parser("record", help="Record API traffic of the performance scenarios")
+    record_parser.add_argument("--cassettes", required=True, help="Directory for the cassettes")
+    record_parser.add_argument("-c", "--compartment", required=True, help="Compartment OCID")
+    record_parser.add_argument("--vcn", help="VCN OCID for per-VCN listings (defaults to the first VCN)")
+    record_parser.add_argument("--bucket", help="Bucket for object listings (defaults to the first bucket)")
+    record_parser.add_argument("--scenario", action="append", help="Only these scenarios (repeatable)")
+
+    perf_parser = subparsers.add_parser("perf-check", help="Replay recorded scenarios offline against budgets")
+    perf_parser.add_argument("--cassettes", required=True, help="Directory with recorded cassettes")
+    perf_parser.add_argument("--budgets", help='JSON file {"scenario": {"max_calls": n, "max_seconds": s}}')
+    perf_parser.add_argument("--latency", default="recorded",
+                             help="'recorded' to replay recorded latencies, or seconds per call (0 = instant)")
+    perf_parser.add_argument("--scenario", action="append", help="Only these scenarios (repeatable)")
+
+    load_parser = subparsers.add_parser("loadtest", help="Drive concurrent simulated app sessions on recorded data")
+    load_parser.add_argument("--cassettes", required=True, help="Directory with recorded cassettes")
+    load_parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrency levels")
+    load_parser.add_argument("--iterations", type=int, default=1, help="Journeys per session")
+    load_parser.add_argument("--latency", default="recorded",
+                             help="'recorded' to serve recorded latencies, or seconds per call")
+    return parser
+
+
+def _progress_printer() -> Callable:
+    """Return a BulkProgress callback that reports on stderr at most once per second."""
+    last_report = [0.0]
+
+    def report(progress: oci_bulk.BulkProgress) -> None:
+        now = time.monotonic()
+        if now - last_report[0] >= 1:
+            last_report[0] = now
+            unchanged = f"{progress.skipped} unchanged, " if progress.skipped else ""
+            print(f"{progress.done} done, {progress.failed} failed, {unchanged}"
+                  f"{progress.ops_per_second:.0f} ops/s, {progress.bytes_per_second / (1024 * 1024):.1f} MB/s",
+                  file=sys.stderr)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("record", "perf-check", "loadtest"):
+        # These build their own managers, inside the recording or replay
+        return run_harness(args)
+    if args.command == "compression-bench":
+        # Offline, so no OCI config is needed
+        write_records(oci_compression.benchmark(args.file, args.codec or oci_compression.CODECS), args.format)
+        return 0
+    manager = OCIManager(config_file=args.config_file, profile=args.profile,
+                         region=args.region, max_workers=args.workers,
+                         connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+    try:
+        return run_command(parser, args, manager)
+    finally:
+        if args.pool_stats:
+            print(json.dumps(manager.transport.stats.snapshot()), file=sys.stderr)
+
+
+def run_harness(args) -> int:
+    if args.command == "record":
+        summaries = oci_replay.record_scenarios(
+            args.cassettes, args.compartment, args.config_file, args.profile, args.region, args.workers,
+            args.scenario, vcn_id=args.vcn, bucket_name=args.bucket)
+        write_records(summaries, args.format)
+        return 1 if any(summary["status"] == "error" for summary in summaries) else 0
+
+    latency = args.latency if args.latency == "recorded" else float(args.latency)
+    if args.command == "loadtest":
+        levels = [int(level) for level in args.sessions.split(",")]
+        # NDJSON reports each level as soon as it finishes
+        stream = args.format == "ndjson"
+        results = oci_loadtest.run_load_test(args.cassettes, levels, latency, args.iterations,
+                                             on_level=(lambda result: write_records([result])) if stream else None)
+        if not stream:
+            write_records(results, args.format)
+        return 1 if any(result["errors"] for result in results) else 0
+
+    budgets = None
+    if args.budgets:
+        with open(args.budgets, encoding="utf-8") as source:
+            budgets = json.load(source)
+    results = oci_replay.check_scenarios(args.cassettes, budgets, latency, args.scenario)
+    write_records(results, args.format)
+    return 1 if any(result["status"] == "failed" for result in results) else 0
+
+
+def run_command(parser: argparse.ArgumentParser, args, manager: OCIManager) -> int:
+    if args.command == "list":
+        if args.kind in LISTERS and not args.compartment:
+            parser.error(f"list {args.kind} requires at least one --compartment")
+        if args.kind == "objects" and not args.bucket:
+            parser.error("list objects requires --bucket")
+        compartment_ids = args.compartment
+        if args.subtree:
+            tree = oci_inventory.CompartmentTree.load(manager)
+            compartment_ids = list(dict.fromkeys(c for root in compartment_ids for c in tree.subtree(root)))
+        write_records(iter_resources(manager, args.kind, compartment_ids, args), args.format)
+        return 0
+
+    if args.command == "action":
+        if not args.id and not args.compartment:
+            parser.error("action requires --id or --compartment")
+        resource_ids = list(args.id)
+        if args.compartment:
+            kind = ACTIONS[args.action][0]
+            targets = select_targets(iter_resources(manager, kind, args.compartment),
+                                     kind, args.name_prefix, args.state)
+            resource_ids.extend(target["id"] for target in targets)
+        failures = 0
+        def counted(results):
+            nonlocal failures
+            for result in results:
+                failures += result["status"] == "error"
+                yield result
+        write_records(counted(run_action(manager, args.action, resource_ids, args.dry_run)), args.format)
+        return 1 if failures else 0
+
+    if args.command == "export":
+        if args.kind == "objects" and not args.bucket:
+            parser.error("export objects requires --bucket")
+        if args.kind != "objects" and not args.compartment:
+            parser.error(f"export {args.kind} requires at least one --compartment")
+        count = oci_export.export_inventory(manager, args.kind, args.output, args.export_format,
+                                            args.compartment, args.bucket, args.prefix)
+        print(f"Exported {count} {args.kind}", file=sys.stderr)
+        return 0
+
+    if args.command == "bulk":
+        if args.operation == "delete" and not args.name and args.prefix is None:
+            parser.error("bulk delete requires --name or --prefix")
+        progress = oci_bulk.BulkProgress(on_update=_progress_printer())
+        # The results are generated lazily, so the calls happen while they are written
+        with call_context(priority=BULK):
+            if args.operation == "delete":
+                results = oci_bulk.bulk_delete(manager, args.bucket, args.name, args.prefix,
+                                               args.dry_run, progress)
+            elif args.operation == "upload":
+                upload = oci_bulk.bulk_upload_directory if os.path.isdir(args.source) else oci_bulk.bulk_upload_zip
+                results = upload(manager, args.bucket, args.source, args.prefix, args.dry_run, progress,
+                                 args.compress)
+            elif args.operation == "sync":
+                results = oci_sync.sync_directory(manager, args.bucket, args.source, args.prefix, args.delete,
+                                                  args.check_remote, args.manifest, args.dry_run, progress)
+            else:
+                results = oci_bulk.bulk_copy(manager, args.bucket, args.to_bucket, args.prefix,
+                                             args.to_region, args.dry_run, progress)
+            write_records(results, args.format)
+        print(json.dumps(progress.summary()), file=sys.stderr)
+        return 1 if progress.failed else 0
+
+    if args.command == "audit-rules":
+        compartment_ids = list(args.compartment)
+        if args.tenancy:
+            compartment_ids = [manager.tenancy_id] + [c["id"] for c in manager.list_compartments()]
+        if not compartment_ids:
+            parser.error("audit-rules requires --compartment or --tenancy")
+        index = SecurityRuleIndex.build(manager, compartment_ids)
+        if args.exposure:
+            findings = index.exposure()
+        elif args.redundant:
+            findings = index.redundant_rules()
+        else:
+            findings = index.query(args.protocol, args.port, args.cidr, args.direction)
+        write_records(findings, args.format)
+        return 0
+
+    if args.command == "apply-rules":
+        changes = oci_rule_changes.load_rule_changes(args.file)
+        cached = SecurityRuleIndex.build(manager, args.compartment) if args.compartment else None
+        progress = oci_bulk.BulkProgress(on_update=_progress_printer())
+        write_records(oci_rule_changes.apply_rule_changes(manager, changes, cached, args.dry_run, progress),
+                      args.format)
+        return 1 if progress.failed else 0
+
+    if args.command == "fleet":
+        with open(os.path.expanduser(args.ssh_key_file)) as key_file:
+            ssh_public_key = key_file.read().strip()
+        overrides = None
+        if args.overrides:
+            with open(args.overrides) as overrides_file:
+                overrides = json.load(overrides_file)
+        subnets = [subnet for subnet in manager.iter_subnets(args.compartment) if subnet["id"] in args.subnet]
+        ads = args.ad or [ad["name"] for ad in manager.list_availability_domains(args.compartment)]
+        shape_config = {"ocpus": args.ocpus, "memory_in_gbs": args.memory} if args.ocpus else None
+        specs = oci_fleet.plan_fleet(args.image, args.shape, subnets, ads, ssh_public_key, args.count,
+                                     args.name_pattern, shape_config, overrides=overrides)
+
+        last_report = [0.0]
+
+        def report(progress: oci_fleet.FleetProgress) -> None:
+            if time.monotonic() - last_report[0] >= 5:
+                last_report[0] = time.monotonic()
+                print(", ".join(f"{count} {state}" for state, count in progress.counts().items()), file=sys.stderr)
+
+        results = oci_fleet.launch_fleet(manager, args.compartment, specs, args.concurrency, args.rate,
+                                         wait=not args.no_wait, progress=oci_fleet.FleetProgress(report))
+        write_records(results, args.format)
+        return 1 if any(result["state"] == "FAILED" for result in results) else 0
+
+    if args.command == "blueprint":
+        def report(progress: oci_blueprint.ResourceProgress) -> None:
+            print(", ".join(f"{count} {state}" for state, count in progress.counts().items()), file=sys.stderr)
+
+        progress = oci_blueprint.ResourceProgress(report)
+        blueprint = oci_blueprint.load_blueprint(args.file)
+        try:
+            oci_blueprint.provision_blueprint(manager, args.compartment, blueprint, progress,
+                                              rollback=not args.no_rollback)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        finally:
+            write_records(progress.results(), args.format)
+        return 0
+
+    if args.command == "inventory":
+        inventory = oci_inventory.SubtreeInventory.build(manager, args.compartment or manager.tenancy_id)
+        write_records(inventory.rows(), args.format)
+        for key, error in inventory.errors.items():
+            print(f"{key}: {error}", file=sys.stderr)
+        return 1 if inventory.errors else 0
+
+    if args.command == "teardown":
+        if args.dry_run:
+            _, resources, deps = oci_teardown.plan_teardown(manager, args.vcn)
+            write_records([dict(resource, waits_for=deps[key]) for key, resource in resources.items()], args.format)
+            return 0
+
+        def report(progress: oci_blueprint.ResourceProgress) -> None:
+            print(", ".join(f"{count} {state}" for state, count in progress.counts().items()), file=sys.stderr)
+
+        progress = oci_blueprint.ResourceProgress(report)
+        try:
+            oci_teardown.teardown_vcn(manager, args.vcn, progress)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        finally:
+            write_records(progress.results(), args.format)
+        return 0
+
+    if args.command == "download":
+        if args.output == "-":
+            for chunk in manager.iter_object(args.bucket, args.object, verify=not args.no_verify,
+                                             decode=args.decompress):
+                sys.stdout.buffer.write(chunk)
+            return 0
+        write_records([manager.download_object(args.bucket, args.object, args.output,
+                                               verify=not args.no_verify, decode=args.decompress)], args.format)
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Streaming inventory export to NDJSON, CSV or Parquet.
+
+Records are pulled from OCIManager's page-by-page iter_* listers and written as
+they arrive, so memory stays bounded no matter how large the listing is. A
+background thread fetches the next pages while the current ones are written.
+
+Parquet output needs the optional pyarrow package. A Parquet file has one schema,
+but records of a listing do not always share their keys or value types. Unless a
+schema is given, batches are therefore spooled to a temporary file while the
+schema of all of them is worked out, and then written cast to it.
+"""
+import contextvars
+import csv
+import itertools
+import json
+import os
+import pickle
+import queue
+import sys
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from oci_utils import OCIManager
+
+# Resource kind -> function(manager, compartment_id) yielding dicts
+EXPORTERS: Dict[str, Callable] = {
+    "instances": lambda m, c: m.iter_instances(c),
+    "adbs": lambda m, c: m.iter_autonomous_databases(c),
+    "vcns": lambda m, c: m.iter_vcns(c),
+    "subnets": lambda m, c: m.iter_subnets(c),
+    "security-rules": lambda m, c: m.iter_security_rules(c),
+    "buckets": lambda m, c: m.iter_buckets(c),
+}
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+_BUFFER_SIZE = 1024 * 1024
+_DONE = object()
+# How often a blocked producer checks whether the consumer has stopped
+_PUT_TIMEOUT = 0.5
+
+
+def iter_inventory(manager: OCIManager, kind: str, compartment_ids: Iterable[str] = (),
+                   bucket: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yield inventory records of one kind. Compartment-scoped kinds are tagged with
+    their compartment_id; "objects" lists a single bucket, optionally under a prefix.
+    """
+    if kind == "objects":
+        yield from manager.iter_objects(bucket, prefix=prefix)
+        return
+    exporter = EXPORTERS[kind]
+    for compartment_id in compartment_ids:
+        for record in exporter(manager, compartment_id):
+            record["compartment_id"] = compartment_id
+            yield record
+
+
+def prefetch(records: Iterable[Dict], depth: int = 5, chunk_size: int = 1000) -> Iterator[Dict]:
+    """
+    Run a record iterator on a background thread so API page fetches overlap with
+    whatever the consumer does. Records are handed over in chunks of chunk_size;
+    at most depth chunks are buffered.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    error = []
+    # Set when the consumer stops early (break, or an error while writing)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        records_iter = iter(records)
+        try:
+            while True:
+                chunk = list(itertools.islice(records_iter, chunk_size))
+                if not chunk or not put(chunk):
+                    break
+        except Exception as e:
+            error.append(e)
+        finally:
+            # Ends a paginated listing the consumer no longer wants
+            close = getattr(records_iter, "close", None)
+            if close is not None:
+                close()
+            put(_DONE)
+
+    threading.Thread(target=contextvars.copy_context().run, args=(produce,), daemon=True).start()
+    try:
+        while True:
+            chunk = buffer.get()
+            if chunk is _DONE:
+                break
+            yield from chunk
+    finally:
+        stopped.set()
+    if error:
+        raise error[0]
+
+
+def _flat_value(value):
+    """Render nested values as JSON so they fit in a single CSV/Parquet cell."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def write_ndjson(records: Iterable[Dict], out) -> int:
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, default=str))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records: Iterable[Dict], out) -> int:
+    """Write records as CSV; the header is taken from the first record's keys."""
+    writer = None
+    count = 0
+    for record in records:
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(record), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _flat_value(value) for key, value in record.items()})
+        count += 1
+    return count
+
+
+def _merge_type(pa, current, new):
+    """Arrow type that holds values of both types: numbers widen to float64, anything else to string."""
+    if current is None or pa.types.is_null(current):
+        return new
+    if pa.types.is_null(new) or new == current:
+        return current
+    numeric = lambda t: pa.types.is_integer(t) or pa.types.is_floating(t)
+    if numeric(current) and numeric(new):
+        return pa.float64()
+    return pa.string()
+
+
+def _batch_types(pa, rows: List[Dict]) -> Dict[str, object]:
+    """Arrow type per key of a batch; a key with values Arrow cannot put in one column is a string."""
+    columns: Dict[str, List] = {}
+    for row in rows:
+        for key, value in row.items():
+            columns.setdefault(key, []).append(value)
+    types = {}
+    for key, values in columns.items():
+        try:
+            types[key] = pa.array(values).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+            types[key] = pa.string()
+    return types
+
+
+def _cast_rows(pa, rows: List[Dict], schema) -> List[Dict]:
+    # Values of a column widened to string (e.g. numbers in a mostly-text column) are stored as text
+    strings = [field.name for field in schema if pa.types.is_string(field.type)]
+    for row in rows:
+        for name in strings:
+            value = row.get(name)
+            if value is not None and not isinstance(value, str):
+                row[name] = str(value)
+    return rows
+
+
+def write_parquet(records: Iterable[Dict], path: str, batch_size: int = 50000, schema=None) -> int:
+    """
+    Write records to a Parquet file one row group per batch_size records. With a
+    pyarrow schema, batches are cast to it (unknown keys are dropped). Otherwise
+    the schema is unified over all batches: columns are the union of all keys,
+    conflicting types are widened, and all-null columns become strings.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    def batches(source: Iterable[Dict]) -> Iterator[List[Dict]]:
+        records_iter = iter(source)
+        while True:
+            batch = [{key: _flat_value(value) for key, value in row.items()}
+                     for row in itertools.islice(records_iter, batch_size)]
+            if not batch:
+                return
+            yield batch
+
+    def write(rows: Iterable[List[Dict]]) -> int:
+        count = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in rows:
+                writer.write_table(pa.Table.from_pylist(_cast_rows(pa, batch, schema), schema=schema))
+                count += len(batch)
+        return count
+
+    if schema is not None:
+        return write(batches(records))
+
+    types: Dict[str, object] = {}
+    with tempfile.TemporaryFile() as spool:
+        for batch in batches(records):
+            for name, type_ in _batch_types(pa, batch).items():
+                types[name] = _merge_type(pa, types.get(name), type_)
+            pickle.dump(batch, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        if not types:
+            return 0
+        schema = pa.schema([(name, pa.string() if pa.types.is_null(type_) else type_)
+                            for name, type_ in types.items()])
+        spool.seek(0)
+
+        def spooled() -> Iterator[List[Dict]]:
+            while True:
+                try:
+                    yield pickle.load(spool)
+                except EOFError:
+                    return
+
+        return write(spooled())
+
+
+def export_records(records: Iterable[Dict], path: str, fmt: Optional[str] = None,
+                   background: bool = True) -> int:
+    """
+    Stream records to path ("-" for stdout) in the given format, or the one implied
+    by the file extension. Returns the number of records written.
+    """
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+        fmt = {"json": "ndjson", "jsonl": "ndjson"}.get(extension, extension)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if background:
+        records = prefetch(records)
+    if fmt == "parquet":
+        if path == "-":
+            raise ValueError("Parquet export needs a file path, not stdout")
+        return write_parquet(records, path)
+    writer = write_ndjson if fmt == "ndjson" else write_csv
+    if path == "-":
+        return writer(records, sys.stdout)
+    with open(path, "w", newline="", buffering=_BUFFER_SIZE, encoding="utf-8") as out:
+        return writer(records, out)
+
+
+def export_inventory(manager: OCIManager, kind: str, path: str, fmt: Optional[str] = None,
+                     compartment_ids: Iterable[str] = (), bucket: Optional[str] = None,
+                     prefix: Optional[str] = None) -> int:
+    """Export one inventory kind straight from the OCI APIs to a file."""
+    return export_records(iter_inventory(manager, kind, compartment_ids, bucket, prefix), path, fmt)
@@ -0,0 +1,211 @@
+"""
+Fleet launch: create many compute instances in one operation.
+
+plan_fleet turns a count (or a list of per-instance overrides) into launch specs
+spread round-robin across subnets and availability domains. launch_fleet runs
+the launches on OCIManager's worker pool with at most `concurrency` in flight and
+a steady launch rate, so a 50-node fleet stays under the Compute API rate limits
+(throttled calls are additionally retried by the SDK). When an AD is out of
+host capacity for the shape, the instance is retried in the next AD and that AD
+is skipped for the rest of the fleet. Launched instances are then followed to
+RUNNING with one paginated list_instances call per poll for the whole fleet,
+not one get_instance per node. FleetProgress aggregates every instance's state.
+"""
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from oci_utils import OCIManager
+
+# States after which an instance is no longer tracked
+FINAL_STATES = ("RUNNING", "FAILED", "TERMINATING", "TERMINATED")
+
+
+class FleetProgress:
+    """
+    Thread-safe per-instance state of a fleet launch, keyed by the instance's
+    index in the launched specs (display names need not be unique).
+    """
+
+    def __init__(self, on_update: Optional[Callable[["FleetProgress"], None]] = None):
+        self.on_update = on_update
+        self.instances: Dict[int, Dict] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, index: int, **fields) -> None:
+        with self._lock:
+            self.instances.setdefault(index, {"index": index}).update(fields)
+        if self.on_update:
+            self.on_update(self)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of instances per state, e.g. {"PROVISIONING": 12, "RUNNING": 38}."""
+        with self._lock:
+            states = [instance.get("state") for instance in self.instances.values()]
+        return {state: states.count(state) for state in sorted(set(states))}
+
+    @property
+    def done(self) -> int:
+        return sum(count for state, count in self.counts().items() if state in FINAL_STATES)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def results(self) -> List[Dict]:
+        with self._lock:
+            return [dict(instance) for instance in self.instances.values()]
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self.next_slot - now)
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay:
+            time.sleep(delay)
+
+
+def _placements(subnets: List[Dict], availability_domains: List[str]) -> List[Tuple[str, str]]:
+    """(AD, subnet id) pairs, interleaved so that neighbours land in different ADs."""
+    by_ad: Dict[str, List[Tuple[str, str]]] = {}
+    for subnet in subnets:
+        for ad in [subnet["availability_domain"]] if subnet.get("availability_domain") else availability_domains:
+            by_ad.setdefault(ad, []).append((ad, subnet["id"]))
+    interleaved = itertools.zip_longest(*by_ad.values())
+    return [placement for group in interleaved for placement in group if placement]
+
+
+def plan_fleet(image_id: str, shape: str, subnets: List[Dict], availability_domains: List[str],
+               ssh_public_key: str, count: int = 0, name_pattern: str = "fleet-{index:02d}",
+               shape_config: Optional[Dict] = None, boot_volume_size_in_gbs: Optional[int] = None,
+               overrides: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    One launch spec per instance: max(count, len(overrides)) instances named by
+    name_pattern ({index} starts at 1). subnets are dicts with id and
+    availability_domain (None for regional subnets). Each spec carries its
+    placements in fallback order, starting at a different one per instance.
+    overrides[i] replaces fields of instance i (display_name, image_id, shape,
+    shape_config, subnet_id, availability_domain, ...). Display names must be
+    unique, so a fleet's instances can be told apart.
+    """
+    overrides = overrides or []
+    placements = _placements(subnets, availability_domains)
+    if not placements:
+        raise ValueError("Fleet launch needs at least one subnet and availability domain")
+    specs = []
+    for index in range(max(count, len(overrides))):
+        override = dict(overrides[index]) if index < len(overrides) else {}
+        start = index % len(placements)
+        candidates = placements[start:] + placements[:start]
+        subnet_id = override.pop("subnet_id", None)
+        ad = override.pop("availability_domain", None)
+        if subnet_id or ad:
+            candidates = [(a, s) for a, s in candidates
+                          if (not subnet_id or s == subnet_id) and (not ad or a == ad)] or [(ad, subnet_id)]
+        specs.append(dict({
+            "display_name": name_pattern.format(index=index + 1),
+            "image_id": image_id,
+            "shape": shape,
+            "ssh_public_key": ssh_public_key,
+            "shape_config": shape_config,
+            "boot_volume_size_in_gbs": boot_volume_size_in_gbs,
+            "placements": candidates
+        }, **override))
+    names = [spec["display_name"] for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Fleet display names must be unique; repeated: {', '.join(duplicates)} "
+                         f"(use {{index}} in the name pattern)")
+    return specs
+
+
+def _is_capacity_error(error: Exception) -> bool:
+    # Compute reports "Out of host capacity." as a 500 InternalError
+    return "capacity" in str(getattr(error, "message", None) or error).lower()
+
+
+def launch_fleet(manager: OCIManager, compartment_id: str, specs: Iterable[Dict], concurrency: int = 5,
+                 launches_per_second: float = 2.0, wait: bool = True, timeout: float = 1800,
+                 poll_interval: float = 10, progress: Optional[FleetProgress] = None) -> List[Dict]:
+    """
+    Launch every spec (see plan_fleet) and, with wait, follow the instances until
+    they are RUNNING or failed. Returns one result per instance with its id, AD,
+    state and any error. Concurrency is also capped by the manager's max_workers.
+    """
+    specs = list(specs)
+    progress = progress or FleetProgress()
+    for index, spec in enumerate(specs):
+        progress.update(index, name=spec["display_name"], state="PENDING")
+    limiter = _RateLimiter(launches_per_second)
+    slots = threading.BoundedSemaphore(concurrency)
+    # (shape, AD) pairs found out of capacity; later instances go elsewhere first
+    exhausted = set()
+
+    def launch(item: Tuple[int, Dict]) -> Dict:
+        index, spec = item
+        ordered = sorted(spec["placements"], key=lambda placement: (spec["shape"], placement[0]) in exhausted)
+        errors = []
+        with slots:
+            for ad, subnet_id in ordered:
+                limiter.wait()
+                progress.update(index, state="LAUNCHING", availability_domain=ad, attempts=len(errors) + 1)
+                try:
+                    return manager.launch_instance(
+                        compartment_id=compartment_id,
+                        display_name=spec["display_name"],
+                        image_id=spec["image_id"],
+                        shape=spec["shape"],
+                        subnet_id=subnet_id,
+                        ssh_public_key=spec["ssh_public_key"],
+                        boot_volume_size_in_gbs=spec.get("boot_volume_size_in_gbs"),
+                        shape_config=spec.get("shape_config"),
+                        availability_domain=ad
+                    )
+                except Exception as e:
+                    if not _is_capacity_error(e):
+                        raise
+                    exhausted.add((spec["shape"], ad))
+                    errors.append(f"{ad}: {getattr(e, 'message', None) or e}")
+        raise RuntimeError("Out of capacity in every availability domain tried (" + "; ".join(errors) + ")")
+
+    for (index, _), result, error in manager.run_parallel(launch, list(enumerate(specs))):
+        if error:
+            progress.update(index, state="FAILED", error=str(error))
+        else:
+            progress.update(index, id=result["id"], state=result["state"],
+                            work_request_id=result["work_request_id"])
+    if wait:
+        wait_for_fleet(manager, compartment_id, progress, timeout, poll_interval)
+    return progress.results()
+
+
+def wait_for_fleet(manager: OCIManager, compartment_id: str, progress: FleetProgress,
+                   timeout: float = 1800, poll_interval: float = 10) -> None:
+    """Poll the compartment's instance list until every launched instance reaches a final state."""
+    pending = {instance["id"]: index for index, instance in progress.instances.items()
+               if instance.get("id") and instance.get("state") not in FINAL_STATES}
+    deadline = time.monotonic() + timeout
+    while pending:
+        if time.monotonic() >= deadline:
+            for index in pending.values():
+                progress.update(index, error=f"Not RUNNING after {timeout:.0f}s")
+            return
+        time.sleep(poll_interval)
+        for instance in manager.iter_instances(compartment_id, with_ips=False):
+            index = pending.get(instance["id"])
+            if index is None:
+                continue
+            progress.update(index, state=instance["state"])
+            if instance["state"] in FINAL_STATES:
+                del pending[instance["id"]]
@@ -0,0 +1,225 @@
+"""
+Compartment subtree inventory.
+
+CompartmentTree is the tenancy's compartment hierarchy (one paginated
+list_compartments call, cached for everyone in the process). SubtreeInventory
+walks a subtree in parallel, one task per (compartment, resource kind), and
+keeps each compartment's own totals plus precomputed rollups: the totals of the
+compartment and everything below it. Refreshing one compartment re-lists only
+that compartment and adds the difference to it and its ancestors, so the
+rollups stay current without re-walking the tree. Snapshots are kept in the
+shared cache (SubtreeInventory.cached) and read by every session, so they are
+never changed in place: a refresh applies its difference to a copy of the
+newest snapshot and stores that copy, one refresh per snapshot at a time.
+"""
+import copy
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from oci_cache import MINUTE, cache
+from oci_utils import OCIManager
+
+TREE_TTL = 15 * MINUTE
+INVENTORY_TTL = 15 * MINUTE
+
+# Totals kept per compartment, in display order
+METRICS = ("instances", "instance_ocpus", "instance_memory_gbs", "adbs", "adb_ocpus", "adb_storage_tbs",
+           "vcns", "buckets")
+
+_GONE_STATES = ("TERMINATING", "TERMINATED")
+
+# Cache key -> lock serialising refreshes of that snapshot in this process
+_refresh_locks: Dict[tuple, threading.Lock] = {}
+
+
+def _instance_totals(manager: OCIManager, compartment_id: str) -> Dict[str, float]:
+    totals = {"instances": 0, "instance_ocpus": 0.0, "instance_memory_gbs": 0.0}
+    for instance in manager.iter_instances(compartment_id, with_ips=False):
+        if instance["state"] in _GONE_STATES:
+            continue
+        totals["instances"] += 1
+        totals["instance_ocpus"] += instance["ocpus"] or 0
+        totals["instance_memory_gbs"] += instance["memory_in_gbs"] or 0
+    return totals
+
+
+def _adb_totals(manager: OCIManager, compartment_id: str) -> Dict[str, float]:
+    totals = {"adbs": 0, "adb_ocpus": 0.0, "adb_storage_tbs": 0.0}
+    for db in manager.iter_autonomous_databases(compartment_id):
+        if db["lifecycle_state"] in _GONE_STATES:
+            continue
+        totals["adbs"] += 1
+        totals["adb_ocpus"] += db["cpu_core_count"] or 0
+        totals["adb_storage_tbs"] += db["data_storage_size_in_tbs"] or 0
+    return totals
+
+
+# Resource kind -> function(manager, compartment_id) returning some of METRICS
+COUNTERS = {
+    "instances": _instance_totals,
+    "adbs": _adb_totals,
+    "vcns": lambda m, c: {"vcns": sum(vcn["state"] not in _GONE_STATES for vcn in m.iter_vcns(c))},
+    "buckets": lambda m, c: {"buckets": sum(1 for _ in m.iter_buckets(c))},
+}
+
+
+def _zero() -> Dict[str, float]:
+    return dict.fromkeys(METRICS, 0)
+
+
+class CompartmentTree:
+    """Parent/child links of every active compartment, rooted at the tenancy."""
+
+    def __init__(self, root_id: str, compartments: List[Dict]):
+        self.root_id = root_id
+        self.names = {root_id: "(root)"}
+        self.parents: Dict[str, Optional[str]] = {root_id: None}
+        self.children: Dict[str, List[str]] = {root_id: []}
+        for compartment in compartments:
+            self.names[compartment["id"]] = compartment["name"]
+            self.parents[compartment["id"]] = compartment["parent_id"]
+            self.children.setdefault(compartment["id"], [])
+        for compartment in compartments:
+            # Parents outside the active set (e.g. deleting) make a compartment unreachable
+            if compartment["parent_id"] in self.children:
+                self.children[compartment["parent_id"]].append(compartment["id"])
+
+    @classmethod
+    def load(cls, manager: OCIManager) -> "CompartmentTree":
+        return cache.get_or_load(("compartment-tree", manager.tenancy_id),
+                                 lambda: cls(manager.tenancy_id, manager.cached_compartments()), TREE_TTL)
+
+    @staticmethod
+    def invalidate(manager: OCIManager) -> None:
+        cache.invalidate("compartments", manager.tenancy_id)
+        cache.invalidate("compartment-tree", manager.tenancy_id)
+
+    def subtree(self, compartment_id: str) -> List[str]:
+        """The compartment and all of its descendants, parents before children."""
+        ids, stack = [], [compartment_id]
+        while stack:
+            current = stack.pop()
+            ids.append(current)
+            stack.extend(reversed(self.children.get(current, [])))
+        return ids
+
+    def ancestors(self, compartment_id: str) -> Iterator[str]:
+        """The compartment itself, then each parent up to the root."""
+        while compartment_id is not None:
+            yield compartment_id
+            compartment_id = self.parents.get(compartment_id)
+
+    def path(self, compartment_id: str) -> str:
+        return " / ".join(self.names.get(c, c) for c in reversed(list(self.ancestors(compartment_id))))
+
+
+class SubtreeInventory:
+    """Per-compartment totals and subtree rollups for one compartment's subtree."""
+
+    def __init__(self, tree: CompartmentTree, root_id: str):
+        self.tree = tree
+        self.root_id = root_id
+        self.compartment_ids = tree.subtree(root_id)
+        self.own: Dict[str, Dict[str, float]] = {c: _zero() for c in self.compartment_ids}
+        self.rollups: Dict[str, Dict[str, float]] = {c: _zero() for c in self.compartment_ids}
+        self.errors: Dict[str, str] = {}
+
+    @classmethod
+    def build(cls, manager: OCIManager, compartment_id: str,
+              tree: Optional[CompartmentTree] = None) -> "SubtreeInventory":
+        """Count every resource kind in every compartment of the subtree in parallel, then roll up."""
+        inventory = cls(tree or CompartmentTree.load(manager), compartment_id)
+        for compartment_id, totals in cls._count(manager, inventory.compartment_ids, inventory.errors).items():
+            inventory.own[compartment_id] = totals
+        # Children come after their parents in compartment_ids, so walking it
+        # backwards finishes every child before its parent is summed
+        for compartment_id in reversed(inventory.compartment_ids):
+            rollup = dict(inventory.own[compartment_id])
+            for child in inventory.tree.children.get(compartment_id, []):
+                for metric in METRICS:
+                    rollup[metric] += inventory.rollups[child][metric]
+            inventory.rollups[compartment_id] = rollup
+        return inventory
+
+    @staticmethod
+    def _cache_key(manager: OCIManager, compartment_id: str) -> tuple:
+        return ("subtree-inventory", manager.config.get("region"), compartment_id)
+
+    @classmethod
+    def cached(cls, manager: OCIManager, compartment_id: str, load: bool = True,
+               rescan: bool = False) -> Optional["SubtreeInventory"]:
+        """
+        The shared snapshot of a subtree (every session and, with a shared cache
+        backend, every replica sees the same one). Scanned when missing, unless
+        load is False; rescan discards the snapshot first.
+        """
+        key = cls._cache_key(manager, compartment_id)
+        if rescan:
+            cache.invalidate(*key)
+        if not load:
+            return cache.get(key)
+        return cache.get_or_load(key, lambda: cls.build(manager, compartment_id), INVENTORY_TTL)
+
+    @staticmethod
+    def _count(manager: OCIManager, compartment_ids: List[str],
+               errors: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+        totals = {compartment_id: _zero() for compartment_id in compartment_ids}
+        tasks = [(compartment_id, kind) for compartment_id in compartment_ids for kind in COUNTERS]
+        for (compartment_id, kind), counted, error in manager.run_parallel(
+            lambda task: COUNTERS[task[1]](manager, task[0]), tasks
+        ):
+            if error:
+                errors[f"{compartment_id}:{kind}"] = str(getattr(error, "message", None) or error)
+                continue
+            totals[compartment_id].update(counted)
+        return totals
+
+    def _copy(self) -> "SubtreeInventory":
+        snapshot = copy.copy(self)
+        snapshot.own = {c: dict(totals) for c, totals in self.own.items()}
+        snapshot.rollups = {c: dict(totals) for c, totals in self.rollups.items()}
+        snapshot.errors = dict(self.errors)
+        return snapshot
+
+    def refresh(self, manager: OCIManager, compartment_id: str) -> "SubtreeInventory":
+        """
+        Re-count one compartment (not its children) and apply the difference to
+        its rollup and every ancestor's, in a copy of the newest cached snapshot
+        (this one if there is none). Returns the refreshed snapshot, which
+        replaces the cached one; this one is left unchanged.
+        """
+        if compartment_id not in self.own:
+            raise ValueError(f"Compartment {compartment_id} is not in this subtree")
+        errors: Dict[str, str] = {}
+        new = self._count(manager, [compartment_id], errors)[compartment_id]
+        key = self._cache_key(manager, self.root_id)
+        with _refresh_locks.setdefault(key, threading.Lock()):
+            # Another session may have refreshed (or rescanned) since this snapshot was read
+            latest = cache.get(key)
+            snapshot = (latest if latest is not None and compartment_id in latest.own else self)._copy()
+            delta = {metric: new[metric] - snapshot.own[compartment_id][metric] for metric in METRICS}
+            snapshot.own[compartment_id] = new
+            for error_key in [k for k in snapshot.errors if k.startswith(f"{compartment_id}:")]:
+                del snapshot.errors[error_key]
+            snapshot.errors.update(errors)
+            for ancestor in snapshot.tree.ancestors(compartment_id):
+                if ancestor not in snapshot.rollups:
+                    break
+                for metric in METRICS:
+                    snapshot.rollups[ancestor][metric] += delta[metric]
+            cache.set(key, snapshot, INVENTORY_TTL)
+        return snapshot
+
+    def rows(self) -> List[Dict]:
+        """One row per compartment with its own totals and subtree rollups, in tree order."""
+        depth = {self.root_id: 0}
+        rows = []
+        for compartment_id in self.compartment_ids:
+            parent = self.tree.parents.get(compartment_id)
+            depth[compartment_id] = depth.get(parent, -1) + 1 if compartment_id != self.root_id else 0
+            row = {"compartment_id": compartment_id, "name": self.tree.names.get(compartment_id, compartment_id),
+                   "depth": depth[compartment_id]}
+            row.update({f"subtree_{metric}": value for metric, value in self.rollups[compartment_id].items()})
+            row.update(self.own[compartment_id])
+            rows.append(row)
+        return rows
@@ -0,0 +1,276 @@
+"""
+Concurrent-session load test of the Streamlit app.
+
+Every rerun of oci-gui-app.py makes blocking OCI calls on its script thread, so
+the number of users one app process can serve is bounded by API latency, by the
+shared transport's connection slots and by the GIL. run_load_test() measures
+that bound. For each concurrency level it starts that many simulated sessions
+(Streamlit AppTest instances, each with its own session state) on threads of
+this process, as the Streamlit server would. Each session clicks through
+JOURNEY: open the app, select a compartment, scan the subtree inventory, show
+instance utilization, switch the ADB metrics window and rerun.
+
+The OCI side is a FakeBackend serving the responses recorded by oci_replay
+(`oci_cli.py record`) with their recorded latency, or a fixed one. Unlike
+replay, responses are not consumed, so any number of sessions can make the same
+calls. Unknown requests get a 404. Requests still take a slot from the
+transport's scheduler, so pool contention is part of the measurement.
+
+Each level reports rerun latency percentiles, reruns per second, API calls per
+rerun and the process memory added per session.
+"""
+import collections
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from oci._vendor.requests.adapters import BaseAdapter
+
+import oci_cache
+import oci_replay
+from oci_perf import operation, record_api_call
+from oci_scheduler import host_of
+from oci_transport import get_transport, pool_size_for
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oci-gui-app.py")
+
+# Seconds one AppTest rerun may take before it counts as an error
+RERUN_TIMEOUT = 300
+
+
+def _select_compartment(app, params: Dict) -> None:
+    app.text_input(key="global_compartment_query").input(params["compartment_name"])
+
+
+def _click(key: str) -> Callable:
+    return lambda app, params: app.button(key=key).click()
+
+
+def _set(widget: str, key: str, value) -> Callable:
+    return lambda app, params: getattr(app, widget)(key=key).set_value(value)
+
+
+# (step name, action before the rerun; None for a plain rerun). Steps whose widget
+# is not on the page (e.g. no instances to show utilization for) are skipped.
+JOURNEY: List[Tuple[str, Optional[Callable]]] = [
+    ("open", None),
+    ("select compartment", _select_compartment),
+    ("scan subtree", _click("scan_subtree")),
+    ("show utilization", _set("toggle", "instance_utilization", True)),
+    ("ADB window 7d", _set("radio", "adb_metrics_window", "7d")),
+    ("rerun", None),
+]
+
+
+class FakeBackend(BaseAdapter):
+    """
+    Serves recorded responses by method and URL, as often as they are asked for.
+    latency: "recorded" or seconds per call.
+    """
+
+    def __init__(self, interactions: List[Dict], latency="recorded", scheduler=None):
+        super().__init__()
+        self.latency = latency
+        self.scheduler = scheduler
+        self.responses: Dict[Tuple[str, str], Dict] = {}
+        for interaction in interactions:
+            self.responses.setdefault((interaction["method"], interaction["url"]), interaction)
+        self.calls = 0
+        self.unknown: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        interaction = self.responses.get((request.method, request.url))
+        with self._lock:
+            self.calls += 1
+            if interaction is None:
+                self.unknown[operation(request.method, request.url)] += 1
+        if interaction is None:
+            interaction = {"status": 404, "reason": "Not Found", "headers": {"content-type": "application/json"},
+                           "body": {"json": {"code": "NotAuthorizedOrNotFound",
+                                             "message": "Not in the recorded responses"}},
+                           "elapsed": 0.0}
+        delay = interaction["elapsed"] if self.latency == "recorded" else float(self.latency)
+        if self.scheduler is None:
+            time.sleep(delay)
+        else:
+            host = host_of(request.url)
+            with self.scheduler.slot(host):
+                time.sleep(delay)
+            self.scheduler.record(host, True)
+        # As the real transport does, so the app's performance overlay shows these calls
+        record_api_call(request.method, request.url, delay, interaction["status"])
+        return oci_replay.response_for(request, interaction, kwargs.get("stream"))
+
+    def close(self):
+        pass
+
+
+def load_cassettes(directory: str) -> Tuple[List[Dict], Dict]:
+    """All recorded interactions in directory, plus the scenario parameters (the app's, if recorded)."""
+    interactions: List[Dict] = []
+    params: Dict = {}
+    tenancy = region = None
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, file_name), encoding="utf-8") as source:
+            cassette = json.load(source)
+        interactions.extend(cassette["interactions"])
+        if cassette["scenario"] == "app" or not params:
+            params = cassette["params"]
+        tenancy, region = cassette["tenancy"], cassette["region"]
+    if not interactions:
+        raise ValueError(f"No cassettes in {directory}; record some with `oci_cli.py record`")
+    return interactions, dict(params, tenancy=tenancy, region=region)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident memory of this process (Linux), else None."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _percentile(ordered: List[float], percent: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] * 1000, 1)
+
+
+@contextlib.contextmanager
+def _shared_script_cache() -> Iterator[None]:
+    """
+    Compile the app once for all sessions, as the Streamlit server does. AppTest
+    compiles it on every run, which costs time a real rerun does not pay, and
+    parallel compiles can fail in CPython ("AST constructor recursion depth mismatch").
+    """
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    original = ScriptCache.get_bytecode
+    compiled: Dict[str, object] = {}
+    lock = threading.Lock()
+
+    def get_bytecode(self, script_path: str):
+        with lock:
+            if script_path not in compiled:
+                compiled[script_path] = original(self, script_path)
+            return compiled[script_path]
+
+    ScriptCache.get_bytecode = get_bytecode
+    try:
+        yield
+    finally:
+        ScriptCache.get_bytecode = original
+
+
+def _run_session(params: Dict, iterations: int, start: threading.Barrier, timings: List[Tuple[str, float]],
+                 outcome: Dict, apps: List) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT)
+    except Exception:
+        outcome["errors"] += 1
+        start.wait()
+        return
+    apps.append(app)
+    start.wait()
+    for _ in range(iterations):
+        for step, action in JOURNEY:
+            if action is not None:
+                try:
+                    action(app, params)
+                except (KeyError, IndexError):
+                    outcome["skipped"] += 1
+                    continue
+            started = time.monotonic()
+            try:
+                app.run()
+            except Exception:
+                # Rerun timed out
+                outcome["errors"] += 1
+                continue
+            timings.append((step, time.monotonic() - started))
+            if app.exception:
+                outcome["errors"] += 1
+
+
+def run_level(backend: FakeBackend, params: Dict, sessions: int, iterations: int = 1) -> Dict:
+    """Run sessions concurrent journeys from a cold cache and summarize them."""
+    oci_cache.configure(None)
+    calls_before, unknown_before = backend.calls, sum(backend.unknown.values())
+    rss_before = _rss_bytes()
+    start = threading.Barrier(sessions + 1)
+    timings: List[Tuple[str, float]] = []
+    # One counter per session, so threads never update the same one
+    outcomes = [collections.Counter(errors=0, skipped=0) for _ in range(sessions)]
+    apps: List = []
+    threads = [threading.Thread(target=_run_session, args=(params, iterations, start, timings, outcome, apps),
+                                daemon=True) for outcome in outcomes]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    seconds = time.monotonic() - started
+    # Measured while every session's state is still alive
+    rss_after = _rss_bytes()
+    outcome = sum(outcomes, collections.Counter())
+    by_step = collections.defaultdict(list)
+    for step, elapsed in timings:
+        by_step[step].append(elapsed)
+    ordered = sorted(elapsed for _, elapsed in timings)
+    step_p95 = {step: _percentile(sorted(values), 95) for step, values in by_step.items()}
+    return {
+        "sessions": sessions,
+        "reruns": len(ordered),
+        "errors": outcome["errors"],
+        "skipped_steps": outcome["skipped"],
+        "seconds": round(seconds, 2),
+        "reruns_per_second": round(len(ordered) / seconds, 2) if seconds else None,
+        "rerun_p50_ms": _percentile(ordered, 50),
+        "rerun_p95_ms": _percentile(ordered, 95),
+        "rerun_p99_ms": _percentile(ordered, 99),
+        "slowest_step": max(step_p95, key=step_p95.get) if step_p95 else None,
+        "step_p95_ms": step_p95,
+        "api_calls_per_rerun": round((backend.calls - calls_before) / len(ordered), 1) if ordered else None,
+        "unknown_requests": sum(backend.unknown.values()) - unknown_before,
+        "memory_per_session_mb": round((rss_after - rss_before) / sessions / 2 ** 20, 1)
+        if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def run_load_test(directory: str, levels: List[int], latency="recorded", iterations: int = 1,
+                  on_level: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Drive the app at each concurrency level against the cassettes in directory.
+    Returns one summary per level (also passed to on_level as each finishes).
+    """
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError:
+        raise RuntimeError("The load test needs Streamlit (pip install streamlit)")
+    interactions, params = load_cassettes(directory)
+    if "compartment_name" not in params:
+        raise ValueError("The cassettes do not name a compartment; record them with `oci_cli.py record`")
+    transport = get_transport(pool_size_for(oci_replay.APP_MAX_WORKERS))
+    backend = FakeBackend(interactions, latency, transport.scheduler)
+    results = []
+    with tempfile.TemporaryDirectory() as home:
+        oci_replay.offline_config(home, params["tenancy"], params["region"])
+        with oci_replay.scenario_environment(home):
+            with oci_replay.mounted(transport.session, lambda _: backend), _shared_script_cache():
+                for sessions in levels:
+                    result = run_level(backend, params, sessions, iterations)
+                    results.append(result)
+                    if on_level:
+                        on_level(result)
+    return results
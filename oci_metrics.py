@@ -0,0 +1,186 @@
+"""
+Autonomous Database and compute instance utilization from the Monitoring service.
+
+Each metric is fetched with ONE MQL query for the whole compartment: Monitoring
+returns a series per resourceId, so CPU, storage and sessions for every ADB take
+three summarize_metrics_data calls (run in parallel), not three per database;
+CPU and memory for every instance take two. Results are cached per time window;
+the window end is rounded down to the query interval, so every caller within the
+same interval shares one fetch. Series are downsampled to a fixed number of
+points for sparklines.
+
+Instance series are reduced to percentiles with NumPy to find idle and
+oversized instances (right-sizing candidates).
+"""
+import datetime
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from oci_cache import cache
+from oci_utils import OCIManager
+
+ADB_NAMESPACE = "oci_autonomous_database"
+
+# Short name -> (metric name, MQL statistic)
+ADB_METRICS = {
+    "cpu": ("CpuUtilization", "mean"),
+    "storage": ("StorageUtilization", "max"),
+    "sessions": ("Sessions", "mean"),
+}
+
+# Needs the Compute Instance Monitoring plugin of the Oracle Cloud Agent
+INSTANCE_NAMESPACE = "oci_computeagent"
+
+INSTANCE_METRICS = {
+    "cpu": ("CpuUtilization", "mean"),
+    "memory": ("MemoryUtilization", "mean"),
+}
+
+# Window -> (length, MQL interval / resolution)
+WINDOWS = {
+    "1h": (datetime.timedelta(hours=1), "1m"),
+    "24h": (datetime.timedelta(hours=24), "5m"),
+    "7d": (datetime.timedelta(days=7), "1h"),
+}
+
+SPARKLINE_POINTS = 48
+
+# Utilization thresholds used to flag databases
+IDLE_CPU_PERCENT = 5.0
+SATURATED_CPU_PERCENT = 85.0
+FULL_STORAGE_PERCENT = 90.0
+
+# Right-sizing: an instance whose p95 CPU and memory stay under these is oversized,
+# and is sized so that its p95 would land at TARGET_CPU_PERCENT
+PERCENTILES = (50, 95, 99)
+OVERSIZED_CPU_P95 = 25.0
+OVERSIZED_MEMORY_P95 = 50.0
+TARGET_CPU_PERCENT = 60.0
+
+_INTERVAL_SECONDS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def _interval_seconds(interval: str) -> int:
+    return int(interval[:-1]) * _INTERVAL_SECONDS[interval[-1]]
+
+
+def downsample(values: Sequence[float], points: int = SPARKLINE_POINTS) -> List[float]:
+    """Average consecutive values into at most `points` buckets (values are returned as-is if fewer)."""
+    if len(values) <= points:
+        return [float(value) for value in values]
+    size = len(values) / points
+    buckets = [values[int(i * size):int((i + 1) * size)] for i in range(points)]
+    return [sum(bucket) / len(bucket) for bucket in buckets if bucket]
+
+
+def fetch_metrics(manager: OCIManager, compartment_id: str, namespace: str, metrics: Dict[str, Tuple[str, str]],
+                  window: str = "24h", now: Optional[datetime.datetime] = None) -> Dict[str, Dict[str, List[Tuple]]]:
+    """
+    {resource OCID: {metric short name: [(timestamp, value)]}} for every resource
+    in the compartment that reported data in the window, one query per metric.
+    """
+    length, interval = WINDOWS[window]
+    step = _interval_seconds(interval)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    end = datetime.datetime.fromtimestamp(now.timestamp() // step * step, datetime.timezone.utc)
+
+    def load() -> Dict[str, Dict[str, List[Tuple]]]:
+        by_resource: Dict[str, Dict[str, List[Tuple]]] = {}
+        for name, series, error in manager.run_parallel(
+            lambda name: manager.summarize_metrics(
+                compartment_id, namespace, f"{metrics[name][0]}[{interval}].{metrics[name][1]}()",
+                end - length, end, interval
+            ),
+            list(metrics)
+        ):
+            if error:
+                raise error
+            for metric in series:
+                by_resource.setdefault(metric["resource_id"], {})[name] = sorted(metric["points"])
+        return by_resource
+
+    return cache.get_or_load(("metrics", namespace, manager.config.get("region"), compartment_id, window, end),
+                             load, step)
+
+
+def fetch_adb_metrics(manager: OCIManager, compartment_id: str, window: str = "24h",
+                      now: Optional[datetime.datetime] = None) -> Dict[str, Dict[str, List[Tuple]]]:
+    """{ADB OCID: {"cpu" | "storage" | "sessions": [(timestamp, value)]}}."""
+    return fetch_metrics(manager, compartment_id, ADB_NAMESPACE, ADB_METRICS, window, now)
+
+
+def fetch_instance_metrics(manager: OCIManager, compartment_id: str, window: str = "7d",
+                           now: Optional[datetime.datetime] = None) -> Dict[str, Dict[str, List[Tuple]]]:
+    """{instance OCID: {"cpu" | "memory": [(timestamp, value)]}}."""
+    return fetch_metrics(manager, compartment_id, INSTANCE_NAMESPACE, INSTANCE_METRICS, window, now)
+
+
+def utilization_rows(databases: List[Dict], metrics: Dict[str, Dict[str, List[Tuple]]],
+                     points: int = SPARKLINE_POINTS) -> List[Dict]:
+    """One row per database with downsampled sparkline series, summary values and a status."""
+    rows = []
+    for db in databases:
+        series = {name: [value for _, value in metrics.get(db["id"], {}).get(name, [])] for name in ADB_METRICS}
+        cpu, storage, sessions = series["cpu"], series["storage"], series["sessions"]
+        cpu_avg = sum(cpu) / len(cpu) if cpu else None
+        if not cpu:
+            status = "no data"
+        elif cpu_avg >= SATURATED_CPU_PERCENT:
+            status = "saturated"
+        elif storage and storage[-1] >= FULL_STORAGE_PERCENT:
+            status = "storage full"
+        elif max(cpu) < IDLE_CPU_PERCENT and (not sessions or max(sessions) < 1):
+            status = "idle"
+        else:
+            status = "ok"
+        rows.append({
+            "id": db["id"],
+            "display_name": db["display_name"],
+            "lifecycle_state": db["lifecycle_state"],
+            "cpu_core_count": db["cpu_core_count"],
+            "cpu": downsample(cpu, points),
+            "cpu_avg": round(cpu_avg, 1) if cpu_avg is not None else None,
+            "cpu_max": round(max(cpu), 1) if cpu else None,
+            "storage_percent": round(storage[-1], 1) if storage else None,
+            "sessions": downsample(sessions, points),
+            "sessions_max": max(sessions) if sessions else None,
+            "status": status,
+        })
+    return rows
+
+
+def _percentiles(values: List[float]) -> Dict[int, Optional[float]]:
+    if not values:
+        return dict.fromkeys(PERCENTILES)
+    return dict(zip(PERCENTILES, (round(float(p), 1) for p in np.percentile(np.asarray(values), PERCENTILES))))
+
+
+def instance_utilization(instances: List[Dict], metrics: Dict[str, Dict[str, List[Tuple]]]) -> Dict[str, Dict]:
+    """
+    {instance OCID: {"cpu_p50", "cpu_p95", ..., "memory_p99", "recommendation",
+    "suggested_ocpus"}} for every RUNNING instance. recommendation is "idle",
+    "downsize", "no data" (no agent metrics) or None.
+    """
+    results = {}
+    for instance in instances:
+        if instance["state"] != "RUNNING":
+            continue
+        series = metrics.get(instance["id"], {})
+        cpu = _percentiles([value for _, value in series.get("cpu", [])])
+        memory = _percentiles([value for _, value in series.get("memory", [])])
+        result = {f"cpu_p{p}": value for p, value in cpu.items()}
+        result.update({f"memory_p{p}": value for p, value in memory.items()})
+        result["recommendation"], result["suggested_ocpus"] = None, None
+        if cpu[95] is None:
+            result["recommendation"] = "no data"
+        elif cpu[95] < IDLE_CPU_PERCENT:
+            result["recommendation"] = "idle"
+        elif cpu[95] < OVERSIZED_CPU_P95 and (memory[95] is None or memory[95] < OVERSIZED_MEMORY_P95):
+            ocpus = instance.get("ocpus")
+            suggested = max(1, math.ceil(ocpus * cpu[95] / TARGET_CPU_PERCENT)) if ocpus else None
+            if suggested is None or suggested < ocpus:
+                result["recommendation"], result["suggested_ocpus"] = "downsize", suggested
+        results[instance["id"]] = result
+    return results
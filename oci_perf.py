@@ -0,0 +1,275 @@
+"""
+Per-rerun performance profile for the app's diagnostics overlay.
+
+start_rerun() begins a RerunProfile for the current script run. While it is
+active, the profile records:
+
+- the time spent in each section(), and sections nest, so tabs and the parts
+  inside them form a tree like a flame graph;
+- every public OCIManager method call (wrapped by instrument()) with its
+  latency, how many HTTP requests it made and whether it was served from the
+  cache;
+- every HTTP request of the shared transport and every cache lookup;
+- the widgets each section created;
+- tracemalloc's peak traced memory.
+
+The profile lives in a context variable. Work that OCIManager.run_parallel and
+cache prefetches hand to other threads is therefore attributed to the section
+and call that started it. Without an active profile every hook returns
+immediately, and memory tracing is off.
+
+tracemalloc is process-wide. When several sessions profile at once, the peak
+includes all of their allocations.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import pickle
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+
+_OCID = re.compile(r"ocid1\.[a-z0-9.\-_]+", re.IGNORECASE)
+
+
+def operation(method: str, url: str) -> str:
+    """Call name for reports: method and path with OCIDs elided (GET /20160918/vcns/{id})."""
+    path = url.split("//", 1)[-1].partition("/")[2].partition("?")[0]
+    return f"{method} /" + _OCID.sub("{id}", path)
+
+
+class ManagerCall:
+    __slots__ = ("method", "section", "start", "seconds", "api_calls", "cache_hits", "cache_misses")
+
+    def __init__(self, method: str, section: Tuple[str, ...], start: float):
+        self.method = method
+        self.section = section
+        self.start = start
+        self.seconds = 0.0
+        self.api_calls = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def cache(self) -> Optional[str]:
+        """"hit" if served from the cache only, "miss" if a lookup had to load, else None."""
+        if self.cache_misses:
+            return "miss"
+        return "hit" if self.cache_hits else None
+
+
+class RerunProfile:
+    """Sections, OCIManager calls, HTTP requests and cache lookups of one script run."""
+
+    def __init__(self, widget_count: Optional[Callable[[], int]] = None):
+        self.widget_count = widget_count
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.peak_memory: Optional[int] = None
+        self.widgets: Optional[int] = None
+        self.sections: List[Dict] = []
+        self.manager_calls: List[ManagerCall] = []
+        self.api_calls: List[Dict] = []
+        self.cache_lookups: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def offset(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _widgets(self) -> Optional[int]:
+        try:
+            return self.widget_count() if self.widget_count else None
+        except Exception:
+            return None
+
+    def finish(self) -> "RerunProfile":
+        """Stop the clock and read the memory peak (only the first call counts)."""
+        if self.seconds is None:
+            self.seconds = self.offset()
+            self.widgets = self._widgets()
+            self.peak_memory = _stop_tracing()
+        return self
+
+    def section_rows(self) -> List[Dict]:
+        """One row per section in start order, with its depth and own HTTP request count."""
+        total = self.seconds or self.offset()
+        rows = []
+        for section in sorted(self.sections, key=lambda s: s["start"]):
+            path = section["path"]
+            rows.append({
+                "section": path[-1],
+                "depth": len(path) - 1,
+                "start_ms": round(section["start"] * 1000, 1),
+                "ms": round(section["seconds"] * 1000, 1),
+                "share": section["seconds"] / total if total else 0.0,
+                "api_calls": sum(1 for call in self.api_calls if call["section"][:len(path)] == path),
+                "widgets": section["widgets"],
+            })
+        return rows
+
+    def summary(self) -> Dict:
+        hits = sum(1 for lookup in self.cache_lookups if lookup["hit"])
+        return {
+            "seconds": round(self.seconds if self.seconds is not None else self.offset(), 3),
+            "manager_calls": len(self.manager_calls),
+            "api_calls": len(self.api_calls),
+            "api_seconds": round(sum(call["seconds"] for call in self.api_calls), 3),
+            "cache_hits": hits,
+            "cache_misses": len(self.cache_lookups) - hits,
+            "widgets": self.widgets,
+            "peak_memory_mb": None if self.peak_memory is None else round(self.peak_memory / 2 ** 20, 1),
+        }
+
+
+_profile: contextvars.ContextVar = contextvars.ContextVar("oci_rerun_profile", default=None)
+_section: contextvars.ContextVar = contextvars.ContextVar("oci_profile_section", default=())
+_call: contextvars.ContextVar = contextvars.ContextVar("oci_profile_call", default=None)
+
+# Profiles that currently need tracemalloc; tracing stops when the last one finishes
+_tracing_users = 0
+_tracing_lock = threading.Lock()
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_users = 0
+        if sys.version_info >= (3, 9):
+            tracemalloc.reset_peak()
+        _tracing_users += 1
+
+
+def _stop_tracing() -> Optional[int]:
+    global _tracing_users
+    with _tracing_lock:
+        if not tracemalloc.is_tracing() or not _tracing_users:
+            return None
+        peak = tracemalloc.get_traced_memory()[1]
+        _tracing_users -= 1
+        if not _tracing_users:
+            tracemalloc.stop()
+        return peak
+
+
+def start_rerun(enabled: bool = True, widget_count: Optional[Callable[[], int]] = None) -> Optional[RerunProfile]:
+    """
+    Begin profiling the current script run, or turn profiling off with
+    enabled=False. Returns the new profile (None when disabled).
+    widget_count() should return the number of widgets created so far this run.
+    Call finish() on every profile, also of runs cut short, to release memory tracing.
+    """
+    _section.set(())
+    _call.set(None)
+    if not enabled:
+        _profile.set(None)
+        return None
+    _start_tracing()
+    profile = RerunProfile(widget_count)
+    _profile.set(profile)
+    return profile
+
+
+def current_profile() -> Optional[RerunProfile]:
+    return _profile.get()
+
+
+@contextlib.contextmanager
+def section(name: str) -> Iterator[None]:
+    """Attribute the block's time, calls and widgets to a named (nested) section."""
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    path = _section.get() + (name,)
+    token = _section.set(path)
+    start = profile.offset()
+    widgets = profile._widgets()
+    try:
+        yield
+    finally:
+        _section.reset(token)
+        after = profile._widgets()
+        with profile._lock:
+            profile.sections.append({"path": path, "start": start, "seconds": profile.offset() - start,
+                                     "widgets": None if widgets is None or after is None else after - widgets})
+
+
+def record_api_call(method: str, url: str, seconds: float, status: Optional[int]) -> None:
+    """Called by the transport for every HTTP request."""
+    profile = _profile.get()
+    if profile is None:
+        return
+    call = _call.get()
+    with profile._lock:
+        profile.api_calls.append({"operation": operation(method, url), "status": status, "section": _section.get(),
+                                  "start": profile.offset() - seconds, "seconds": seconds,
+                                  "manager_call": call.method if call else None})
+        if call is not None:
+            call.api_calls += 1
+
+
+def record_cache_lookup(key: Hashable, hit: bool, seconds: float) -> None:
+    """Called by the cache for every get_or_load: hit, or miss with the load time."""
+    profile = _profile.get()
+    if profile is None:
+        return
+    call = _call.get()
+    with profile._lock:
+        profile.cache_lookups.append({"key": key[0] if isinstance(key, tuple) else key, "hit": hit,
+                                      "seconds": seconds, "section": _section.get()})
+        if call is not None:
+            if hit:
+                call.cache_hits += 1
+            else:
+                call.cache_misses += 1
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _profile.get()
+        # Calls made by another manager method are part of that method's time
+        if profile is None or _call.get() is not None:
+            return func(*args, **kwargs)
+        call = ManagerCall(name, _section.get(), profile.offset())
+        token = _call.set(call)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _call.reset(token)
+            call.seconds = profile.offset() - call.start
+            with profile._lock:
+                profile.manager_calls.append(call)
+    return wrapper
+
+
+def instrument(cls):
+    """Profile the constructor and every public, non-generator method of cls. Returns cls."""
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") and name != "__init__" or not inspect.isfunction(member) \
+                or inspect.isgeneratorfunction(member):
+            continue
+        setattr(cls, name, _timed(f"{cls.__name__}()" if name == "__init__" else name, member))
+    return cls
+
+
+def state_sizes(state: Mapping) -> List[Tuple[str, int]]:
+    """Approximate bytes per key of a mapping (pickled size, else shallow size), largest first."""
+    sizes = []
+    for key in list(state.keys()):
+        try:
+            value = state[key]
+        except Exception:
+            continue
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size = sys.getsizeof(value)
+        sizes.append((str(key), size))
+    return sorted(sizes, key=lambda item: item[1], reverse=True)
@@ -0,0 +1,454 @@
+"""
+Record/replay of OCI API traffic for deterministic performance checks.
+
+record_scenarios() runs each scenario (every OCIManager.list_* method, the
+launch catalog and, when Streamlit is installed, a full app render) against the
+real tenancy. Every HTTP request and response goes into one JSON cassette per
+scenario. Credentials are left out: request signatures, tokens and cookies are
+dropped, and secrets in bodies (pre-authenticated request URIs, passwords, keys)
+are replaced with "REDACTED". The cassette also stores the number of calls and
+the wall time of the run.
+
+check_scenarios() replays the cassettes offline. No credentials or network are
+needed, because a throwaway config with a generated key signs the requests.
+Responses can be served with the recorded latency, a fixed one or none. Each
+scenario then has to stay within its budgets: max_calls (default: the recorded
+count) and max_seconds (default: 1.5x the recorded time, checked only with
+recorded latencies). A change that adds API calls, serializes parallel ones or
+issues a request that was never recorded fails the check. That catches N+1
+listings and lost caching before they reach a tenancy.
+
+Requests are matched on method, URL and body. Bodies that change from run to
+run (e.g. metric query time windows) fall back to the next unused response for
+the same method and URL.
+"""
+import base64
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from oci._vendor import requests
+from oci._vendor.requests.adapters import BaseAdapter
+from oci._vendor.requests.structures import CaseInsensitiveDict
+from oci._vendor.urllib3.response import HTTPResponse
+
+import oci_cache
+from oci_catalog import LaunchCatalog
+from oci_perf import operation
+from oci_transport import get_transport, pool_size_for
+from oci_utils import OCIManager
+
+# Headers that carry credentials (or change on every call) are never written to a cassette
+_DROPPED_HEADERS = {"authorization", "opc-obo-token", "x-subject-token", "cookie", "set-cookie",
+                    "opc-request-id", "date", "x-date"}
+# Body fields whose values are secrets
+REDACTED_FIELDS = {"accessUri", "fullPath", "password", "adminPassword", "privateKey", "passphrase",
+                   "secretContent", "walletPassword"}
+
+# Wall-time budget relative to the recorded run, when the budgets file has none
+DEFAULT_TIME_TOLERANCE = 1.5
+
+# The app builds its managers with OCIManager's default worker count
+APP_MAX_WORKERS = inspect.signature(OCIManager).parameters["max_workers"].default
+
+# Manager arguments a scenario can take from the recorded parameters
+_SCENARIO_PARAMS = ("compartment_id", "vcn_id", "bucket_name", "image_id")
+
+class UnrecordedRequest(Exception):
+    """A replayed scenario made a request that is not in its cassette."""
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {key: "REDACTED" if key in REDACTED_FIELDS else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _encode_body(body) -> Dict:
+    """Cassette form of a response body: redacted JSON, text, or base64 for binary data."""
+    if not body:
+        return {"text": ""}
+    try:
+        return {"json": _redact(json.loads(body))}
+    except ValueError:
+        pass
+    try:
+        return {"text": body.decode("utf-8") if isinstance(body, bytes) else body}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(encoded: Dict) -> bytes:
+    if "json" in encoded:
+        return json.dumps(encoded["json"]).encode("utf-8")
+    if "base64" in encoded:
+        return base64.b64decode(encoded["base64"])
+    return encoded["text"].encode("utf-8")
+
+
+def _body_hash(body) -> str:
+    if body is None:
+        body = b""
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        # Streamed uploads: the content is not available to hash
+        body = b"<stream>"
+    return hashlib.sha256(body).hexdigest()
+
+
+class _Counter:
+    def __init__(self):
+        self.calls = 0
+        self.operations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, method: str, url: str) -> None:
+        with self._lock:
+            self.calls += 1
+            name = operation(method, url)
+            self.operations[name] = self.operations.get(name, 0) + 1
+
+
+def response_for(request, interaction: Dict, stream: bool = False):
+    """A requests Response for the request, built from a recorded interaction."""
+    body = _decode_body(interaction["body"])
+    response = requests.Response()
+    response.status_code = interaction["status"]
+    response.reason = interaction.get("reason")
+    response.headers = CaseInsensitiveDict(interaction["headers"])
+    # Keep the header consistent with the (possibly redacted) body
+    if "content-length" in response.headers:
+        response.headers["content-length"] = str(len(body))
+    response.raw = HTTPResponse(body=io.BytesIO(body), headers=dict(response.headers),
+                                status=response.status_code, preload_content=False)
+    response.url = request.url
+    response.request = request
+    response.encoding = "utf-8"
+    if not stream:
+        response.content  # read now, as for a live non-streamed response
+    return response
+
+
+class RecordingAdapter(BaseAdapter):
+    """Sends through the wrapped (pooled, scheduled) adapter and keeps every exchange."""
+
+    def __init__(self, inner):
+        super().__init__()
+        self.inner = inner
+        self.interactions: List[Dict] = []
+        self.counter = _Counter()
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = self.inner.send(request, **kwargs)
+        elapsed = time.monotonic() - started
+        # Reading the body consumes a streamed response; give the caller a fresh stream over it
+        body = response.content
+        if kwargs.get("stream"):
+            response.raw = HTTPResponse(body=io.BytesIO(body), headers=dict(response.headers),
+                                        status=response.status_code, preload_content=False)
+        self.counter.count(request.method, request.url)
+        with self._lock:
+            self.interactions.append({
+                "method": request.method,
+                "url": request.url,
+                "body_sha256": _body_hash(request.body),
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {name: value for name, value in response.headers.items()
+                            if name.lower() not in _DROPPED_HEADERS},
+                "body": _encode_body(body),
+                "elapsed": round(elapsed, 4),
+            })
+        return response
+
+    def close(self):
+        # The wrapped adapter stays mounted after recording
+        pass
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Serves responses from recorded interactions, in recorded order per request.
+    latency: "recorded", a fixed number of seconds per call, or 0.
+    """
+
+    def __init__(self, interactions: List[Dict], latency="recorded"):
+        super().__init__()
+        self.latency = latency
+        self.counter = _Counter()
+        self.unmatched: List[str] = []
+        self._pending = list(interactions)
+        self._lock = threading.Lock()
+
+    def _take(self, method: str, url: str, body_sha256: str) -> Optional[Dict]:
+        with self._lock:
+            same_url = [i for i in self._pending if i["method"] == method and i["url"] == url]
+            exact = [i for i in same_url if i["body_sha256"] == body_sha256]
+            match = (exact or same_url or [None])[0]
+            if match is not None:
+                self._pending.remove(match)
+            return match
+
+    def send(self, request, **kwargs):
+        self.counter.count(request.method, request.url)
+        interaction = self._take(request.method, request.url, _body_hash(request.body))
+        if interaction is None:
+            self.unmatched.append(f"{request.method} {request.url}")
+            raise UnrecordedRequest(f"No recorded response for {request.method} {request.url}")
+        delay = interaction["elapsed"] if self.latency == "recorded" else float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+        return response_for(request, interaction, kwargs.get("stream"))
+
+    def close(self):
+        pass
+
+
+@contextlib.contextmanager
+def mounted(session, adapter_factory: Callable) -> Iterator:
+    """Route a requests Session through adapter_factory(original adapter) while the block runs."""
+    originals = dict(session.adapters)
+    adapter = adapter_factory(originals.get("https://"))
+    for prefix in ("https://", "http://"):
+        session.mount(prefix, adapter)
+    try:
+        yield adapter
+    finally:
+        session.adapters.clear()
+        session.adapters.update(originals)
+
+
+def offline_config(directory: str, tenancy: str, region: str) -> str:
+    """
+    Write an OCI config (in directory/.oci) with a freshly generated key, so
+    requests can be signed while replaying without real credentials.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    oci_dir = os.path.join(directory, ".oci")
+    os.makedirs(oci_dir, exist_ok=True)
+    key_file = os.path.join(oci_dir, "replay_key.pem")
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(key_file, "wb") as out:
+        out.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                    serialization.NoEncryption()))
+    config_file = os.path.join(oci_dir, "config")
+    with open(config_file, "w", encoding="utf-8") as out:
+        out.write(f"[DEFAULT]\nuser=ocid1.user.oc1..replay\nfingerprint=00:00:00:00:00:00:00:00:00:00:00:00:00:00:00:00\n"
+                  f"tenancy={tenancy}\nregion={region}\nkey_file={key_file}\n")
+    return config_file
+
+
+def _method_scenario(name: str) -> Callable:
+    def run(manager: OCIManager, params: Dict):
+        return getattr(manager, name)(**{arg: params[arg] for arg in _method_args(name)})
+    return run
+
+
+def _method_args(name: str) -> List[str]:
+    return [arg for arg in inspect.signature(getattr(OCIManager, name)).parameters if arg != "self"]
+
+
+def _launch_catalog(manager: OCIManager, params: Dict):
+    return LaunchCatalog.load(manager, params["compartment_id"])
+
+
+def _app_render(manager: OCIManager, params: Dict):
+    """Render every tab of the Streamlit app with the compartment selected."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        raise RuntimeError("The app scenario needs Streamlit (pip install streamlit)")
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "oci-gui-app.py"),
+                            default_timeout=300)
+    app.run()
+    app.text_input(key="global_compartment_query").input(params["compartment_name"]).run()
+    if app.exception:
+        raise RuntimeError(f"App raised: {app.exception[0].message}")
+    return app
+
+
+def scenarios() -> Dict[str, Callable]:
+    """Scenario name -> run(manager, params): every list_* method, the launch catalog and the app."""
+    found = {name: _method_scenario(name) for name in dir(OCIManager)
+             if name.startswith("list_") and set(_method_args(name)) <= set(_SCENARIO_PARAMS)}
+    found["launch_catalog"] = _launch_catalog
+    found["app"] = _app_render
+    return found
+
+
+def _runnable(name: str, params: Dict) -> bool:
+    if name == "app":
+        return "compartment_name" in params
+    if name == "launch_catalog":
+        return "compartment_id" in params
+    return all(arg in params for arg in _method_args(name))
+
+
+@contextlib.contextmanager
+def scenario_environment(home: Optional[str] = None) -> Iterator[None]:
+    """Start with empty caches (memory only) and, with home, ~/.oci/config resolving under it."""
+    previous_backend = oci_cache.cache.backend
+    oci_cache.configure(None)
+    previous_home = os.environ.get("HOME")
+    if home:
+        # The app builds its managers from ~/.oci/config
+        os.environ["HOME"] = home
+    try:
+        yield
+    finally:
+        oci_cache.cache.backend = previous_backend
+        if home:
+            if previous_home is None:
+                os.environ.pop("HOME", None)
+            else:
+                os.environ["HOME"] = previous_home
+
+
+def discover_params(manager: OCIManager, compartment_id: str) -> Dict:
+    """Parameters for the scenarios: the compartment plus its first VCN, bucket and image."""
+    params = {"compartment_id": compartment_id}
+    compartment = next((c for c in manager.list_compartments() if c["id"] == compartment_id), None)
+    if compartment:
+        params["compartment_name"] = compartment["name"]
+    for key, listed, field in (("vcn_id", manager.list_vcns(compartment_id), "id"),
+                               ("bucket_name", manager.list_buckets(compartment_id), "name"),
+                               ("image_id", manager.list_images(compartment_id), "id")):
+        if listed:
+            params[key] = listed[0][field]
+    return params
+
+
+def record_scenarios(directory: str, compartment_id: str, config_file: str = "~/.oci/config",
+                     profile: str = "DEFAULT", region: Optional[str] = None, max_workers: int = 8,
+                     names: Optional[List[str]] = None, **params) -> List[Dict]:
+    """
+    Record each runnable scenario into directory/<scenario>.json. Extra params
+    (vcn_id, bucket_name, image_id, compartment_name) override the discovered ones.
+    Returns one summary per scenario.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with scenario_environment():
+        discovered = discover_params(OCIManager(config_file, profile, region, max_workers), compartment_id)
+    discovered.update({key: value for key, value in params.items() if value})
+    summaries = []
+    for name, run in scenarios().items():
+        if names and name not in names or not _runnable(name, discovered):
+            continue
+        summary = {"scenario": name, "status": "recorded"}
+        workers = APP_MAX_WORKERS if name == "app" else max_workers
+        with scenario_environment():
+            # Mounted before the manager exists, so its setup calls (namespace) are recorded too
+            with mounted(get_transport(pool_size_for(workers)).session, RecordingAdapter) as recorder:
+                try:
+                    manager = OCIManager(config_file, profile, region, workers)
+                    # Only the scenario itself is timed; client setup is not API work
+                    started = time.monotonic()
+                    run(manager, discovered)
+                    seconds = time.monotonic() - started
+                except Exception as e:
+                    summary.update(status="error", error=str(getattr(e, "message", None) or e))
+        if summary["status"] == "error":
+            # A cassette of a failed run would set the wrong baseline
+            summaries.append(summary)
+            continue
+        cassette = {
+            "scenario": name,
+            "tenancy": manager.tenancy_id,
+            "region": manager.config["region"],
+            "max_workers": workers,
+            "params": discovered,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "calls": recorder.counter.calls,
+            "seconds": round(seconds, 3),
+            "operations": recorder.counter.operations,
+            "interactions": recorder.interactions,
+        }
+        with open(os.path.join(directory, f"{name}.json"), "w", encoding="utf-8") as out:
+            json.dump(cassette, out, indent=1)
+        summary.update(calls=cassette["calls"], seconds=cassette["seconds"])
+        summaries.append(summary)
+    return summaries
+
+
+def replay_scenario(cassette: Dict, latency="recorded") -> Dict:
+    """Run a recorded scenario offline. Returns its calls, wall time, operations and any error."""
+    run = scenarios()[cassette["scenario"]]
+    with tempfile.TemporaryDirectory() as home:
+        config_file = offline_config(home, cassette["tenancy"], cassette["region"])
+        with scenario_environment(home if cassette["scenario"] == "app" else None):
+            adapter = ReplayAdapter(cassette["interactions"], latency)
+            with mounted(get_transport(pool_size_for(cassette["max_workers"])).session, lambda _: adapter):
+                error = None
+                started = time.monotonic()
+                try:
+                    manager = OCIManager(config_file, max_workers=cassette["max_workers"])
+                    started = time.monotonic()
+                    run(manager, cassette["params"])
+                except Exception as e:
+                    error = str(getattr(e, "message", None) or e)
+                seconds = time.monotonic() - started
+    return {"calls": adapter.counter.calls, "seconds": round(seconds, 3),
+            "operations": adapter.counter.operations, "unmatched": adapter.unmatched, "error": error}
+
+
+def check_scenarios(directory: str, budgets: Optional[Dict[str, Dict]] = None, latency="recorded",
+                    names: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Replay every cassette in directory and compare with its budgets
+    ({scenario: {"max_calls": n, "max_seconds": s}}). Each result has
+    "status" "ok" or "failed" and the reasons in "violations".
+    """
+    budgets = budgets or {}
+    results = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, file_name), encoding="utf-8") as source:
+            cassette = json.load(source)
+        if "interactions" not in cassette:
+            # Not a cassette (e.g. the budgets file kept next to them)
+            continue
+        if names and cassette["scenario"] not in names:
+            continue
+        budget = budgets.get(cassette["scenario"], {})
+        max_calls = budget.get("max_calls", cassette["calls"])
+        max_seconds = budget.get("max_seconds")
+        if max_seconds is None and latency == "recorded":
+            max_seconds = round(cassette["seconds"] * DEFAULT_TIME_TOLERANCE, 3)
+        replayed = replay_scenario(cassette, latency)
+        violations = []
+        if replayed["unmatched"]:
+            violations.append(f"{len(replayed['unmatched'])} unrecorded request(s), first: {replayed['unmatched'][0]}")
+        elif replayed["error"]:
+            violations.append(f"error: {replayed['error']}")
+        if replayed["calls"] > max_calls:
+            extra = {op: count - cassette["operations"].get(op, 0) for op, count in replayed["operations"].items()
+                     if count > cassette["operations"].get(op, 0)}
+            violations.append(f"{replayed['calls']} calls > budget {max_calls}"
+                              + (f" (more than recorded: {extra})" if extra else ""))
+        if max_seconds is not None and replayed["seconds"] > max_seconds:
+            violations.append(f"{replayed['seconds']}s > budget {max_seconds}s")
+        results.append({
+            "scenario": cassette["scenario"],
+            "status": "failed" if violations else "ok",
+            "calls": replayed["calls"],
+            "max_calls": max_calls,
+            "seconds": replayed["seconds"],
+            "max_seconds": max_seconds,
+            "violations": violations,
+        })
+    return results
@@ -0,0 +1,264 @@
+"""
+Declarative, batched security list rule changes.
+
+A change set names the rules a security list should gain or lose, or the exact
+rule set one direction should have. apply_rule_changes works out the minimal
+diff per security list: existing rules are passed back untouched, lists already
+in the desired state are skipped, and the rest are written in parallel. When a
+cached SecurityRuleIndex is given, unchanged lists are skipped without any API
+call at all.
+
+Every write carries the ETag of the state it was diffed against (if-match), so a
+concurrent edit makes it fail with HTTP 412 instead of being overwritten; the
+list is then re-read and re-diffed once.
+
+Change sets are loaded from YAML (needs the optional PyYAML package) or CSV:
+
+    - security_lists: [ocid1.securitylist..., ocid1.securitylist...]
+      add:
+        - {direction: INGRESS, protocol: tcp, cidr: 10.0.0.0/8, ports: 22}
+      remove:
+        - {direction: INGRESS, protocol: tcp, cidr: 0.0.0.0/0, ports: 22}
+    - security_list: ocid1.securitylist...
+      egress:                       # exact egress rule set
+        - {protocol: all, cidr: 0.0.0.0/0}
+
+    security_list_id,action,direction,protocol,cidr,ports,stateless,description
+    ocid1.securitylist...,add,INGRESS,tcp,10.0.0.0/8,22,false,SSH from the VPN
+    ocid1.securitylist...,set,EGRESS,all,0.0.0.0/0,,,
+
+CSV actions are add, remove and set (rows that together form the exact rule set
+of that direction). Optional source_ports, icmp_type and icmp_code keys (or CSV
+columns) narrow a rule further; they are part of its identity, so ICMP type 3
+and type 8 rules on the same CIDR are different rules.
+"""
+import csv
+import ipaddress
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from oci_bulk import BulkProgress
+from oci_rules import SecurityRuleIndex, compile_rule, describe_rule, icmp_match, normalize_protocol, port_range
+from oci_utils import OCIManager, build_security_rule
+
+DIRECTIONS = ("INGRESS", "EGRESS")
+
+
+def _truthy(value) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _optional_int(value) -> Optional[int]:
+    return None if value in (None, "") else int(value)
+
+
+def _port_bounds(spec: Dict, ports: str, low: str, high: str) -> Tuple[Optional[int], Optional[int]]:
+    """A port range given as spec[ports] ("22" or "8000-8080") or spec[low]/spec[high]."""
+    if spec.get(ports) not in (None, ""):
+        first, _, last = str(spec[ports]).partition("-")
+        return int(first), int(last or first)
+    return _optional_int(spec.get(low)), _optional_int(spec.get(high))
+
+
+def parse_rule_spec(spec: Dict, direction: str = "INGRESS") -> Dict:
+    """
+    Normalize a desired rule. Accepts protocol (name or number, default all), cidr
+    (or source/destination), ports ("22" or "8000-8080") or port_min/port_max,
+    source_ports or source_port_min/source_port_max, icmp_type and icmp_code,
+    stateless and description.
+    """
+    direction = str(spec.get("direction") or direction).upper()
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Invalid rule direction: {direction!r}")
+    cidr = spec.get("cidr") or spec.get("source") or spec.get("destination")
+    if not cidr:
+        raise ValueError(f"Rule has no cidr: {spec}")
+    protocol = normalize_protocol(spec.get("protocol") or "all")
+    port_min, port_max = _port_bounds(spec, "ports", "port_min", "port_max")
+    source_port_min, source_port_max = _port_bounds(spec, "source_ports", "source_port_min", "source_port_max")
+    icmp_type, icmp_code = _optional_int(spec.get("icmp_type")), _optional_int(spec.get("icmp_code"))
+    if icmp_code is not None and icmp_type is None:
+        raise ValueError(f"Rule has an icmp_code but no icmp_type: {spec}")
+    return {
+        "direction": direction,
+        "protocol": protocol,
+        "cidr": str(cidr),
+        "port_min": port_min,
+        "port_max": port_max,
+        "ports": port_range(protocol, port_min, port_max),
+        "source_port_min": source_port_min,
+        "source_port_max": source_port_max,
+        "source_ports": port_range(protocol, source_port_min, source_port_max),
+        "icmp_type": icmp_type,
+        "icmp_code": icmp_code,
+        "icmp": icmp_match(protocol, icmp_type, icmp_code),
+        "stateless": _truthy(spec.get("stateless")),
+        "description": spec.get("description") or None
+    }
+
+
+def rule_key(rule: Dict) -> Tuple:
+    """Identity of a compiled rule: two rules with the same key allow the same traffic."""
+    try:
+        cidr = str(ipaddress.ip_network(rule["cidr"], strict=False))
+    except ValueError:
+        cidr = rule["cidr"]
+    return (rule["direction"], rule["protocol"], cidr, rule["ports"], rule["source_ports"], rule["icmp"],
+            bool(rule["stateless"]))
+
+
+def rule_to_model(rule: Dict):
+    """SDK security rule for a parsed rule spec."""
+    return build_security_rule(rule["direction"], rule["protocol"], rule["cidr"], rule["port_min"],
+                               rule["port_max"], rule["stateless"], rule["description"],
+                               rule["source_port_min"], rule["source_port_max"],
+                               rule["icmp_type"], rule["icmp_code"])
+
+
+def _new_change(security_list_id: str) -> Dict:
+    return {"security_list_id": security_list_id, "add": [], "remove": [], "replace": set()}
+
+
+def load_rule_changes(path: str) -> List[Dict]:
+    """Read change sets from a .yaml/.yml or .csv file, one change per security list."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as source:
+        if extension in (".yaml", ".yml"):
+            return parse_yaml_changes(source.read())
+        if extension == ".csv":
+            return parse_csv_changes(source)
+    raise ValueError(f"Unsupported rule change file: {path} (expected .yaml, .yml or .csv)")
+
+
+def parse_yaml_changes(text: str) -> List[Dict]:
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError("YAML rule changes require PyYAML (pip install pyyaml)")
+    changes = []
+    for block in yaml.safe_load(text) or []:
+        targets = block.get("security_lists") or [block.get("security_list")]
+        if not all(targets):
+            raise ValueError(f"Change block names no security list: {block}")
+        for security_list_id in targets:
+            change = _new_change(security_list_id)
+            change["add"] = [parse_rule_spec(spec) for spec in block.get("add") or []]
+            change["remove"] = [parse_rule_spec(spec) for spec in block.get("remove") or []]
+            for direction in DIRECTIONS:
+                if direction.lower() in block:
+                    change["replace"].add(direction)
+                    change["add"] += [parse_rule_spec(spec, direction) for spec in block[direction.lower()] or []]
+            changes.append(change)
+    return merge_rule_changes(changes)
+
+
+def parse_csv_changes(rows: Iterable[str]) -> List[Dict]:
+    changes: Dict[str, Dict] = {}
+    for row in csv.DictReader(rows):
+        change = changes.setdefault(row["security_list_id"], _new_change(row["security_list_id"]))
+        action = (row.get("action") or "add").strip().lower()
+        rule = parse_rule_spec(row)
+        if action == "remove":
+            change["remove"].append(rule)
+        elif action in ("add", "set"):
+            change["add"].append(rule)
+            if action == "set":
+                change["replace"].add(rule["direction"])
+        else:
+            raise ValueError(f"Invalid rule change action: {action!r}")
+    return list(changes.values())
+
+
+def merge_rule_changes(changes: Iterable[Dict]) -> List[Dict]:
+    """Combine change sets that target the same security list into one."""
+    merged: Dict[str, Dict] = {}
+    for change in changes:
+        target = merged.setdefault(change["security_list_id"], _new_change(change["security_list_id"]))
+        target["add"] += change["add"]
+        target["remove"] += change["remove"]
+        target["replace"] |= set(change["replace"])
+    return list(merged.values())
+
+
+def plan_rule_changes(current: Dict[str, List], change: Dict) -> Dict:
+    """
+    Diff one security list's current rules ({"INGRESS": [...], "EGRESS": [...]}, SDK
+    models or compiled dicts) against a change set. The plan holds the full new rule
+    lists per direction (untouched rules as given, plus SDK models for added ones) and
+    the compiled added/removed rules.
+    """
+    plan = {"added": [], "removed": [], "INGRESS": [], "EGRESS": []}
+    for direction in DIRECTIONS:
+        adds = [rule for rule in change["add"] if rule["direction"] == direction]
+        if direction in change["replace"]:
+            wanted = {rule_key(rule) for rule in adds}
+            drop = lambda key, seen: key not in wanted or key in seen
+        else:
+            removes = {rule_key(rule) for rule in change["remove"] if rule["direction"] == direction}
+            drop = lambda key, seen: key in removes
+        seen = set()
+        for rule in current.get(direction) or []:
+            compiled = compile_rule(rule, direction=direction)
+            key = rule_key(compiled)
+            if drop(key, seen):
+                plan["removed"].append(compiled)
+            else:
+                plan[direction].append(rule)
+                seen.add(key)
+        for rule in adds:
+            key = rule_key(rule)
+            if key in seen:
+                continue
+            seen.add(key)
+            plan["added"].append(rule)
+            plan[direction].append(rule_to_model(rule))
+    plan["changed"] = bool(plan["added"] or plan["removed"])
+    return plan
+
+
+def _result(security_list_id: str, name: Optional[str], status: str, plan: Dict) -> Dict:
+    return {
+        "security_list_id": security_list_id,
+        "name": name,
+        "status": status,
+        "added": [describe_rule(rule) for rule in plan["added"]],
+        "removed": [describe_rule(rule) for rule in plan["removed"]]
+    }
+
+
+def apply_rule_changes(manager: OCIManager, changes: Iterable[Dict], cached: Optional[SecurityRuleIndex] = None,
+                       dry_run: bool = False, progress: Optional[BulkProgress] = None) -> Iterator[Dict]:
+    """
+    Apply change sets in parallel and yield one result per security list with
+    status unchanged, updated, dry-run or error. Lists that the cached index shows
+    as already in the desired state are skipped without an API call.
+    """
+    progress = progress or BulkProgress()
+
+    def apply(change: Dict) -> Dict:
+        security_list_id = change["security_list_id"]
+        if cached is not None and security_list_id in cached.security_lists:
+            plan = plan_rule_changes(cached.rules_by_direction(security_list_id), change)
+            if not plan["changed"]:
+                return _result(security_list_id, cached.security_lists[security_list_id]["name"],
+                               "unchanged", plan)
+        for attempt in range(2):
+            sl = manager.get_security_list(security_list_id)
+            plan = plan_rule_changes({"INGRESS": sl["ingress_rules"], "EGRESS": sl["egress_rules"]}, change)
+            if not plan["changed"] or dry_run:
+                return _result(security_list_id, sl["name"], "dry-run" if plan["changed"] else "unchanged", plan)
+            try:
+                manager.update_security_list_rules(security_list_id, plan["EGRESS"], plan["INGRESS"],
+                                                   if_match=sl["etag"])
+                return _result(security_list_id, sl["name"], "updated", plan)
+            except Exception as e:
+                # 412: the list changed since it was read; diff against the new state once
+                if getattr(e, "status", None) != 412 or attempt:
+                    raise
+
+    for change, result, error in manager.run_parallel(apply, merge_rule_changes(changes)):
+        progress.record(error is None)
+        if error:
+            yield {"security_list_id": change["security_list_id"], "status": "error", "error": str(error)}
+        else:
+            yield result
@@ -0,0 +1,256 @@
+"""
+Security rule analysis engine.
+
+SecurityRuleIndex compiles every ingress/egress rule of many security lists into
+one index: rules are grouped by direction and protocol, keyed by CIDR in a
+CidrTrie and then by destination port range. A reachability query ("which
+security lists allow TCP/22 from 0.0.0.0/0?") only walks the trie path of the
+queried CIDR and checks the port ranges stored there, so it stays interactive on
+tens of thousands of rules. The same index finds duplicate and shadowed rules.
+"""
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from oci_cidr import CidrTrie
+from oci_utils import OCIManager, security_rule_to_dict
+
+ALL_PORTS = (1, 65535)
+
+# OCI uses IANA protocol numbers; the app's forms use names
+PROTOCOLS = {"all": "all", "tcp": "6", "udp": "17", "icmp": "1", "icmpv6": "58"}
+PROTOCOL_NAMES = {number: name.upper() for name, number in PROTOCOLS.items()}
+
+# Ports that should normally never be open to the whole internet
+SENSITIVE_PORTS = {22: "SSH", 3389: "RDP", 1521: "Oracle DB", 1522: "Oracle DB (TCPS)",
+                   3306: "MySQL", 5432: "PostgreSQL", 6379: "Redis", 9200: "Elasticsearch",
+                   27017: "MongoDB"}
+
+# The whole internet, over IPv4 and IPv6
+INTERNET_CIDRS = ("0.0.0.0/0", "::/0")
+
+
+def normalize_protocol(protocol) -> str:
+    """Map 'TCP', 'tcp', 6 or '6' to OCI's protocol string ('6')."""
+    protocol = str(protocol).lower()
+    return PROTOCOLS.get(protocol, protocol)
+
+
+def compile_rule(rule, **context) -> Dict:
+    """
+    Normalize a security rule for the index. Accepts SDK models, API-style dicts and
+    the flat records yielded by OCIManager.iter_security_rules.
+    """
+    flat = rule if isinstance(rule, dict) and "cidr" in rule else security_rule_to_dict(rule)
+    flat = dict(flat, **context)
+    flat["protocol"] = normalize_protocol(flat["protocol"])
+    flat["ports"] = port_range(flat["protocol"], flat["port_min"], flat["port_max"])
+    flat["source_ports"] = port_range(flat["protocol"], flat.get("source_port_min"), flat.get("source_port_max"))
+    flat["icmp"] = icmp_match(flat["protocol"], flat.get("icmp_type"), flat.get("icmp_code"))
+    return flat
+
+
+def port_range(protocol: str, port_min: Optional[int], port_max: Optional[int]) -> Tuple[int, int]:
+    """Destination port range a rule covers; only TCP and UDP rules are port-specific."""
+    if protocol in ("6", "17"):
+        return (port_min or ALL_PORTS[0], port_max or ALL_PORTS[1])
+    return ALL_PORTS
+
+
+def icmp_match(protocol: str, icmp_type: Optional[int], icmp_code: Optional[int]) -> Tuple:
+    """ICMP (type, code) a rule is limited to; None means any. Only ICMP and ICMPv6 rules have one."""
+    if protocol in ("1", "58") and icmp_type is not None:
+        return (int(icmp_type), None if icmp_code is None else int(icmp_code))
+    return (None, None)
+
+
+def _protocol_covers(outer: str, inner: str) -> bool:
+    return outer == "all" or outer == inner
+
+
+def _ports_cover(outer: Tuple[int, int], inner: Tuple[int, int]) -> bool:
+    return outer[0] <= inner[0] and inner[1] <= outer[1]
+
+
+def _icmp_covers(outer: Tuple, inner: Tuple) -> bool:
+    # An unset type (or code) on the broader rule allows every type (or code)
+    return outer[0] is None or (outer[0] == inner[0] and (outer[1] is None or outer[1] == inner[1]))
+
+
+def _covers(outer: Dict, inner: Dict) -> bool:
+    """True if outer allows at least the protocol, ports and ICMP type/code traffic of inner."""
+    return (_protocol_covers(outer["protocol"], inner["protocol"])
+            and _ports_cover(outer["ports"], inner["ports"])
+            and _ports_cover(outer["source_ports"], inner["source_ports"])
+            and _icmp_covers(outer["icmp"], inner["icmp"]))
+
+
+_UNPARSED = object()
+
+
+def _network(cidr: Optional[str]):
+    try:
+        return ipaddress.ip_network(cidr, strict=False)
+    except (TypeError, ValueError):
+        # Service CIDR labels such as "all-iad-services-in-oracle-services-network"
+        return None
+
+
+class SecurityRuleIndex:
+    """Compiled index of security rules across security lists."""
+
+    def __init__(self):
+        self.rules: List[Dict] = []
+        # (direction, protocol, ip version) -> trie of CIDRs whose entries hold {port range: [rule ids]}
+        self._tries: Dict[Tuple[str, str, int], CidrTrie] = {}
+        self._nodes: Dict[Tuple[str, str, str], Dict[Tuple[int, int], List[int]]] = {}
+        self.security_lists: Dict[str, Dict] = {}
+        self._by_list: Dict[str, List[int]] = {}
+        # Parsed CIDR per rule id (None for service CIDR labels)
+        self._networks: List = []
+
+    def add(self, rule: Dict, network=_UNPARSED) -> None:
+        """
+        Add a compiled rule (see compile_rule) that carries security_list_id and direction.
+        Pass network when the rule's CIDR has already been parsed.
+        """
+        rule_id = len(self.rules)
+        rule["rule_id"] = rule_id
+        self.rules.append(rule)
+        network = _network(rule["cidr"]) if network is _UNPARSED else network
+        self._networks.append(network)
+        summary = self.security_lists.setdefault(rule["security_list_id"], {
+            "id": rule["security_list_id"],
+            "name": rule.get("security_list_name"),
+            "vcn_id": rule.get("vcn_id"),
+            "ingress_count": 0,
+            "egress_count": 0
+        })
+        summary["ingress_count" if rule["direction"] == "INGRESS" else "egress_count"] += 1
+        self._by_list.setdefault(rule["security_list_id"], []).append(rule_id)
+        if network is None:
+            return
+        cidr = str(network)
+        node_key = (rule["direction"], rule["protocol"], cidr)
+        ranges = self._nodes.get(node_key)
+        if ranges is None:
+            ranges = self._nodes[node_key] = {}
+            trie_key = (rule["direction"], rule["protocol"], network.version)
+            if trie_key not in self._tries:
+                self._tries[trie_key] = CidrTrie(network.version)
+            self._tries[trie_key].insert(network, {"key": node_key})
+        ranges.setdefault(rule["ports"], []).append(rule_id)
+
+    def rules_by_direction(self, security_list_id: str) -> Dict[str, List[Dict]]:
+        """The compiled rules of one security list, as {"INGRESS": [...], "EGRESS": [...]}."""
+        rules: Dict[str, List[Dict]] = {"INGRESS": [], "EGRESS": []}
+        for rule_id in self._by_list.get(security_list_id, []):
+            rule = self.rules[rule_id]
+            rules[rule["direction"]].append(rule)
+        return rules
+
+    @classmethod
+    def build(cls, manager: OCIManager, compartment_ids: Iterable[str]) -> "SecurityRuleIndex":
+        """Compile every rule of every security list in the compartments (fetched in parallel)."""
+        index = cls()
+        for compartment_id, rules, error in manager.run_parallel(
+            lambda c: list(manager.iter_security_rules(c)), compartment_ids
+        ):
+            if error:
+                raise error
+            for rule in rules:
+                index.add(compile_rule(rule, compartment_id=compartment_id))
+        return index
+
+    def _matching_ids(self, direction: str, protocol: str, network, port: Optional[int],
+                      covering: bool) -> Iterable[int]:
+        protocols = [protocol] if protocol == "all" else [protocol, "all"]
+        for candidate_protocol in protocols:
+            trie = self._tries.get((direction, candidate_protocol, network.version))
+            if trie is None:
+                continue
+            # Covering: only rules whose CIDR contains the whole queried range
+            entries = trie.containing(network) if covering else trie.overlaps(network)
+            for entry in entries:
+                for ports, rule_ids in self._nodes[entry["key"]].items():
+                    if port is None or ports[0] <= port <= ports[1]:
+                        yield from rule_ids
+
+    def query(self, protocol: str = "all", port: Optional[int] = None, cidr: str = "0.0.0.0/0",
+              direction: str = "INGRESS", covering: bool = True) -> List[Dict]:
+        """
+        Rules that allow protocol/port traffic from (ingress) or to (egress) cidr.
+        With covering=True a rule must allow the whole CIDR; otherwise any overlap counts.
+        """
+        network = ipaddress.ip_network(cidr, strict=False)
+        rule_ids = set(self._matching_ids(direction.upper(), normalize_protocol(protocol),
+                                          network, port, covering))
+        return [self.rules[rule_id] for rule_id in sorted(rule_ids)]
+
+    def reachable(self, protocol: str, port: Optional[int], cidr: str,
+                  direction: str = "INGRESS") -> List[Dict]:
+        """Security lists that allow the traffic, with the rules that allow it."""
+        allowed: Dict[str, Dict] = {}
+        for rule in self.query(protocol, port, cidr, direction):
+            entry = allowed.setdefault(rule["security_list_id"], dict(
+                self.security_lists[rule["security_list_id"]], rules=[]))
+            entry["rules"].append(rule)
+        return list(allowed.values())
+
+    def exposure(self, ports: Optional[Dict[int, str]] = None) -> List[Dict]:
+        """Ingress rules that open sensitive ports (or every port) to the whole internet, IPv4 or IPv6."""
+        findings = []
+        for port, service in (ports or SENSITIVE_PORTS).items():
+            for cidr in INTERNET_CIDRS:
+                for rule in self.query("tcp", port, cidr):
+                    findings.append(dict(rule, finding=f"{service} (TCP/{port}) open to {cidr}"))
+        return findings
+
+    def redundant_rules(self) -> List[Dict]:
+        """
+        Rules that add nothing: exact duplicates of an earlier rule in the same security
+        list and direction, or rules shadowed by a broader rule there (wider protocol,
+        CIDR, destination and source port range and ICMP type/code, same
+        statefulness). Each security list is checked against its own small index, so
+        the cost grows with rules per list, not in total.
+        """
+        findings = []
+        for rule_ids in self._by_list.values():
+            local = SecurityRuleIndex()
+            for rule_id in rule_ids:
+                local.add(dict(self.rules[rule_id]), self._networks[rule_id])
+            for rule in local.rules:
+                network = local._networks[rule["rule_id"]]
+                if network is None:
+                    continue
+                for other_id in local._matching_ids(rule["direction"], rule["protocol"], network, None, True):
+                    other = local.rules[other_id]
+                    if (other_id == rule["rule_id"]
+                            or other["stateless"] != rule["stateless"]
+                            or not _covers(other, rule)):
+                        continue
+                    duplicate = (other["protocol"] == rule["protocol"] and other["ports"] == rule["ports"]
+                                 and other["source_ports"] == rule["source_ports"] and other["icmp"] == rule["icmp"]
+                                 and local._networks[other_id] == network)
+                    if duplicate and other_id > rule["rule_id"]:
+                        # Report the later copy of a duplicate pair only
+                        continue
+                    findings.append(dict(self.rules[rule_ids[rule["rule_id"]]],
+                                         finding="duplicate" if duplicate else "shadowed",
+                                         covered_by=rule_ids[other_id]))
+                    break
+        return findings
+
+
+def describe_rule(rule: Dict) -> str:
+    """One-line human readable rule, e.g. 'INGRESS TCP 0.0.0.0/0 ports 22-22'."""
+    protocol = PROTOCOL_NAMES.get(rule["protocol"], rule["protocol"])
+    details = ""
+    if rule["ports"] != ALL_PORTS:
+        details += f" ports {rule['ports'][0]}-{rule['ports'][1]}"
+    source_ports = rule.get("source_ports", ALL_PORTS)
+    if source_ports != ALL_PORTS:
+        details += f" source ports {source_ports[0]}-{source_ports[1]}"
+    icmp_type, icmp_code = rule.get("icmp", (None, None))
+    if icmp_type is not None:
+        details += f" type {icmp_type}" + ("" if icmp_code is None else f" code {icmp_code}")
+    return f"{rule['direction']} {protocol} {rule['cidr']}{details}"
@@ -0,0 +1,259 @@
+"""
+Priority-aware scheduling of OCI API calls.
+
+Every HTTP request of OCIManager's SDK clients passes through the shared
+transport (oci_transport), which asks a Scheduler for a slot before sending.
+The scheduler holds as many slots as the transport has pooled connections. When
+a slot frees up it goes to the waiting call with the highest priority class
+(interactive > prefetch > bulk). Within a class it goes to the session with the
+fewest calls in flight, so one user's bulk job cannot starve another's. Some
+slots are reserved for interactive calls, so a click never queues behind a full
+pipeline of background work.
+
+Calls describe themselves through a context (priority, session, deadline) that
+is set with set_context() or call_context() and carried into
+OCIManager.run_parallel workers. A call whose deadline passes while it is
+queued fails with DeadlineExceeded before it is sent; once sent, its read
+timeout is capped at the time left. A deadline belongs to its priority class:
+background work started from an interactive rerun (prefetch, bulk) does not
+inherit the rerun's deadline. A
+circuit breaker per endpoint host opens after repeated connection failures or
+gateway errors (502/503/504), and then fails calls to that host fast
+(CircuitOpenError) until a trial call succeeds. Other 5xx responses, such as
+Compute's "Out of host capacity", are answers from a working service and do not
+count.
+"""
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Deque, Dict, Iterator, List, Optional
+
+INTERACTIVE = "interactive"
+PREFETCH = "prefetch"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, PREFETCH, BULK)
+
+# Circuit breaker: open after this many consecutive failures, retry after the cooldown
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30.0
+# Responses that mean the endpoint itself is unavailable
+BREAKER_STATUSES = (502, 503, 504)
+
+# Queue wait samples kept per priority class for percentiles
+WAIT_SAMPLES = 1000
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's deadline passed before it could be sent."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Calls to the host are failing; the circuit breaker is rejecting new ones."""
+
+
+class CallContext:
+    __slots__ = ("priority", "session", "deadline")
+
+    def __init__(self, priority: str = INTERACTIVE, session: Optional[str] = None,
+                 deadline: Optional[float] = None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        self.priority = priority
+        self.session = session
+        self.deadline = deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None without one)."""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+
+_context: contextvars.ContextVar = contextvars.ContextVar("oci_call_context", default=CallContext())
+
+
+def current_context() -> CallContext:
+    return _context.get()
+
+
+def set_context(priority: str = INTERACTIVE, session: Optional[str] = None,
+                timeout: Optional[float] = None) -> None:
+    """
+    Set the current thread's default context (e.g. once per Streamlit script
+    run), with a deadline timeout seconds from now.
+    """
+    _context.set(CallContext(priority, session, None if timeout is None else time.monotonic() + timeout))
+
+
+@contextlib.contextmanager
+def call_context(priority: Optional[str] = None, session: Optional[str] = None,
+                 timeout: Optional[float] = None) -> Iterator[CallContext]:
+    """
+    Run the block's API calls with this priority, session and deadline (timeout
+    seconds from now). Unset fields are inherited; a deadline can only shrink,
+    except that switching to a lower priority class drops the outer deadline.
+    """
+    outer = _context.get()
+    deadline = outer.deadline
+    if priority is not None and PRIORITIES.index(priority) > PRIORITIES.index(outer.priority):
+        deadline = None
+    if timeout is not None:
+        deadline = min(filter(None, (deadline, time.monotonic() + timeout)))
+    context = CallContext(priority or outer.priority, session or outer.session, deadline)
+    token = _context.set(context)
+    try:
+        yield context
+    finally:
+        _context.reset(token)
+
+
+def host_of(url: str) -> str:
+    """Endpoint host of a URL (iaas.us-ashburn-1.oraclecloud.com), else the URL itself."""
+    return url.split("/")[2] if "//" in url else url
+
+
+class CircuitBreaker:
+    """Closed -> open after `failures` consecutive failures -> one trial call after `cooldown`."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record(self, ok: Optional[bool]) -> None:
+        """Report a call's outcome; None (e.g. cut short by its own deadline) only ends a trial."""
+        self.trial_running = False
+        if ok is None:
+            return
+        if ok:
+            self.consecutive, self.opened_at = 0, None
+            return
+        self.consecutive += 1
+        if self.opened_at is not None or self.consecutive >= self.failures:
+            self.opened_at = time.monotonic()
+
+
+class _Waiter:
+    __slots__ = ("rank", "session", "seq", "granted")
+
+    def __init__(self, rank: int, session: Optional[str], seq: int):
+        self.rank = rank
+        self.session = session
+        self.seq = seq
+        self.granted = threading.Event()
+
+
+class Scheduler:
+    """Grants `capacity` concurrent call slots by priority class, fair across sessions."""
+
+    def __init__(self, capacity: int, interactive_reserve: Optional[int] = None):
+        self.capacity = capacity
+        # Slots that only interactive calls may take
+        self.interactive_reserve = max(1, capacity // 4) if interactive_reserve is None else interactive_reserve
+        self.in_flight = 0
+        self.in_flight_by_session: Dict[Optional[str], int] = collections.Counter()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.waits: Dict[str, Deque[float]] = {p: collections.deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES}
+        self.rejected = collections.Counter()
+        self._waiting: List[_Waiter] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _dispatch(self) -> None:
+        # Called with the lock held: hand free slots to the best eligible waiters
+        while self._waiting and self.in_flight < self.capacity:
+            background_limit = self.capacity - self.interactive_reserve
+            eligible = [w for w in self._waiting if w.rank == 0 or self.in_flight < background_limit]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda w: (w.rank, self.in_flight_by_session[w.session], w.seq))
+            self._waiting.remove(waiter)
+            self.in_flight += 1
+            self.in_flight_by_session[waiter.session] += 1
+            waiter.granted.set()
+
+    def _release(self, session: Optional[str]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.in_flight_by_session[session] -= 1
+            if not self.in_flight_by_session[session]:
+                del self.in_flight_by_session[session]
+            self._dispatch()
+
+    @contextlib.contextmanager
+    def slot(self, host: str) -> Iterator[CallContext]:
+        """
+        Hold a call slot for the current context while the block runs. Raises
+        CircuitOpenError or DeadlineExceeded instead of queueing when the call
+        cannot succeed. The block should report its outcome with record().
+        """
+        context = current_context()
+        with self._lock:
+            breaker = self.breakers.setdefault(host, CircuitBreaker())
+            if not breaker.allow():
+                self.rejected["circuit_open"] += 1
+                raise CircuitOpenError(f"Circuit open for {host}: recent calls failed, retrying after "
+                                       f"{breaker.cooldown:.0f}s")
+            self._seq += 1
+            waiter = _Waiter(PRIORITIES.index(context.priority), context.session, self._seq)
+            self._waiting.append(waiter)
+            self._dispatch()
+        started = time.monotonic()
+        remaining = context.remaining()
+        if not waiter.granted.wait(None if remaining is None else max(0.0, remaining)):
+            with self._lock:
+                if not waiter.granted.is_set():
+                    self._waiting.remove(waiter)
+                    self.rejected["deadline"] += 1
+                    breaker.trial_running = False
+                    raise DeadlineExceeded(f"Deadline passed after {time.monotonic() - started:.2f}s in the "
+                                           f"{context.priority} queue")
+        self.waits[context.priority].append(time.monotonic() - started)
+        try:
+            yield context
+        finally:
+            self._release(context.session)
+
+    def record(self, host: str, ok: Optional[bool]) -> None:
+        with self._lock:
+            self.breakers.setdefault(host, CircuitBreaker()).record(ok)
+
+    def stats(self) -> Dict:
+        """Queue depth, slot use, breaker states and p50/p99 queue wait (ms) per priority class."""
+        with self._lock:
+            waiting = collections.Counter(PRIORITIES[w.rank] for w in self._waiting)
+            stats = {
+                "in_flight": self.in_flight,
+                "capacity": self.capacity,
+                "sessions": len(self.in_flight_by_session),
+                "breakers": {host: breaker.state for host, breaker in self.breakers.items()},
+                "rejected": dict(self.rejected),
+            }
+            samples = {p: sorted(self.waits[p]) for p in PRIORITIES}
+        for priority in PRIORITIES:
+            ordered = samples[priority]
+            stats[priority] = {
+                "waiting": waiting[priority],
+                "calls": len(ordered),
+                "wait_p50_ms": round(ordered[len(ordered) // 2] * 1000, 1) if ordered else None,
+                "wait_p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1)
+                if ordered else None,
+            }
+        return stats
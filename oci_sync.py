@@ -0,0 +1,200 @@
+"""
+Incremental directory-to-bucket sync.
+
+sync_directory() makes the objects under a bucket prefix match a local directory
+tree, moving only the differences. It keeps a local manifest of what it last
+synced: for each file its size, mtime, MD5 and the object's ETag.
+
+- A file whose size and mtime match the manifest is skipped on a stat() alone,
+  so re-syncing an unchanged tree reads no file data and makes no API calls.
+- Any other file is hashed (MD5, streamed in chunks on the worker pool). It is
+  uploaded only if its content differs from what the manifest, or the bucket
+  listing, says the object holds. Touched-but-identical files are not re-sent.
+- With delete=True, objects whose files are gone are deleted.
+
+The bucket is listed only when there is no manifest yet (first sync, or the
+manifest was lost), or when check_remote=True. Listing catches objects changed or
+deleted by someone else: an ETag different from the manifest's means the file is
+compared again. Large files are uploaded with parallel multipart uploads
+(OCIManager.upload_file).
+
+The manifest is saved every MANIFEST_SAVE_EVERY changes and at the end, so an
+interrupted sync resumes where it stopped. Failed uploads and deletes are left
+out of it, so they are retried next time.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple
+
+from oci_bulk import BulkProgress
+from oci_utils import DOWNLOAD_CHUNK_SIZE, OCIManager
+
+MANIFEST_VERSION = 1
+MANIFEST_DIR = os.path.join("~", ".cache", "oci-resource-manager", "sync")
+MANIFEST_SAVE_EVERY = 1000
+
+# Manifest entry fields, stored as a list per file to keep 100k-file manifests small
+SIZE, MTIME_NS, MD5, ETAG = range(4)
+
+
+def default_manifest_path(manager: OCIManager, bucket_name: str, directory: str, prefix: str = "") -> str:
+    """Manifest file for this region, bucket, prefix and local directory."""
+    identity = "\n".join([manager.config["region"], manager.namespace, bucket_name, prefix,
+                          os.path.abspath(directory)])
+    return os.path.join(os.path.expanduser(MANIFEST_DIR), hashlib.sha1(identity.encode()).hexdigest() + ".json")
+
+
+def load_manifest(path: str, bucket_name: str, prefix: str) -> Optional[Dict[str, list]]:
+    """Files of a saved manifest (relative path -> entry), or None if missing or for another target."""
+    try:
+        with open(path, encoding="utf-8") as source:
+            manifest = json.load(source)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("version"), manifest.get("bucket"), manifest.get("prefix")) != (MANIFEST_VERSION, bucket_name, prefix):
+        return None
+    return manifest["files"]
+
+
+def save_manifest(path: str, bucket_name: str, prefix: str, files: Dict[str, list]) -> None:
+    """Write the manifest atomically."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            json.dump({"version": MANIFEST_VERSION, "bucket": bucket_name, "prefix": prefix, "files": files},
+                      out, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def file_md5(path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
+    """Base64 MD5 of a file (Object Storage's format), read in chunks."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode()
+
+
+def _scan(directory: str, skip: Optional[str]) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """(relative path, path, stat) of every regular file under directory."""
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.is_file() and entry.path != skip:
+                    yield os.path.relpath(entry.path, directory).replace(os.sep, "/"), entry.path, entry.stat()
+
+
+def sync_directory(manager: OCIManager, bucket_name: str, directory: str, prefix: str = "",
+                   delete: bool = False, check_remote: bool = False, manifest_path: Optional[str] = None,
+                   dry_run: bool = False, progress: Optional[BulkProgress] = None) -> Iterator[Dict]:
+    """
+    Upload new and changed files under directory to prefix + relative path, and with
+    delete=True delete objects whose files are gone. Yields one result per upload or
+    delete; unchanged files are only counted (progress.skipped).
+    """
+    if not os.path.isdir(directory):
+        raise ValueError(f"{directory} is not a directory")
+    progress = progress or BulkProgress()
+    manifest_path = manifest_path or default_manifest_path(manager, bucket_name, directory, prefix)
+    previous = load_manifest(manifest_path, bucket_name, prefix)
+    remote: Optional[Dict[str, Dict]] = None
+    if previous is None or check_remote:
+        remote = {obj["name"][len(prefix):]: obj
+                  for obj in manager.iter_objects(bucket_name, prefix=prefix or None, fields="name,size,md5,etag")}
+    previous = previous or {}
+    files: Dict[str, list] = {}
+    deleted = set()
+    changes = [0]
+
+    def record_change() -> None:
+        changes[0] += 1
+        if not dry_run and changes[0] % MANIFEST_SAVE_EVERY == 0:
+            merged = dict(previous, **files)
+            for relative in deleted:
+                merged.pop(relative, None)
+            save_manifest(manifest_path, bucket_name, prefix, merged)
+
+    def candidates() -> Iterator[Tuple[str, int, Tuple]]:
+        for relative, path, stat in _scan(os.path.abspath(directory), os.path.abspath(manifest_path)):
+            entry = previous.get(relative)
+            target = remote.get(relative) if remote is not None else None
+            if entry and entry[SIZE] == stat.st_size and entry[MTIME_NS] == stat.st_mtime_ns \
+                    and (remote is None or target and target["etag"] == entry[ETAG]):
+                files[relative] = entry
+                progress.skip()
+                continue
+            yield prefix + relative, stat.st_size, (relative, path, stat, entry, target)
+
+    def upload(item) -> Dict:
+        relative, path, stat, entry, target = item[2]
+        md5 = file_md5(path)
+        if remote is None:
+            unchanged = entry is not None and entry[MD5] == md5
+            etag = entry[ETAG] if entry else None
+        else:
+            unchanged = target is not None and target["size"] == stat.st_size and (
+                target["md5"] == md5 or entry is not None and entry[MD5] == md5 and entry[ETAG] == target["etag"])
+            etag = target["etag"] if target else None
+        if unchanged:
+            return {"relative": relative, "entry": [stat.st_size, stat.st_mtime_ns, md5, etag], "uploaded": False}
+        if dry_run:
+            return {"relative": relative, "entry": None, "uploaded": True}
+        result = manager.upload_file(bucket_name, prefix + relative, path)
+        return {"relative": relative, "entry": [stat.st_size, stat.st_mtime_ns, md5, result["etag"]], "uploaded": True}
+
+    for (name, size, payload), result, error in manager.run_parallel(upload, candidates()):
+        if error:
+            progress.record(False, size)
+            yield {"name": name, "action": "upload", "size": size, "status": "error", "error": str(error)}
+            continue
+        if result["entry"]:
+            files[result["relative"]] = result["entry"]
+        if not result["uploaded"]:
+            progress.skip()
+            continue
+        progress.record(True, size)
+        record_change()
+        yield {"name": name, "action": "upload", "size": size, "status": "dry-run" if dry_run else "ok"}
+
+    if delete:
+        gone = (set(previous) | set(remote or ())) - set(files)
+        # A file whose upload failed above is not gone
+        gone -= {relative for relative in gone if os.path.isfile(os.path.join(directory, relative))}
+        items = ((prefix + relative, 0, relative) for relative in sorted(gone))
+        if dry_run:
+            for name, _, _ in items:
+                progress.record(True)
+                yield {"name": name, "action": "delete", "size": 0, "status": "dry-run"}
+        else:
+            for (name, _, relative), _, error in manager.run_parallel(
+                    lambda item: manager.delete_object(bucket_name, item[0]), items):
+                # 404: someone else already deleted the object, which is the outcome we wanted
+                if error is not None and getattr(error, "status", None) == 404:
+                    error = None
+                progress.record(error is None)
+                if error:
+                    if relative in previous:
+                        files[relative] = previous[relative]
+                    yield {"name": name, "action": "delete", "size": 0, "status": "error", "error": str(error)}
+                else:
+                    deleted.add(relative)
+                    record_change()
+                    yield {"name": name, "action": "delete", "size": 0, "status": "ok"}
+    else:
+        # Keep entries of files that are gone, so a later sync with delete=True still removes their objects
+        for relative, entry in previous.items():
+            files.setdefault(relative, entry)
+
+    if not dry_run and files != previous:
+        save_manifest(manifest_path, bucket_name, prefix, files)
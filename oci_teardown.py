@@ -0,0 +1,106 @@
+"""
+Cascading VCN teardown.
+
+A VCN can only be deleted once every subnet, gateway, route table, security list
+and DHCP option set in it is gone; a route table, security list or DHCP option
+set only once no subnet uses it; and a gateway only once no route rule targets
+it. plan_teardown discovers all of a VCN's resources (every kind listed in
+parallel) and builds the deletion graph from those references, so each resource
+waits only for the ones that actually use it. Rules of the VCN's default route
+table are cleared as a separate step; the default route table, security list and
+DHCP options go with the VCN itself. Route tables associated with gateways or DRG
+attachments (transit routing) are disassociated first, also as separate steps:
+such a table cannot be deleted while associated, and it often routes to the
+gateway it is associated with.
+
+teardown_vcn runs that graph with oci_blueprint.run_graph, so each resource is
+deleted as soon as its dependents are gone, with as many deletions in flight as
+the manager allows, and each deletion is waited on with backoff.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from oci_blueprint import ResourceProgress, delete_resource, run_graph
+from oci_utils import OCIManager, VCN_RESOURCE_KINDS
+
+_GONE_STATES = ("TERMINATING", "TERMINATED", "DETACHING", "DETACHED")
+
+
+def plan_teardown(manager: OCIManager, vcn_id: str) -> Tuple[Dict, Dict[str, Dict], Dict[str, List[str]]]:
+    """
+    Discover everything in a VCN. Returns (vcn, resources by graph key, deletion deps).
+    Default route table rules get their own "route_rules" step, since gateways
+    cannot go while they are referenced. Each gateway or DRG attachment route table
+    association gets its own "route_table_association" step, which its route table
+    waits for.
+    """
+    vcn = manager.get_vcn(vcn_id)
+    defaults = {vcn["default_route_table_id"], vcn["default_security_list_id"], vcn["default_dhcp_options_id"]}
+    resources: Dict[str, Dict] = {}
+    for kind, listed, error in manager.run_parallel(
+        lambda kind: list(manager.iter_vcn_resources(vcn["compartment_id"], vcn_id, kind)), VCN_RESOURCE_KINDS
+    ):
+        if error:
+            raise error
+        for resource in listed:
+            if resource["state"] in _GONE_STATES:
+                continue
+            if resource["id"] in defaults:
+                if resource["id"] == vcn["default_route_table_id"]:
+                    resources[f"route_rules:{resource['id']}"] = dict(resource, kind="route_rules")
+                continue
+            resources[f"{kind}:{resource['id']}"] = resource
+            route_table_id = resource.get("route_table_id")
+            if route_table_id:
+                # The association is cleared first; it must not make the route table wait for the gateway
+                resource["references"] = [ref for ref in resource["references"] if ref != route_table_id]
+                if route_table_id not in defaults:
+                    resources[f"route_table_association:{resource['id']}"] = dict(
+                        resource, kind="route_table_association", gateway_kind=kind, references=[route_table_id])
+
+    # A resource can go once everything that references it is gone
+    deps: Dict[str, List[str]] = {key: [] for key in resources}
+    by_id = {resource["id"]: key for key, resource in resources.items()
+             if resource["kind"] not in ("route_rules", "route_table_association")}
+    for key, resource in resources.items():
+        for referenced in resource["references"]:
+            if referenced in by_id:
+                deps[by_id[referenced]].append(key)
+        if resource["kind"] == "route_table_association":
+            # Update the gateway before deleting it, not while it is being deleted
+            deps[f"{resource['gateway_kind']}:{resource['id']}"].append(key)
+    vcn_key = f"vcn:{vcn_id}"
+    resources[vcn_key] = {"kind": "vcn", "id": vcn_id, "name": vcn["name"], "state": vcn["state"], "references": []}
+    deps[vcn_key] = [key for key in resources if key != vcn_key]
+    return vcn, resources, deps
+
+
+def teardown_vcn(manager: OCIManager, vcn_id: str, progress: Optional[ResourceProgress] = None) -> List[Dict]:
+    """
+    Delete a VCN and everything in it. Returns one result per resource; raises
+    RuntimeError listing the failures (for example a subnet that still has VNICs)
+    after the rest of the graph that could be deleted has been.
+    """
+    _, resources, deps = plan_teardown(manager, vcn_id)
+    progress = progress or ResourceProgress()
+    for key, resource in resources.items():
+        progress.update(key, name=resource["name"], kind=resource["kind"], id=resource["id"], state="PENDING")
+
+    def delete(key: str) -> None:
+        resource = resources[key]
+        if resource["kind"] == "route_rules":
+            manager.update_route_table_rules(resource["id"], [])
+        elif resource["kind"] == "route_table_association":
+            manager.clear_route_table_association(resource["gateway_kind"], resource["id"])
+            manager.wait_for_network_resource(resource["gateway_kind"], resource["id"],
+                                              "ATTACHED" if resource["gateway_kind"] == "drg_attachment" else "AVAILABLE")
+        elif resource["kind"] == "vcn":
+            manager.delete_vcn(resource["id"])
+            manager.wait_for_network_resource("vcn", resource["id"], "TERMINATED")
+        else:
+            delete_resource(manager, resource["kind"], resource["id"])
+
+    _, failed = run_graph(manager, deps, delete, progress, "DELETING", "DELETED", stop_on_failure=False)
+    if failed:
+        raise RuntimeError("Teardown incomplete: " + "; ".join(
+            f"{resources[key]['kind']} {resources[key]['name']}: {error}" for key, error in failed.items()))
+    return progress.results()
@@ -0,0 +1,202 @@
+"""
+Shared HTTP transport for OCIManager's SDK clients.
+
+Each SDK client normally opens its own requests Session with urllib3's default
+of 10 pooled connections per host. Under parallel fan-out, extra threads open
+throwaway connections (a new TLS handshake each) that are discarded after one
+call. The Compute and Networking clients talk to the same iaas endpoint but
+never share a connection. A Transport is a single Session whose adapter keeps
+up to pool_size keep-alive connections per host. Every client of every
+OCIManager with the same settings is attached to it, so connections to an
+endpoint are reused across clients, managers and Streamlit reruns. When all
+connections are busy, a thread waits for one instead of opening another.
+PoolStats counts connection checkouts, waits for a free connection and new
+connections. Each request also takes a slot from the transport's Scheduler
+(oci_scheduler), which orders interactive, prefetch and bulk calls. The slot is
+held until the response's connection is back in the pool, so a streamed body
+(get_object) still counts against the scheduler while it is being read, and
+slots never outnumber pooled connections.
+
+The SDK ships its own copy of requests/urllib3, so the adapter comes from oci._vendor.
+"""
+import contextlib
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+from oci._vendor import requests
+from oci._vendor.requests.adapters import HTTPAdapter
+
+from oci_perf import record_api_call
+from oci_scheduler import BREAKER_STATUSES, DeadlineExceeded, Scheduler, host_of
+
+# Per-host pools kept open (one per service endpoint and region in use)
+MAX_HOSTS = 32
+
+# SDK defaults: 10s to connect, 60s between bytes read
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+
+class PoolStats:
+    """Thread-safe connection pool counters."""
+
+    def __init__(self):
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def record(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict:
+        """Counters plus the share of requests served on a reused connection."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "pool_waits": self.waits,
+                "pool_wait_seconds": round(self.wait_seconds, 3),
+                "new_connections": self.new_connections,
+                "connection_reuse": round(1 - self.new_connections / self.requests, 3) if self.requests else None,
+            }
+
+
+def _instrumented(pool_cls, stats: PoolStats):
+    """Subclass of a urllib3 connection pool class that reports to stats."""
+
+    class InstrumentedPool(pool_cls):
+        def _get_conn(self, timeout=None):
+            if self.pool is not None and self.pool.empty():
+                started = time.monotonic()
+                conn = super()._get_conn(timeout)
+                stats.record(requests=1, waits=1, wait_seconds=time.monotonic() - started)
+                return conn
+            stats.record(requests=1)
+            return super()._get_conn(timeout)
+
+        def _new_conn(self):
+            stats.record(new_connections=1)
+            return super()._new_conn()
+
+    return InstrumentedPool
+
+
+def _hold_until_released(response, release) -> None:
+    """
+    Call release() once the response's connection is returned to the pool: when
+    its body has been read, or it is closed. A response dropped unread is closed
+    when it is garbage collected, so neither the connection nor the slot leaks.
+    """
+    raw = response.raw
+    pending = threading.Lock()
+
+    def release_once():
+        if pending.acquire(blocking=False):
+            release()
+
+    if getattr(raw, "_connection", None) is None:
+        # Already back in the pool (body read) or never checked out
+        release_once()
+        return
+    release_conn = raw.release_conn
+
+    def release_conn_and_slot():
+        release_conn()
+        release_once()
+
+    def abandoned():
+        raw.close()
+        release_conn_and_slot()
+
+    raw.release_conn = release_conn_and_slot
+    weakref.finalize(response, abandoned)
+
+
+class _PooledAdapter(HTTPAdapter):
+    def __init__(self, stats: PoolStats, scheduler: Scheduler, **kwargs):
+        self.stats = stats
+        self.scheduler = scheduler
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        host = host_of(request.url)
+        slot = contextlib.ExitStack()
+        context = slot.enter_context(self.scheduler.slot(host))
+        try:
+            remaining = context.remaining()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise DeadlineExceeded("Deadline passed before the call was sent")
+                timeout = kwargs.get("timeout")
+                if isinstance(timeout, tuple):
+                    kwargs["timeout"] = tuple(min(part, remaining) if part else remaining for part in timeout)
+                else:
+                    kwargs["timeout"] = min(timeout, remaining) if timeout else remaining
+            started = time.perf_counter()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                record_api_call(request.method, request.url, time.perf_counter() - started, None)
+                # A timeout forced by the caller's own deadline says nothing about the host
+                deadline_hit = remaining is not None and context.remaining() <= 0
+                self.scheduler.record(host, None if deadline_hit else False)
+                raise
+            record_api_call(request.method, request.url, time.perf_counter() - started, response.status_code)
+            # Only an unavailable endpoint counts against the host; service errors (e.g. out of capacity) do not
+            self.scheduler.record(host, response.status_code not in BREAKER_STATUSES)
+        except BaseException:
+            slot.close()
+            raise
+        _hold_until_released(response, slot.close)
+        return response
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # Keeps the SDK's own pool classes (100-Continue support), wrapped for stats
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _instrumented(pool_cls, self.stats)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class Transport:
+    """One pooled, keep-alive, scheduled Session shared by SDK clients, with per-call timeouts."""
+
+    def __init__(self, pool_size: int, timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.stats = PoolStats()
+        self.scheduler = Scheduler(pool_size)
+        self.session = requests.Session()
+        adapter = _PooledAdapter(self.stats, self.scheduler, pool_connections=MAX_HOSTS, pool_maxsize=pool_size,
+                                 pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def attach(self, client):
+        """Route an SDK client's calls through this transport. Returns the client."""
+        client.base_client.session = self.session
+        client.base_client.timeout = self.timeout
+        return client
+
+
+def pool_size_for(max_workers: int) -> int:
+    """Connections for a manager with max_workers: every worker plus nested fan-out and background prefetches."""
+    return max(10, 2 * max_workers)
+
+
+_transports: Dict[Tuple, Transport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(pool_size: int, timeout: Optional[Tuple[float, float]] = None) -> Transport:
+    """The process-wide Transport for these settings, created on first use."""
+    key = (pool_size, timeout or DEFAULT_TIMEOUT)
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = Transport(*key)
+        return _transports[key]
@@ -0,0 +1,189 @@
+"""
+Scoped, expiring UI state for Streamlit sessions.
+
+Writing one session_state key per table row (for example a "show delete dialog"
+flag per object) makes a long-lived session grow with every row anyone clicks.
+Every rerun then carries all of those keys. UIState keeps that state instead
+in a single session_state entry, bounded in three ways:
+
+- Scopes: one small store per table (e.g. the objects of one bucket), holding
+  a few named entries such as "confirm_delete" -> object name, rather than a
+  key per row. Each scope keeps at most MAX_ROWS entries and drops the least
+  recently used.
+- Expiry: every entry has a TTL (DEFAULT_TTL unless given), and expired
+  entries are swept once per rerun.
+- Ceiling: the total size of everything stored is capped at max_bytes. Sizes
+  are measured once, when a value is stored. Cached values (cached(), e.g.
+  per-compartment indexes) are evicted least recently used first, then scope
+  entries. A value that could never fit is returned but not kept.
+
+The module only needs a mutable mapping, so it works without Streamlit too.
+"""
+import collections
+import pickle
+import sys
+import time
+from typing import Callable, Dict, Hashable, MutableMapping, Optional, Tuple
+
+MINUTE = 60
+
+STATE_KEY = "_ui_state"
+DEFAULT_TTL = 30 * MINUTE
+MAX_ROWS = 50
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_MISSING = object()
+
+
+def _size(value) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _Store:
+    """Everything UIState keeps, in one session_state value."""
+
+    def __init__(self):
+        # scope name -> row -> [value, expires_at, size], least recently used first
+        self.scopes: Dict[Tuple, "collections.OrderedDict"] = {}
+        # cached value name -> [key, value, expires_at, size], least recently used first
+        self.values: "collections.OrderedDict" = collections.OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+
+class Scope:
+    """Named UI entries of one table, e.g. ui.scope("objects", bucket_name)."""
+
+    def __init__(self, ui: "UIState", name: Tuple):
+        self._ui = ui
+        self._name = name
+
+    def _rows(self, create: bool = False) -> Optional["collections.OrderedDict"]:
+        rows = self._ui._store.scopes.get(self._name)
+        if rows is None and create:
+            rows = self._ui._store.scopes[self._name] = collections.OrderedDict()
+        return rows
+
+    def get(self, row: Hashable, default=None):
+        rows = self._rows()
+        entry = rows.get(row) if rows else None
+        if entry is None or entry[1] < self._ui.now():
+            return default
+        rows.move_to_end(row)
+        return entry[0]
+
+    def __contains__(self, row: Hashable) -> bool:
+        return self.get(row, _MISSING) is not _MISSING
+
+    def set(self, row: Hashable, value=True, ttl: Optional[float] = None) -> None:
+        # Pop first: dropping a scope's only row removes the scope itself
+        self.pop(row)
+        rows = self._rows(create=True)
+        size = _size(value)
+        rows[row] = [value, self._ui.now() + (ttl or self._ui.ttl), size]
+        self._ui._store.bytes += size
+        while len(rows) > MAX_ROWS:
+            self._ui._drop_row(self._name, next(iter(rows)))
+        self._ui._enforce_ceiling()
+
+    def pop(self, row: Hashable, default=None):
+        rows = self._rows()
+        if not rows or row not in rows:
+            return default
+        value = rows[row][0]
+        self._ui._drop_row(self._name, row, evicted=False)
+        return value
+
+    def clear(self) -> None:
+        for row in list(self._rows() or ()):
+            self._ui._drop_row(self._name, row, evicted=False)
+
+
+class UIState:
+    """
+    Bounded UI state of one session, stored under STATE_KEY. Create one per
+    rerun: construction sweeps expired entries.
+    """
+
+    def __init__(self, session_state: MutableMapping, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: float = DEFAULT_TTL, now: Callable[[], float] = time.time):
+        if STATE_KEY not in session_state:
+            session_state[STATE_KEY] = _Store()
+        self._store: _Store = session_state[STATE_KEY]
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.now = now
+        self.sweep()
+
+    def scope(self, *name) -> Scope:
+        return Scope(self, name)
+
+    def cached(self, name: str, key: Hashable, builder: Callable[[], object], ttl: Optional[float] = None):
+        """
+        The value stored as name if it was built for key and has not expired;
+        otherwise builder() (stored, if it fits under the ceiling).
+        """
+        entry = self._store.values.get(name)
+        if entry is not None and entry[0] == key and entry[2] >= self.now():
+            self._store.values.move_to_end(name)
+            return entry[1]
+        self.invalidate(name)
+        value = builder()
+        size = _size(value)
+        if size <= self.max_bytes:
+            self._store.values[name] = [key, value, self.now() + (ttl or self.ttl), size]
+            self._store.bytes += size
+            self._enforce_ceiling()
+        return value
+
+    def invalidate(self, *names: str) -> None:
+        """Drop cached values by name (all of them without names)."""
+        for name in names or list(self._store.values):
+            entry = self._store.values.pop(name, None)
+            if entry is not None:
+                self._store.bytes -= entry[3]
+
+    def _drop_row(self, scope: Tuple, row: Hashable, evicted: bool = True) -> None:
+        rows = self._store.scopes[scope]
+        self._store.bytes -= rows.pop(row)[2]
+        if not rows:
+            del self._store.scopes[scope]
+        if evicted:
+            self._store.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop expired entries. Returns how many were dropped."""
+        now = self.now()
+        dropped = 0
+        for name, entry in list(self._store.values.items()):
+            if entry[2] < now:
+                self.invalidate(name)
+                dropped += 1
+        for scope, rows in list(self._store.scopes.items()):
+            for row, entry in list(rows.items()):
+                if entry[1] < now:
+                    self._drop_row(scope, row, evicted=False)
+                    dropped += 1
+        return dropped
+
+    def _enforce_ceiling(self) -> None:
+        # Big cached values go first; they can always be rebuilt
+        while self._store.bytes > self.max_bytes and self._store.values:
+            self.invalidate(next(iter(self._store.values)))
+            self._store.evictions += 1
+        while self._store.bytes > self.max_bytes and self._store.scopes:
+            oldest = min(self._store.scopes.items(), key=lambda item: next(iter(item[1].values()))[1])
+            self._drop_row(oldest[0], next(iter(oldest[1])))
+
+    def usage(self) -> Dict:
+        return {
+            "bytes": self._store.bytes,
+            "max_bytes": self.max_bytes,
+            "cached_values": len(self._store.values),
+            "scopes": len(self._store.scopes),
+            "entries": sum(len(rows) for rows in self._store.scopes.values()),
+            "evictions": self._store.evictions,
+        }
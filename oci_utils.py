@@ -1,22 +1,78 @@
 import oci
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import base64
+import contextvars
+import datetime
+import hashlib
+import ipaddress
+import itertools
+import json
 import os
+import threading
 
+import oci_perf
+from oci_cache import HOUR, MINUTE, cache
+from oci_compression import DEFAULT_POLICY, CompressingReader, CompressionPolicy, iter_decompressed
+from oci_transport import get_transport, pool_size_for
+
+# Networking resources that live inside a VCN, in OCIManager.delete_<kind> naming
+VCN_RESOURCE_KINDS = ("subnet", "route_table", "security_list", "dhcp_options", "internet_gateway",
+                      "nat_gateway", "service_gateway", "local_peering_gateway", "drg_attachment")
+
+# The Oracle Services Network catalog changes rarely; it is cached per region
+SERVICES_TTL = 24 * HOUR
+COMPARTMENTS_TTL = 5 * MINUTE
+
+# Object downloads are fetched in ranged parts of this size, several in parallel
+DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Compressed uploads are streamed in multipart parts of this size (one part is held in memory)
+UPLOAD_STREAM_PART_SIZE = 16 * 1024 * 1024
+
+@oci_perf.instrument
 class OCIManager:
-    def __init__(self, config_file: str = "~/.oci/config", profile: str = "DEFAULT", region: str = None):
+    def __init__(self, config_file: str = "~/.oci/config", profile: str = "DEFAULT", region: str = None,
+                 max_workers: int = 8, connect_timeout: float = 10.0, read_timeout: float = 60.0):
         self.config = oci.config.from_file(os.path.expanduser(config_file), profile)
         if region:
             self.config["region"] = region
-        self.identity = oci.identity.IdentityClient(self.config)
-        self.network = oci.core.VirtualNetworkClient(self.config)
-        self.compute = oci.core.ComputeClient(self.config)
-        self.database = oci.database.DatabaseClient(self.config)
-        self.object_storage = oci.object_storage.ObjectStorageClient(self.config)
+        self.max_workers = max_workers
+        self.transport = get_transport(pool_size_for(max_workers), (connect_timeout, read_timeout))
+        self.identity = self.transport.attach(oci.identity.IdentityClient(self.config))
+        self.network = self.transport.attach(oci.core.VirtualNetworkClient(self.config))
+        self.compute = self.transport.attach(oci.core.ComputeClient(self.config))
+        self.database = self.transport.attach(oci.database.DatabaseClient(self.config))
+        self.object_storage = self.transport.attach(oci.object_storage.ObjectStorageClient(self.config))
+        self.monitoring = self.transport.attach(oci.monitoring.MonitoringClient(self.config))
         
         # Get tenancy OCID
         self.tenancy_id = self.config["tenancy"]
         self.namespace = self.object_storage.get_namespace().data
-    
+
+    def run_parallel(self, func: Callable, items: Iterable) -> Iterator[Tuple[object, object, Optional[Exception]]]:
+        """
+        Call func(item) for every item on a pool of max_workers threads.
+        Items are pulled lazily, so at most 2 * max_workers calls are in flight at once.
+        Yields (item, result, error) tuples in completion order; errors are returned, not raised.
+        Workers run in the caller's call context (priority, session, deadline; see oci_scheduler).
+        """
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            for item in itertools.islice(items, 2 * self.max_workers):
+                pending[executor.submit(contextvars.copy_context().run, func, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+                for item in itertools.islice(items, len(done)):
+                    pending[executor.submit(contextvars.copy_context().run, func, item)] = item
+
     def list_compartments(self) -> List[Dict]:
         """List all compartments in the tenancy (all pages)."""
         compartments = oci.pagination.list_call_get_all_results(
@@ -25,7 +81,7 @@ class OCIManager:
             compartment_id_in_subtree=True,
             lifecycle_state="ACTIVE"
         ).data
-        return [{"id": comp.id, "name": comp.name} for comp in compartments]
+        return [{"id": comp.id, "name": comp.name, "parent_id": comp.compartment_id} for comp in compartments]
     
     def list_vcns(self, compartment_id: str) -> List[Dict]:
         """List VCNs in a compartment."""
@@ -46,26 +102,35 @@ class OCIManager:
             compartment_id=compartment_id,
             vcn_id=vcn_id
         ).data
-        return [{"id": sl.id, "name": sl.display_name} for sl in security_lists]
+        return [{"id": sl.id, "name": sl.display_name,
+                 "ingress_count": len(sl.ingress_security_rules or []),
+                 "egress_count": len(sl.egress_security_rules or [])} for sl in security_lists]
     
     def get_security_list(self, security_list_id: str) -> Dict:
-        """Get security list details."""
-        sl = self.network.get_security_list(security_list_id).data
+        """Get security list details, with the ETag to pass back as if_match on update."""
+        response = self.network.get_security_list(security_list_id)
+        sl = response.data
         return {
             "id": sl.id,
             "name": sl.display_name,
+            "vcn_id": sl.vcn_id,
+            "etag": response.headers.get("etag"),
             "egress_rules": sl.egress_security_rules,
             "ingress_rules": sl.ingress_security_rules
         }
     
-    def update_security_list_rules(self, security_list_id: str, egress_rules: List[Dict], ingress_rules: List[Dict]) -> None:
-        """Update security list rules."""
-        sl = self.network.get_security_list(security_list_id).data
+    def update_security_list_rules(self, security_list_id: str, egress_rules: List, ingress_rules: List,
+                                   if_match: Optional[str] = None) -> Optional[str]:
+        """
+        Replace a security list's rules. With if_match the update only succeeds if the
+        list still has that ETag (HTTP 412 otherwise). Returns the new ETag.
+        """
         details = oci.core.models.UpdateSecurityListDetails(
             egress_security_rules=egress_rules,
             ingress_security_rules=ingress_rules
         )
-        self.network.update_security_list(security_list_id, details)
+        response = self.network.update_security_list(security_list_id, details, if_match=if_match)
+        return response.headers.get("etag")
     
     def create_vcn(self, compartment_id: str, display_name: str, cidr_block: str, 
                   dns_label: Optional[str] = None, is_ipv6_enabled: bool = False) -> Dict:
@@ -83,8 +148,10 @@ class OCIManager:
     def create_subnet(self, compartment_id: str, vcn_id: str, display_name: str, 
                      cidr_block: str, subnet_type: str = "PUBLIC",
                      dns_label: Optional[str] = None,
-                     availability_domain: Optional[str] = None) -> Dict:
-        """Create a new subnet with additional options."""
+                     availability_domain: Optional[str] = None,
+                     route_table_id: Optional[str] = None,
+                     security_list_ids: Optional[List[str]] = None) -> Dict:
+        """Create a new subnet with additional options (the VCN's defaults apply without a route table or SLs)."""
         details = oci.core.models.CreateSubnetDetails(
             compartment_id=compartment_id,
             vcn_id=vcn_id,
@@ -92,7 +159,9 @@ class OCIManager:
             cidr_block=cidr_block,
             dns_label=dns_label,
             prohibit_public_ip_on_vnic=(subnet_type == "PRIVATE"),
-            availability_domain=availability_domain
+            availability_domain=availability_domain,
+            route_table_id=route_table_id,
+            security_list_ids=security_list_ids
         )
         subnet = self.network.create_subnet(details).data
         return {"id": subnet.id, "name": subnet.display_name}
@@ -189,11 +258,13 @@ class OCIManager:
         subnet_id: str,
         ssh_public_key: str,
         boot_volume_size_in_gbs: Optional[int] = None,
-        shape_config: Optional[Dict] = None
+        shape_config: Optional[Dict] = None,
+        availability_domain: Optional[str] = None
     ) -> Dict:
         """Launch a compute instance."""
         instance_details = oci.core.models.LaunchInstanceDetails(
             compartment_id=compartment_id,
+            availability_domain=availability_domain,
             display_name=display_name,
             image_id=image_id,
             shape=shape,
@@ -216,8 +287,11 @@ class OCIManager:
                 image_id=image_id
             )
             
-        instance = self.compute.launch_instance(instance_details).data
-        return {"id": instance.id, "name": instance.display_name}
+        response = self.compute.launch_instance(instance_details)
+        instance = response.data
+        return {"id": instance.id, "name": instance.display_name, "state": instance.lifecycle_state,
+                "availability_domain": instance.availability_domain,
+                "work_request_id": response.headers.get("opc-work-request-id")}
     
     def list_instances(self, compartment_id: str) -> List[Dict]:
         """List compute instances."""
@@ -246,7 +320,9 @@ class OCIManager:
                 "state": instance.lifecycle_state,
                 "private_ip": private_ip,
                 "public_ip": public_ip,
-                "shape": instance.shape
+                "shape": instance.shape,
+                "ocpus": instance.shape_config.ocpus if instance.shape_config else None,
+                "memory_in_gbs": instance.shape_config.memory_in_gbs if instance.shape_config else None
             })
         return result
     
@@ -295,14 +371,15 @@ class OCIManager:
 
     def create_service_gateway(self, compartment_id: str, vcn_id: str, 
                              display_name: str, services: List[str]) -> Dict:
-        """Create a new service gateway."""
-        # Get available services
-        services_list = self.network.list_services(compartment_id).data
-        service_details = []
-        for service_name in services:
-            service = next((svc for svc in services_list if svc.service_name == service_name), None)
-            if service:
-                service_details.append(oci.core.models.ServiceIdRequestDetails(service_id=service.id))
+        """Create a new service gateway for service names or OCIDs from the services catalog."""
+        catalog = self.services_catalog()
+        unknown = [name for name in services if name not in catalog["by_name"] and name not in catalog["by_id"]]
+        if unknown:
+            raise ValueError(f"Unknown service(s) for a service gateway: {', '.join(unknown)}")
+        service_details = [
+            oci.core.models.ServiceIdRequestDetails(service_id=catalog["by_name"].get(name, {"id": name})["id"])
+            for name in services
+        ]
 
         details = oci.core.models.CreateServiceGatewayDetails(
             compartment_id=compartment_id,
@@ -313,15 +390,132 @@ class OCIManager:
         gateway = self.network.create_service_gateway(details).data
         return {"id": gateway.id, "name": gateway.display_name}
 
+    def services_catalog(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Services a service gateway can reach in this region, indexed by name and by
+        OCID. Fetched once per region and shared by every OCIManager in the process.
+        """
+        def load() -> Dict[str, Dict[str, Dict]]:
+            services = [
+                {"id": svc.id, "name": svc.name, "cidr_block": svc.cidr_block, "description": svc.description}
+                for svc in oci.pagination.list_call_get_all_results(self.network.list_services).data
+            ]
+            return {"by_name": {svc["name"]: svc for svc in services},
+                    "by_id": {svc["id"]: svc for svc in services}}
+
+        return cache.get_or_load(("services", self.config.get("region")), load, SERVICES_TTL)
+
     def list_available_services(self, compartment_id: str) -> List[Dict]:
         """List available services for service gateway."""
-        services = self.network.list_services().data
-        return [{"id": svc.id, "name": svc.service_name if hasattr(svc, 'service_name') else svc.name} for svc in services]
+        return list(self.services_catalog()["by_name"].values())
 
     def delete_vcn(self, vcn_id: str) -> None:
         """Delete a VCN."""
         self.network.delete_vcn(vcn_id) 
 
+    def get_vcn(self, vcn_id: str) -> Dict:
+        """Get VCN details, including its default route table, security list and DHCP options."""
+        vcn = self.network.get_vcn(vcn_id).data
+        return {"id": vcn.id, "name": vcn.display_name, "compartment_id": vcn.compartment_id,
+                "cidr": vcn.cidr_block, "state": vcn.lifecycle_state,
+                "default_route_table_id": vcn.default_route_table_id,
+                "default_security_list_id": vcn.default_security_list_id,
+                "default_dhcp_options_id": vcn.default_dhcp_options_id}
+
+    def iter_vcn_resources(self, compartment_id: str, vcn_id: str, kind: str) -> Iterator[Dict]:
+        """
+        Yield a VCN's resources of one kind (see VCN_RESOURCE_KINDS) page by page, with
+        the ids each one references (a subnet's route table, SLs and DHCP options; a
+        route table's rule targets; the route table associated with a gateway or DRG
+        attachment for transit routing, also given as route_table_id).
+        """
+        lister = getattr(self.network, "list_dhcp_options" if kind == "dhcp_options" else f"list_{kind}s")
+        for resource in oci.pagination.list_call_get_all_results_generator(
+            lister, "record", compartment_id, vcn_id=vcn_id
+        ):
+            route_table_id = None
+            if kind == "subnet":
+                references = [resource.route_table_id, resource.dhcp_options_id] + (resource.security_list_ids or [])
+            elif kind == "route_table":
+                references = [rule.network_entity_id for rule in resource.route_rules or []]
+            else:
+                route_table_id = getattr(resource, "route_table_id", None)
+                references = [route_table_id]
+            yield {"kind": kind, "id": resource.id, "name": resource.display_name,
+                   "state": resource.lifecycle_state, "route_table_id": route_table_id,
+                   "references": [ref for ref in references if ref]}
+
+    def clear_route_table_association(self, kind: str, resource_id: str) -> None:
+        """Disassociate the route table from a gateway or DRG attachment (kind as in VCN_RESOURCE_KINDS)."""
+        details_class = getattr(oci.core.models, "Update" + kind.title().replace("_", "") + "Details")
+        # An empty OCID removes the association; None would leave it unchanged
+        getattr(self.network, f"update_{kind}")(resource_id, details_class(route_table_id=""))
+
+    def update_route_table_rules(self, route_table_id: str, route_rules: List[Dict]) -> None:
+        """Replace a route table's rules (same rule dicts as create_route_table)."""
+        details = oci.core.models.UpdateRouteTableDetails(route_rules=[
+            oci.core.models.RouteRule(
+                network_entity_id=rule["network_entity_id"],
+                destination=rule["destination"],
+                destination_type=rule.get("destination_type", "CIDR_BLOCK")
+            ) for rule in route_rules
+        ])
+        self.network.update_route_table(route_table_id, details)
+
+    def delete_subnet(self, subnet_id: str) -> None:
+        """Delete a subnet."""
+        self.network.delete_subnet(subnet_id)
+
+    def delete_route_table(self, route_table_id: str) -> None:
+        """Delete a route table."""
+        self.network.delete_route_table(route_table_id)
+
+    def delete_security_list(self, security_list_id: str) -> None:
+        """Delete a security list."""
+        self.network.delete_security_list(security_list_id)
+
+    def delete_internet_gateway(self, gateway_id: str) -> None:
+        """Delete an internet gateway."""
+        self.network.delete_internet_gateway(gateway_id)
+
+    def delete_nat_gateway(self, gateway_id: str) -> None:
+        """Delete a NAT gateway."""
+        self.network.delete_nat_gateway(gateway_id)
+
+    def delete_service_gateway(self, gateway_id: str) -> None:
+        """Delete a service gateway."""
+        self.network.delete_service_gateway(gateway_id)
+
+    def delete_local_peering_gateway(self, gateway_id: str) -> None:
+        """Delete a local peering gateway."""
+        self.network.delete_local_peering_gateway(gateway_id)
+
+    def delete_drg_attachment(self, attachment_id: str) -> None:
+        """Detach a DRG from a VCN."""
+        self.network.delete_drg_attachment(attachment_id)
+
+    def delete_dhcp_options(self, dhcp_options_id: str) -> None:
+        """Delete a set of DHCP options."""
+        self.network.delete_dhcp_options(dhcp_options_id)
+
+    def wait_for_network_resource(self, kind: str, resource_id: str, state: str = "AVAILABLE",
+                                  max_wait_seconds: int = 600) -> None:
+        """
+        Wait until a networking resource (vcn or any of VCN_RESOURCE_KINDS) reaches
+        state. Polls back off from 1s to 5s; a resource that disappears counts as
+        TERMINATED (or DETACHED for DRG attachments).
+        """
+        get = getattr(self.network, f"get_{kind}")
+        terminated = state in ("TERMINATED", "DETACHED")
+        try:
+            response = get(resource_id)
+        except oci.exceptions.ServiceError as e:
+            if terminated and e.status == 404:
+                return
+            raise
+        oci.wait_until(self.network, response, "lifecycle_state", state, max_interval_seconds=5,
+                       max_wait_seconds=max_wait_seconds, succeed_on_not_found=terminated)
+
     def list_autonomous_databases(self, compartment_id: str) -> List[Dict]:
         """List Autonomous Databases in a compartment."""
         dbs = self.database.list_autonomous_databases(compartment_id=compartment_id).data
@@ -381,23 +575,21 @@ class OCIManager:
         Search for compartments whose names contain the query string (case-insensitive).
         Only performs the search if the query is at least 3 characters long.
         Returns a list of matching compartments as dicts with 'id' and 'name'.
-        Searches all compartments (all pages).
+        Searches all compartments (all pages, cached).
         """
         if not query or len(query) < 3:
             return []
-        compartments = oci.pagination.list_call_get_all_results(
-            self.identity.list_compartments,
-            self.tenancy_id,
-            compartment_id_in_subtree=True,
-            lifecycle_state="ACTIVE"
-        ).data
         query_lower = query.lower()
         return [
-            {"id": comp.id, "name": comp.name}
-            for comp in compartments
-            if query_lower in comp.name.lower()
+            {"id": comp["id"], "name": comp["name"]}
+            for comp in self.cached_compartments()
+            if query_lower in comp["name"].lower()
         ]
 
+    def cached_compartments(self) -> List[Dict]:
+        """list_compartments() from the shared cache, refreshed every few minutes."""
+        return cache.get_or_load(("compartments", self.tenancy_id), self.list_compartments, COMPARTMENTS_TTL)
+
     def list_regions(self) -> list:
         """List all available regions for the tenancy."""
         regions = self.identity.list_region_subscriptions(self.tenancy_id).data
@@ -448,13 +640,18 @@ class OCIManager:
             "time_modified": obj.time_modified
         } for obj in objects]
 
-    def upload_object(self, bucket_name: str, object_name: str, file_data: bytes) -> Dict:
-        """Upload an object to a bucket."""
+    def upload_object(self, bucket_name: str, object_name: str, file_data: bytes,
+                      content_type: Optional[str] = None, content_encoding: Optional[str] = None,
+                      content_length: Optional[int] = None) -> Dict:
+        """Upload an object to a bucket (bytes, or a stream of content_length bytes)."""
         result = self.object_storage.put_object(
             self.namespace,
             bucket_name,
             object_name,
-            file_data
+            file_data,
+            content_type=content_type,
+            content_encoding=content_encoding,
+            content_length=content_length
         )
         return {
             "name": object_name,
@@ -469,6 +666,502 @@ class OCIManager:
             object_name
         )
 
+    def upload_file(self, bucket_name: str, object_name: str, file_path: str) -> Dict:
+        """Upload a local file, switching to parallel multipart upload for large files."""
+        upload_manager = oci.object_storage.UploadManager(self.object_storage, allow_parallel_uploads=True)
+        result = upload_manager.upload_file(self.namespace, bucket_name, object_name, file_path)
+        return {
+            "name": object_name,
+            "etag": result.headers.get("etag")
+        }
+
+    def upload_compressed(self, bucket_name: str, object_name: str, source, codec: Optional[str] = "auto",
+                          policy: CompressionPolicy = DEFAULT_POLICY, level: Optional[int] = None,
+                          part_size: int = UPLOAD_STREAM_PART_SIZE) -> Dict:
+        """
+        Upload a local file (path) or binary file object, compressing it on the fly
+        with codec ("gzip", "zstd", "auto" to let policy decide by content type, or
+        None). The object gets Content-Encoding and the original Content-Type.
+        Objects that compress to under part_size take one PUT; larger ones stream
+        as a multipart upload, holding one part in memory.
+        """
+        content_type = policy.content_type_for(object_name)
+        size = os.path.getsize(source) if isinstance(source, str) else getattr(source, "size", None)
+        if codec == "auto":
+            codec = policy.codec_for(object_name, size, content_type)
+        if codec is None:
+            if isinstance(source, str):
+                result = self.upload_file(bucket_name, object_name, source)
+            else:
+                result = self.upload_object(bucket_name, object_name, source, content_type=content_type)
+            return dict(result, content_encoding=None, size=size, stored_size=size)
+
+        raw = open(source, "rb") if isinstance(source, str) else source
+        try:
+            reader = CompressingReader(raw, codec, level)
+            first_part = reader.read(part_size)
+            if len(first_part) < part_size:
+                result = self.object_storage.put_object(self.namespace, bucket_name, object_name, first_part,
+                                                        content_type=content_type, content_encoding=codec)
+            else:
+                reader.unread(first_part)
+                upload_manager = oci.object_storage.UploadManager(self.object_storage, allow_parallel_uploads=True)
+                result = upload_manager.upload_stream(self.namespace, bucket_name, object_name, reader,
+                                                      part_size=part_size, content_type=content_type,
+                                                      content_encoding=codec)
+        finally:
+            if isinstance(source, str):
+                raw.close()
+        return {
+            "name": object_name,
+            "etag": result.headers.get("etag"),
+            "content_encoding": codec,
+            "size": reader.bytes_in,
+            "stored_size": reader.bytes_out
+        }
+
+    def copy_object(self, source_bucket: str, object_name: str, destination_bucket: str,
+                    destination_object_name: Optional[str] = None,
+                    destination_region: Optional[str] = None) -> Dict:
+        """Start a server-side copy of an object to another bucket, optionally in another region."""
+        details = oci.object_storage.models.CopyObjectDetails(
+            source_object_name=object_name,
+            destination_region=destination_region or self.config["region"],
+            destination_namespace=self.namespace,
+            destination_bucket=destination_bucket,
+            destination_object_name=destination_object_name or object_name
+        )
+        result = self.object_storage.copy_object(self.namespace, source_bucket, details)
+        return {
+            "name": destination_object_name or object_name,
+            "work_request_id": result.headers.get("opc-work-request-id")
+        }
+
+    def head_object(self, bucket_name: str, object_name: str) -> Dict:
+        """Get object size, ETag and checksums without downloading it."""
+        headers = self.object_storage.head_object(self.namespace, bucket_name, object_name).headers
+        return {
+            "name": object_name,
+            "size": int(headers.get("content-length", 0)),
+            "etag": headers.get("etag"),
+            "md5": headers.get("content-md5"),
+            "multipart_md5": headers.get("opc-multipart-md5"),
+            "content_type": headers.get("content-type"),
+            "content_encoding": headers.get("content-encoding")
+        }
+
+    def iter_object(self, bucket_name: str, object_name: str, start: int = 0, end: Optional[int] = None,
+                    chunk_size: int = DOWNLOAD_CHUNK_SIZE, verify: bool = True,
+                    decode: bool = False) -> Iterator[bytes]:
+        """
+        Stream an object (or the inclusive byte range start..end) as raw chunks.
+        A dropped connection is resumed from the last received byte, pinned to the
+        original ETag. Full downloads are checked against the object's MD5 when it has one.
+        With decode=True, a compressed object (Content-Encoding gzip or zstd) is
+        streamed decompressed.
+        """
+        info = self.head_object(bucket_name, object_name)
+        if decode and info["content_encoding"]:
+            if start or end is not None:
+                raise ValueError("Byte ranges of a compressed object cannot be decoded")
+            yield from iter_decompressed(self._iter_object(bucket_name, object_name, info, start, end,
+                                                           chunk_size, verify), info["content_encoding"])
+        else:
+            yield from self._iter_object(bucket_name, object_name, info, start, end, chunk_size, verify)
+
+    def _iter_object(self, bucket_name: str, object_name: str, info: Dict, start: int, end: Optional[int],
+                     chunk_size: int, verify: bool) -> Iterator[bytes]:
+        if info["size"] == 0:
+            return
+        end = info["size"] - 1 if end is None else end
+        md5 = hashlib.md5() if verify and start == 0 and end == info["size"] - 1 and info["md5"] else None
+        offset = start
+        attempts = 0
+        while offset <= end:
+            error = None
+            try:
+                response = self.object_storage.get_object(
+                    self.namespace, bucket_name, object_name,
+                    range=f"bytes={offset}-{end}", if_match=info["etag"]
+                )
+                for chunk in response.data.raw.stream(chunk_size, decode_content=False):
+                    offset += len(chunk)
+                    if md5:
+                        md5.update(chunk)
+                    yield chunk
+            except oci.exceptions.ServiceError:
+                raise
+            except Exception as e:
+                error = e
+            if offset <= end:
+                attempts += 1
+                if attempts > 3:
+                    raise error or IOError(f"Incomplete download of {object_name}")
+        if md5 and base64.b64encode(md5.digest()).decode() != info["md5"]:
+            raise ValueError(f"MD5 mismatch downloading {object_name}")
+
+    def download_object(self, bucket_name: str, object_name: str, file_path: str,
+                        part_size: int = DOWNLOAD_PART_SIZE, verify: bool = True, decode: bool = False) -> Dict:
+        """
+        Download an object to file_path using parallel ranged GETs of part_size bytes.
+        Progress is kept in file_path.part / file_path.part.json, so an interrupted
+        download resumes with only the missing parts (as long as the ETag is unchanged).
+        With decode=True, a compressed object is streamed and decompressed into
+        file_path instead (sequentially, as compressed streams must be).
+        """
+        info = self.head_object(bucket_name, object_name)
+        size, etag = info["size"], info["etag"]
+        if decode and info["content_encoding"]:
+            temp_path = file_path + ".part"
+            written = 0
+            with open(temp_path, "wb") as f:
+                for chunk in iter_decompressed(self._iter_object(bucket_name, object_name, info, 0, None,
+                                                                 DOWNLOAD_CHUNK_SIZE, verify),
+                                               info["content_encoding"]):
+                    f.write(chunk)
+                    written += len(chunk)
+            os.replace(temp_path, file_path)
+            return {"name": object_name, "path": file_path, "size": written, "stored_size": size, "etag": etag,
+                    "content_encoding": info["content_encoding"], "md5_verified": bool(verify and info["md5"]) or None}
+        temp_path = file_path + ".part"
+        state_path = temp_path + ".json"
+
+        state = None
+        if os.path.exists(temp_path) and os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+            if (state.get("etag"), state.get("size"), state.get("part_size")) != (etag, size, part_size):
+                state = None
+        if state is None:
+            state = {"etag": etag, "size": size, "part_size": part_size, "done": []}
+            with open(temp_path, "wb") as f:
+                f.truncate(size)
+
+        done = set(state["done"])
+        parts = [
+            (index, start, min(start + part_size, size) - 1)
+            for index, start in enumerate(range(0, size, part_size))
+            if index not in done
+        ]
+        state_lock = threading.Lock()
+
+        def fetch(part):
+            index, start, end = part
+            response = self.object_storage.get_object(
+                self.namespace, bucket_name, object_name,
+                range=f"bytes={start}-{end}", if_match=etag
+            )
+            with open(temp_path, "r+b") as f:
+                f.seek(start)
+                for chunk in response.data.raw.stream(DOWNLOAD_CHUNK_SIZE, decode_content=False):
+                    f.write(chunk)
+                if f.tell() != end + 1:
+                    raise IOError(f"Short read for bytes {start}-{end} of {object_name}")
+            with state_lock:
+                state["done"].append(index)
+                with open(state_path, "w") as f:
+                    json.dump(state, f)
+
+        errors = [error for _, _, error in self.run_parallel(fetch, parts) if error]
+        if errors:
+            raise errors[0]
+
+        verified = None
+        if verify and info["md5"]:
+            md5 = hashlib.md5()
+            with open(temp_path, "rb") as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                    md5.update(chunk)
+            verified = base64.b64encode(md5.digest()).decode() == info["md5"]
+            if not verified:
+                os.remove(temp_path)
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                raise ValueError(f"MD5 mismatch downloading {object_name}")
+        os.replace(temp_path, file_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return {"name": object_name, "path": file_path, "size": size, "etag": etag, "md5_verified": verified}
+
+    def create_download_url(self, bucket_name: str, object_name: str, expires_in_minutes: int = 15) -> str:
+        """Create a short-lived read-only pre-authenticated URL for one object."""
+        details = oci.object_storage.models.CreatePreauthenticatedRequestDetails(
+            name=f"download-{object_name}"[:200],
+            object_name=object_name,
+            access_type="ObjectRead",
+            time_expires=datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(minutes=expires_in_minutes)
+        )
+        par = self.object_storage.create_preauthenticated_request(self.namespace, bucket_name, details).data
+        return self.object_storage.base_client.endpoint + par.access_uri
+
+    def create_upload_url(self, bucket_name: str, prefix: str = "", expires_in_minutes: int = 60) -> Dict:
+        """
+        Create a short-lived write-only pre-authenticated URL for any object under prefix
+        (the whole bucket if empty). Append the full object name to "url" to PUT it;
+        multipart uploads work through it too.
+        """
+        details = oci.object_storage.models.CreatePreauthenticatedRequestDetails(
+            name=f"upload-{prefix}"[:200],
+            object_name=prefix or None,
+            access_type="AnyObjectWrite",
+            time_expires=datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(minutes=expires_in_minutes)
+        )
+        par = self.object_storage.create_preauthenticated_request(self.namespace, bucket_name, details).data
+        return {
+            "id": par.id,
+            "url": self.object_storage.base_client.endpoint + par.access_uri,
+            "prefix": prefix,
+            "time_expires": par.time_expires
+        }
+
+    def delete_preauthenticated_request(self, bucket_name: str, par_id: str) -> None:
+        """Revoke a pre-authenticated request before it expires."""
+        self.object_storage.delete_preauthenticated_request(self.namespace, bucket_name, par_id)
+
+    def summarize_metrics(self, compartment_id: str, namespace: str, query: str,
+                          start_time: datetime.datetime, end_time: datetime.datetime,
+                          resolution: Optional[str] = None) -> List[Dict]:
+        """
+        Run one MQL query (e.g. 'CpuUtilization[5m].mean()') over a time range.
+        Returns one series per resource: {"resource_id", "dimensions", "points": [(timestamp, value)]}.
+        """
+        details = oci.monitoring.models.SummarizeMetricsDataDetails(
+            namespace=namespace,
+            query=query,
+            start_time=start_time,
+            end_time=end_time,
+            resolution=resolution
+        )
+        series = self.monitoring.summarize_metrics_data(compartment_id, details).data
+        return [{
+            "resource_id": metric.dimensions.get("resourceId"),
+            "dimensions": metric.dimensions,
+            "points": [(point.timestamp, point.value) for point in metric.aggregated_datapoints]
+        } for metric in series]
+
+    # Streaming listers: yield one record at a time, fetching pages on demand,
+    # so callers can process very large result sets in bounded memory.
+
+    def iter_instances(self, compartment_id: str, with_ips: bool = True) -> Iterator[Dict]:
+        """Yield compute instances page by page, resolving IPs in parallel per page."""
+        vnic_ids = {}
+        if with_ips:
+            for attachment in oci.pagination.list_call_get_all_results_generator(
+                self.compute.list_vnic_attachments, "record", compartment_id
+            ):
+                if attachment.lifecycle_state == "ATTACHED":
+                    vnic_ids.setdefault(attachment.instance_id, attachment.vnic_id)
+        for page in oci.pagination.list_call_get_all_results_generator(
+            self.compute.list_instances, "response", compartment_id
+        ):
+            vnics = {}
+            for instance_id, vnic, error in self.run_parallel(
+                lambda i: self.network.get_vnic(vnic_ids[i]).data,
+                [instance.id for instance in page.data if instance.id in vnic_ids]
+            ):
+                vnics[instance_id] = None if error else vnic
+            for instance in page.data:
+                vnic = vnics.get(instance.id)
+                yield {
+                    "id": instance.id,
+                    "name": instance.display_name,
+                    "state": instance.lifecycle_state,
+                    "private_ip": vnic.private_ip if vnic else None,
+                    "public_ip": vnic.public_ip if vnic else None,
+                    "shape": instance.shape,
+                    "ocpus": instance.shape_config.ocpus if instance.shape_config else None,
+                    "memory_in_gbs": instance.shape_config.memory_in_gbs if instance.shape_config else None,
+                    "availability_domain": instance.availability_domain,
+                    "time_created": instance.time_created
+                }
+
+    def iter_autonomous_databases(self, compartment_id: str) -> Iterator[Dict]:
+        """Yield Autonomous Databases page by page."""
+        for db in oci.pagination.list_call_get_all_results_generator(
+            self.database.list_autonomous_databases, "record", compartment_id=compartment_id
+        ):
+            yield {
+                "id": db.id,
+                "display_name": db.display_name,
+                "db_name": db.db_name,
+                "lifecycle_state": db.lifecycle_state,
+                "db_workload": db.db_workload,
+                "cpu_core_count": db.cpu_core_count,
+                "data_storage_size_in_tbs": db.data_storage_size_in_tbs,
+                "is_free_tier": getattr(db, "is_free_tier", False),
+                "db_version": getattr(db, "db_version", ""),
+                "time_created": getattr(db, "time_created", None)
+            }
+
+    def iter_vcns(self, compartment_id: str) -> Iterator[Dict]:
+        """Yield VCNs page by page."""
+        for vcn in oci.pagination.list_call_get_all_results_generator(
+            self.network.list_vcns, "record", compartment_id
+        ):
+            yield {"id": vcn.id, "name": vcn.display_name, "cidr": vcn.cidr_block,
+                   "cidr_blocks": vcn.cidr_blocks or [vcn.cidr_block], "state": vcn.lifecycle_state}
+
+    def iter_subnets(self, compartment_id: str, vcn_id: Optional[str] = None) -> Iterator[Dict]:
+        """Yield subnets page by page, for one VCN or the whole compartment."""
+        kwargs = {"vcn_id": vcn_id} if vcn_id else {}
+        for subnet in oci.pagination.list_call_get_all_results_generator(
+            self.network.list_subnets, "record", compartment_id, **kwargs
+        ):
+            yield {"id": subnet.id, "name": subnet.display_name, "cidr": subnet.cidr_block,
+                   "vcn_id": subnet.vcn_id, "public": not subnet.prohibit_public_ip_on_vnic,
+                   "availability_domain": subnet.availability_domain}
+
+    def iter_security_rules(self, compartment_id: str, vcn_id: Optional[str] = None) -> Iterator[Dict]:
+        """Yield one flat record per security rule, for one VCN or the whole compartment."""
+        kwargs = {"vcn_id": vcn_id} if vcn_id else {}
+        for sl in oci.pagination.list_call_get_all_results_generator(
+            self.network.list_security_lists, "record", compartment_id, **kwargs
+        ):
+            for direction, rules in (("INGRESS", sl.ingress_security_rules),
+                                     ("EGRESS", sl.egress_security_rules)):
+                for index, rule in enumerate(rules or []):
+                    yield dict(
+                        security_rule_to_dict(rule),
+                        security_list_id=sl.id,
+                        security_list_name=sl.display_name,
+                        vcn_id=sl.vcn_id,
+                        direction=direction,
+                        index=index
+                    )
+
+    def iter_images(self, compartment_id: str, operating_system: Optional[str] = None) -> Iterator[Dict]:
+        """Yield available images (platform and custom) page by page, for every OS unless one is given."""
+        kwargs = {"operating_system": operating_system} if operating_system else {}
+        for image in oci.pagination.list_call_get_all_results_generator(
+            self.compute.list_images, "record", compartment_id, lifecycle_state="AVAILABLE", **kwargs
+        ):
+            yield {"id": image.id, "name": image.display_name, "operating_system": image.operating_system,
+                   "operating_system_version": image.operating_system_version,
+                   "time_created": image.time_created}
+
+    def iter_shapes(self, compartment_id: str) -> Iterator[Dict]:
+        """Yield compute shapes page by page, with Flex OCPU and memory limits."""
+        for shape in oci.pagination.list_call_get_all_results_generator(
+            self.compute.list_shapes, "record", compartment_id
+        ):
+            ocpu_options = shape.ocpu_options
+            memory_options = shape.memory_options
+            yield {
+                "name": shape.shape,
+                "ocpus": shape.ocpus,
+                "memory_in_gbs": shape.memory_in_gbs,
+                "processor": shape.processor_description,
+                "gpus": shape.gpus,
+                "is_flexible": bool(shape.is_flexible) or ".Flex" in shape.shape,
+                "ocpu_min": ocpu_options.min if ocpu_options else None,
+                "ocpu_max": ocpu_options.max if ocpu_options else None,
+                "memory_min_in_gbs": memory_options.min_in_g_bs if memory_options else None,
+                "memory_max_in_gbs": memory_options.max_in_g_bs if memory_options else None,
+                "memory_per_ocpu_in_gbs": memory_options.default_per_ocpu_in_g_bs if memory_options else None
+            }
+
+    def list_image_shapes(self, image_id: str) -> List[str]:
+        """Names of the shapes an image can be launched on."""
+        return [entry.shape for entry in oci.pagination.list_call_get_all_results_generator(
+            self.compute.list_image_shape_compatibility_entries, "record", image_id
+        )]
+
+    def iter_buckets(self, compartment_id: str) -> Iterator[Dict]:
+        """Yield buckets page by page."""
+        for bucket in oci.pagination.list_call_get_all_results_generator(
+            self.object_storage.list_buckets, "record", self.namespace, compartment_id=compartment_id
+        ):
+            yield {"name": bucket.name, "time_created": bucket.time_created}
+
+    def iter_objects(self, bucket_name: str, prefix: Optional[str] = None,
+                     fields: str = "name,size,timeModified,md5,etag") -> Iterator[Dict]:
+        """Yield objects in a bucket page by page (1000 per page), optionally under a prefix."""
+        kwargs = {"prefix": prefix} if prefix else {}
+        for page in oci.pagination.list_call_get_all_results_generator(
+            self.object_storage.list_objects, "response", self.namespace, bucket_name,
+            fields=fields, limit=1000, **kwargs
+        ):
+            for obj in page.data.objects:
+                yield {
+                    "name": obj.name,
+                    "size": obj.size,
+                    "time_modified": obj.time_modified,
+                    "md5": obj.md5,
+                    "etag": obj.etag
+                }
+
+
+def security_rule_to_dict(rule) -> Dict:
+    """
+    Flatten an ingress/egress security rule (SDK model or dict) into a plain dict
+    with protocol, cidr, stateless, destination and source port range and ICMP
+    type/code fields.
+    """
+    if isinstance(rule, dict):
+        get = rule.get
+    else:
+        get = lambda name: getattr(rule, name, None)
+
+    def field(value, name: str, camel: str):
+        if value is None:
+            return None
+        return value.get(name, value.get(camel)) if isinstance(value, dict) else getattr(value, name, None)
+
+    options = get("tcp_options") or get("tcpOptions") or get("udp_options") or get("udpOptions")
+    destination_ports = field(options, "destination_port_range", "destinationPortRange")
+    source_ports = field(options, "source_port_range", "sourcePortRange")
+    icmp = get("icmp_options") or get("icmpOptions")
+    return {
+        "protocol": get("protocol"),
+        "cidr": get("source") or get("destination"),
+        "stateless": bool(get("is_stateless") or get("isStateless")),
+        "port_min": field(destination_ports, "min", "min"),
+        "port_max": field(destination_ports, "max", "max"),
+        "source_port_min": field(source_ports, "min", "min"),
+        "source_port_max": field(source_ports, "max", "max"),
+        "icmp_type": field(icmp, "type", "type"),
+        "icmp_code": field(icmp, "code", "code"),
+        "description": get("description")
+    }
+
+def build_security_rule(direction: str, protocol: str, cidr: str, port_min: Optional[int] = None,
+                        port_max: Optional[int] = None, stateless: bool = False,
+                        description: Optional[str] = None, source_port_min: Optional[int] = None,
+                        source_port_max: Optional[int] = None, icmp_type: Optional[int] = None,
+                        icmp_code: Optional[int] = None):
+    """
+    Build an SDK IngressSecurityRule/EgressSecurityRule. protocol is an OCI protocol
+    number string ("6", "17", "1", "all"); ports only apply to TCP ("6") and UDP ("17"),
+    ICMP type/code to ICMP ("1") and ICMPv6 ("58").
+    CIDRs that are not IP networks are treated as service CIDR labels.
+    """
+    models = oci.core.models
+    options = {}
+    if protocol in ("6", "17") and (port_min or port_max or source_port_min or source_port_max):
+        ranges = {}
+        if port_min or port_max:
+            ranges["destination_port_range"] = models.PortRange(min=port_min or 1, max=port_max or 65535)
+        if source_port_min or source_port_max:
+            ranges["source_port_range"] = models.PortRange(min=source_port_min or 1, max=source_port_max or 65535)
+        if protocol == "6":
+            options["tcp_options"] = models.TcpOptions(**ranges)
+        else:
+            options["udp_options"] = models.UdpOptions(**ranges)
+    if protocol in ("1", "58") and icmp_type is not None:
+        options["icmp_options"] = models.IcmpOptions(type=icmp_type, code=icmp_code)
+    try:
+        ipaddress.ip_network(cidr, strict=False)
+        cidr_type = "CIDR_BLOCK"
+    except ValueError:
+        cidr_type = "SERVICE_CIDR_BLOCK"
+    if direction.upper() == "INGRESS":
+        return models.IngressSecurityRule(protocol=protocol, source=cidr, source_type=cidr_type,
+                                          is_stateless=stateless, description=description, **options)
+    return models.EgressSecurityRule(protocol=protocol, destination=cidr, destination_type=cidr_type,
+                                     is_stateless=stateless, description=description, **options)
+
 # Updated function to list compartments using OCIManager
 def list_compartments():
     try:
@@ -0,0 +1,38 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("oci")
+
+import oci_replay  # noqa: E402
+from oci_utils import OCIManager  # noqa: E402
+
+# Synthetic cassettes: three instances, two VCNs
+CASSETTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes")
+
+
+def _budgets():
+    with open(os.path.join(CASSETTES, "budgets.json"), encoding="utf-8") as source:
+        return json.load(source)
+
+
+def test_scenarios_stay_within_call_budgets():
+    results = oci_replay.check_scenarios(CASSETTES, _budgets(), latency=0)
+    assert {result["scenario"] for result in results} == {"list_instances", "list_vcns"}
+    assert [result for result in results if result["status"] != "ok"] == []
+
+
+def test_extra_call_per_instance_fails_the_budget(monkeypatch):
+    listed = OCIManager.list_instances
+
+    def list_instances(self, compartment_id):
+        instances = listed(self, compartment_id)
+        for instance in instances:
+            self.compute.get_instance(instance["id"])
+        return instances
+
+    monkeypatch.setattr(OCIManager, "list_instances", list_instances)
+    result, = oci_replay.check_scenarios(CASSETTES, _budgets(), latency=0, names=["list_instances"])
+    assert result["status"] == "failed"
+    assert any("calls > budget 8" in violation for violation in result["violations"])
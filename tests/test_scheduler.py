@@ -0,0 +1,32 @@
+import contextvars
+
+from oci_scheduler import BULK, INTERACTIVE, call_context, current_context, set_context
+
+
+def _in_fresh_context(func):
+    return contextvars.copy_context().run(func)
+
+
+def test_rerun_deadline_is_inherited_and_only_shrinks():
+    def run():
+        set_context(INTERACTIVE, "session", timeout=60)
+        outer = current_context().deadline
+        with call_context(timeout=3600) as context:
+            assert context.deadline == outer
+        with call_context(timeout=1) as context:
+            assert context.deadline < outer
+            assert context.session == "session"
+    _in_fresh_context(run)
+
+
+def test_background_work_drops_the_rerun_deadline():
+    def run():
+        set_context(INTERACTIVE, "session", timeout=60)
+        with call_context(priority=BULK) as context:
+            assert context.deadline is None
+            with call_context(timeout=5) as inner:
+                assert 0 < inner.remaining() <= 5
+        with call_context(priority=INTERACTIVE) as context:
+            assert context.deadline is not None
+    _in_fresh_context(run)
+
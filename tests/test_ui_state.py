@@ -0,0 +1,21 @@
+from oci_ui_state import UIState
+
+
+def test_replacing_only_entry_keeps_new_value():
+    ui = UIState({})
+    scope = ui.scope("objects", "bucket")
+    scope.set("confirm_delete", "a.txt")
+    scope.set("confirm_delete", "b.txt")
+    assert scope.get("confirm_delete") == "b.txt"
+    usage = ui.usage()
+    assert usage["entries"] == 1
+    assert usage["bytes"] == ui._store.scopes[("objects", "bucket")]["confirm_delete"][2]
+
+
+def test_popping_only_entry_drops_scope():
+    ui = UIState({})
+    scope = ui.scope("vcns", "compartment")
+    scope.set("show_delete", "ocid1.vcn.a")
+    assert scope.pop("show_delete") == "ocid1.vcn.a"
+    assert ui.usage()["scopes"] == 0
+    assert ui.usage()["bytes"] == 0